@@ -1,9 +1,63 @@
-from flask import Flask, jsonify
+import os
+import time
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
+from config import config
 
-def create_app():
+def create_app(config_name=None):
     app = Flask(__name__)
+    app.config.from_object(config[config_name or os.environ.get('FLASK_ENV') or 'default'])
+
+    from .services.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
+    from .services.metrics import metrics, request_timings, server_timing_header, start_request_timing, stop_request_timing
+    metrics.enabled = app.config.get('METRICS_ENABLED', False)
+
+    # Requests sent with "X-Request-Timing: 1" get a Server-Timing header with
+    # the rebuild, per-feature, tessellation and serialization times
+    @app.before_request
+    def start_timing():
+        if metrics.enabled or request.headers.get('X-Request-Timing'):
+            g.request_start = time.perf_counter()
+        if request.headers.get('X-Request-Timing'):
+            start_request_timing()
+
+    @app.after_request
+    def finish_timing(response):
+        if 'request_start' not in g:
+            return response
+        elapsed = time.perf_counter() - g.request_start
+        if metrics.enabled:
+            metrics.request_seconds.observe(request.endpoint or 'unknown', request.method, response.status_code,
+                                            value=elapsed)
+        timings = request_timings()
+        if timings is not None:
+            response.headers['Server-Timing'] = server_timing_header(timings + [('total', elapsed)])
+        return response
+
+    @app.teardown_request
+    def stop_timing(exception=None):
+        # Also runs when the request failed, so worker threads never keep recording
+        stop_request_timing()
+
+    if app.config.get('COMPRESS_RESPONSES'):
+        from .services.compression import compress_response
+
+        @app.after_request
+        def compress(response):
+            return compress_response(response, request.headers.get('Accept-Encoding'),
+                                     app.config.get('COMPRESS_MIN_SIZE', 1024), app.config.get('COMPRESS_LEVEL', 6))
     
+    if app.config.get('SLOW_REQUEST_CAPTURE'):
+        from .services.slow_requests import SlowRequestRecorder
+        SlowRequestRecorder(
+            app.config['SLOW_REQUEST_DIR'],
+            threshold=app.config.get('SLOW_REQUEST_THRESHOLD', 1.0),
+            max_files=app.config.get('SLOW_REQUEST_MAX_FILES', 50),
+            interval=app.config.get('SLOW_REQUEST_SAMPLE_INTERVAL', 0.005)
+        ).init_app(app)
+
     # Configure CORS
     CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000", "supports_credentials": True}})
         
@@ -11,8 +65,27 @@ def create_app():
     from .routes.cad_operations import cad_operations as cad_operations_blueprint  # Note the dot notation
     app.register_blueprint(cad_operations_blueprint, url_prefix='/api')
 
+    from .routes.add_feature import add_feature_blueprint
+    app.register_blueprint(add_feature_blueprint, url_prefix='/api')
+
+    from .routes.export_import import export_import as export_import_blueprint
+    app.register_blueprint(export_import_blueprint, url_prefix='/api')
+
+    from .routes.analyze import structural_analysis as structural_analysis_blueprint
+    app.register_blueprint(structural_analysis_blueprint, url_prefix='/api')
+
+    from .routes.assemblies import assemblies as assemblies_blueprint
+    app.register_blueprint(assemblies_blueprint, url_prefix='/api')
+
+    from .routes.feature_management import feature_management as feature_management_blueprint
+    app.register_blueprint(feature_management_blueprint, url_prefix='/api')
+
     # Import and register blueprints
     from .routes import main as main_blueprint
     app.register_blueprint(main_blueprint)
 
+    if app.config.get('PRELOAD_CAD'):
+        from .warmup import preload_cad
+        preload_cad()
+
     return app
\ No newline at end of file
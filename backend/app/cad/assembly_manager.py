@@ -0,0 +1,72 @@
+import uuid
+from .model_manager import ModelManager
+
+class AssemblyManager:
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls(ModelManager.get_instance())
+        return cls._instance
+
+    def __init__(self, model_manager):
+        self.model_manager = model_manager
+        self.assemblies = {}
+
+    def create_assembly(self, name=None):
+        from ..models.assembly import Assembly
+        assembly_id = str(uuid.uuid4())
+        self.assemblies[assembly_id] = Assembly(self.model_manager, name)
+        return assembly_id
+
+    def get_assembly(self, assembly_id):
+        return self.assemblies.get(assembly_id)
+
+    def _assembly(self, assembly_id):
+        assembly = self.get_assembly(assembly_id)
+        if assembly is None:
+            raise ValueError(f"Unknown assembly: {assembly_id}")
+        return assembly
+
+    def add_instance(self, assembly_id, model_id, transform=None, name=None):
+        return self._assembly(assembly_id).add_instance(model_id, transform, name)
+
+    def set_instance_transform(self, assembly_id, instance_id, transform):
+        self._assembly(assembly_id).set_transform(instance_id, transform)
+
+    def remove_instance(self, assembly_id, instance_id):
+        return self._assembly(assembly_id).remove_instance(instance_id)
+
+    def update_part_parameter(self, assembly_id, model_id, name, value):
+        # Rebuilds the part's model only; every instance of it follows
+        assembly = self._assembly(assembly_id)
+        if model_id not in assembly.part_ids():
+            raise ValueError(f"Model {model_id} is not a part of assembly {assembly_id}")
+        self.model_manager.update_parameter(model_id, name, value)
+
+    def get_assembly_data(self, assembly_id):
+        assembly = self.get_assembly(assembly_id)
+        if assembly:
+            instances = assembly.get_instances()
+            parts = []
+            for model_id in assembly.part_ids():
+                # Each part's mesh is sent once and placed by the instance transforms
+                part = assembly.part(model_id)
+                parts.append({
+                    "modelId": model_id,
+                    "revision": part.revision,
+                    "instances": [instance['id'] for instance in instances if instance['modelId'] == model_id],
+                    "boundingBox": part.bounding_box(),
+                    "vertices": part.vertices(),
+                    "edges": part.edges(),
+                    "faces": part.faces()
+                })
+            return {
+                "id": assembly_id,
+                "name": assembly.name,
+                "revision": assembly.revision,
+                "parts": parts,
+                "instances": instances,
+                "boundingBox": assembly.bounding_box()
+            }
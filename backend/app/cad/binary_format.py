@@ -0,0 +1,183 @@
+import mmap
+import struct
+import msgpack
+
+# Compact, versioned binary container for exported models.
+#
+# Layout: a fixed header, a section table and 8-byte aligned section payloads.
+# The "model", "features" and "analysis" sections hold a msgpack encoding of the
+# export dictionary; every other section is a raw blob (BREP text, mesh
+# arrays, ...). Sections are only decoded when accessed, so a memory-mapped
+# archive can be opened without touching the parts it doesn't need.
+
+MAGIC = b'CCADBIN\x00'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<8sHHI')
+_SECTION_NAME_SIZE = 32
+_SECTION = struct.Struct(f'<{_SECTION_NAME_SIZE}sQQ')
+_ALIGNMENT = 8
+
+_BLOB_INDEX_SECTION = 'blobs'
+
+
+def is_binary(data):
+    # JSON documents may arrive as text; only bytes-like data can be an archive
+    if not isinstance(data, (bytes, bytearray, memoryview, mmap.mmap)):
+        return False
+    return bytes(data[:len(MAGIC)]) == MAGIC
+
+
+def encode_value(value):
+    return msgpack.packb(value, use_bin_type=True, default=_to_builtin)
+
+
+def decode_value(data):
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def _to_builtin(value):
+    # NumPy scalars and arrays
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Cannot encode value of type {type(value).__name__}")
+
+
+def dumps(export_data, blobs=None):
+    # export_data is the dictionary produced by ModelManager export; blobs maps
+    # names to bytes or NumPy arrays that are stored uncompressed and aligned.
+    sections = [
+        ('model', encode_value({
+            'modelId': export_data.get('modelId'),
+            'parameters': export_data.get('parameters', {})
+        })),
+        ('features', encode_value(export_data.get('features', []))),
+        ('analysis', encode_value(export_data.get('structuralAnalysis')))
+    ]
+
+    blob_index = {}
+    for name, blob in (blobs or {}).items():
+        section_name = f'blob:{name}'
+        if hasattr(blob, 'dtype'):
+            blob_index[name] = {'section': section_name, 'dtype': blob.dtype.str, 'shape': list(blob.shape)}
+            payload = blob.tobytes()
+        else:
+            blob_index[name] = {'section': section_name}
+            payload = bytes(blob)
+        sections.append((section_name, payload))
+    sections.append((_BLOB_INDEX_SECTION, encode_value(blob_index)))
+
+    for name, _ in sections:
+        if len(name.encode('utf-8')) > _SECTION_NAME_SIZE:
+            raise ValueError(f"Section name too long: {name}")
+
+    out = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(sections)))
+    table_offset = len(out)
+    out += bytes(_SECTION.size * len(sections))
+
+    table = []
+    for name, payload in sections:
+        out += bytes(-len(out) % _ALIGNMENT)
+        table.append((name, len(out), len(payload)))
+        out += payload
+
+    for i, (name, offset, length) in enumerate(table):
+        _SECTION.pack_into(out, table_offset + i * _SECTION.size, name.encode('utf-8'), offset, length)
+
+    return bytes(out)
+
+
+class ModelArchive:
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._decoded = {}
+
+        if len(self._view) < _HEADER.size:
+            raise ValueError("Truncated model archive")
+        magic, version, _flags, section_count = _HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a CloudCad binary model")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary model version: {version}")
+        self.version = version
+
+        self._sections = {}
+        for i in range(section_count):
+            raw_name, offset, length = _SECTION.unpack_from(self._view, _HEADER.size + i * _SECTION.size)
+            if offset + length > len(self._view):
+                raise ValueError("Truncated model archive")
+            self._sections[raw_name.rstrip(b'\x00').decode('utf-8')] = (offset, length)
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped)
+
+    def close(self):
+        self._view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def section_names(self):
+        return list(self._sections)
+
+    def _section(self, name):
+        if name not in self._sections:
+            raise KeyError(f"Missing section: {name}")
+        offset, length = self._sections[name]
+        return self._view[offset:offset + length]
+
+    def _tree(self, name):
+        if name not in self._decoded:
+            self._decoded[name] = decode_value(self._section(name)) if name in self._sections else None
+        return self._decoded[name]
+
+    @property
+    def model_id(self):
+        return self._tree('model')['modelId']
+
+    @property
+    def parameters(self):
+        return self._tree('model')['parameters']
+
+    @property
+    def features(self):
+        return self._tree('features')
+
+    @property
+    def structural_analysis(self):
+        return self._tree('analysis')
+
+    def blob_names(self):
+        return list(self._tree(_BLOB_INDEX_SECTION) or {})
+
+    def blob(self, name):
+        # Returns a zero-copy view (or NumPy array view) into the archive buffer
+        entry = (self._tree(_BLOB_INDEX_SECTION) or {}).get(name)
+        if entry is None:
+            raise KeyError(f"Missing blob: {name}")
+        data = self._section(entry['section'])
+        if 'dtype' in entry:
+            import numpy as np
+            return np.frombuffer(data, dtype=np.dtype(entry['dtype'])).reshape(entry['shape'])
+        return data
+
+    def to_dict(self):
+        return {
+            "modelId": self.model_id,
+            "parameters": self.parameters,
+            "features": self.features,
+            "structuralAnalysis": self.structural_analysis
+        }
+
+
+def loads(data):
+    return ModelArchive(data).to_dict()
@@ -0,0 +1,119 @@
+import contextvars
+from contextlib import contextmanager
+import cadquery as cq
+from OCP.BRepAlgoAPI import BRepAlgoAPI_Cut, BRepAlgoAPI_Fuse
+from OCP.BOPAlgo import BOPAlgo_GlueEnum
+from OCP.ShapeUpgrade import ShapeUpgrade_UnifySameDomain
+
+# Fusion of many bodies at once. Unioning bodies one by one into an
+# accumulating result intersects every new body with everything fused so far;
+# a single n-ary BRepAlgoAPI_Fuse intersects all arguments in one pass (and
+# OCC can run it multi-threaded). A balanced pairwise tree is available as an
+# alternative for inputs where the n-ary operation is slow or fails.
+#
+# Inside record_history() the operations here keep OCC's history of what they
+# did to each input shape, so callers can follow a face of the input to the
+# faces it became (see trace); model rebuilds use it to attribute faces to
+# features.
+
+_histories = contextvars.ContextVar('boolean_histories', default=None)
+
+
+@contextmanager
+def record_history():
+    # Yields the list the histories (BRepTools_History) of the operations run
+    # in the block are appended to, in order
+    histories = []
+    token = _histories.set(histories)
+    try:
+        yield histories
+    finally:
+        _histories.reset(token)
+
+
+def _record(operation):
+    histories = _histories.get()
+    if histories is not None:
+        histories.append(operation.History())
+
+
+def trace(histories, shape):
+    # Shapes that shape became through the recorded operations: itself if they
+    # left it alone, the pieces it was split or merged into if it was modified,
+    # nothing if it was removed
+    shapes = [shape.wrapped]
+    for history in histories:
+        traced = []
+        for current in shapes:
+            if history.IsRemoved(current):
+                continue
+            modified = list(history.Modified(current))
+            traced.extend(modified or [current])
+        shapes = traced
+    return [cq.Shape.cast(current) for current in shapes]
+
+
+def shapes_of(obj):
+    # Shapes held by a cadquery Workplane, or the shape itself
+    if isinstance(obj, cq.Workplane):
+        return [value for value in obj.vals() if isinstance(value, cq.Shape)]
+    if isinstance(obj, cq.Shape):
+        return [obj]
+    raise TypeError(f"Cannot fuse {type(obj).__name__}")
+
+
+def contains(container_shapes, shape):
+    # True if every solid of shape is one of the solids of container_shapes
+    container_solids = [solid for container in container_shapes for solid in container.Solids()]
+    solids = shape.Solids()
+    return bool(solids) and all(any(solid.isSame(other) for other in container_solids) for solid in solids)
+
+
+def _fuse(shapes, parallel, glue, tolerance):
+    operation = BRepAlgoAPI_Fuse()
+    if glue:
+        operation.SetGlue(BOPAlgo_GlueEnum.BOPAlgo_GlueShift)
+    if tolerance:
+        operation.SetFuzzyValue(tolerance)
+    result = shapes[0]._bool_op(shapes[:1], shapes[1:], operation, parallel)
+    _record(operation)
+    return result
+
+
+def cut(shape, tools, parallel=True, clean=True):
+    # shape minus all tools in one operation
+    operation = BRepAlgoAPI_Cut()
+    result = shape._bool_op([shape], list(tools), operation, parallel)
+    _record(operation)
+    return clean_shape(result) if clean else result
+
+
+def clean_shape(shape):
+    # As cq.Shape.clean: merges faces and edges that lie on the same surface
+    upgrader = ShapeUpgrade_UnifySameDomain(shape.wrapped, True, True, True)
+    upgrader.AllowInternalEdges(False)
+    upgrader.Build()
+    _record(upgrader)
+    return shape.__class__(upgrader.Shape())
+
+
+def fuse_all(shapes, method='nary', parallel=True, glue=False, tolerance=None, clean=True):
+    # method: 'nary' fuses everything in a single operation, 'tree' fuses pairs
+    # level by level so every operation works on shapes of similar size
+    shapes = list(shapes)
+    if not shapes:
+        raise ValueError("Nothing to fuse")
+    if len(shapes) == 1:
+        return shapes[0]
+
+    if method == 'nary':
+        result = _fuse(shapes, parallel, glue, tolerance)
+    elif method == 'tree':
+        while len(shapes) > 1:
+            pairs = [shapes[i:i + 2] for i in range(0, len(shapes), 2)]
+            shapes = [_fuse(pair, parallel, glue, tolerance) if len(pair) == 2 else pair[0] for pair in pairs]
+        result = shapes[0]
+    else:
+        raise ValueError(f"Unknown fuse method: {method}")
+
+    return clean_shape(result) if clean else result
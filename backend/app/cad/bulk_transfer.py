@@ -0,0 +1,85 @@
+import io
+import json
+import zipfile
+from . import binary_format
+
+MANIFEST_NAME = 'manifest.json'
+
+_EXTENSIONS = {'binary': '.ccad', 'json': '.json'}
+
+
+class _StreamBuffer(io.RawIOBase):
+    # Write-only, non-seekable sink for ZipFile; the exporter drains it after
+    # every entry so only one entry is ever held in memory.
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _call(func, *args):
+    return func(*args)
+
+
+def iter_export_archive(model_manager, model_ids, format='binary', run=_call):
+    # Models are exported one at a time through run (the CAD pool's run in the
+    # routes), so other CAD requests are served between two entries
+    if format not in _EXTENSIONS:
+        raise ValueError(f"Unknown export format: {format}")
+
+    def export_one(model_id):
+        data = model_manager.export_model(model_id, format=format)
+        if data is None:
+            raise ValueError(f"Model not found: {model_id}")
+        return data
+
+    buffer = _StreamBuffer()
+    manifest = []
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for model_id in model_ids:
+            try:
+                data = run(export_one, model_id)
+                name = f'{model_id}{_EXTENSIONS[format]}'
+                archive.writestr(name, data)
+                manifest.append({"modelId": model_id, "entry": name, "success": True})
+            except Exception as e:
+                manifest.append({"modelId": model_id, "success": False, "error": str(e)})
+            yield buffer.drain()
+
+        archive.writestr(MANIFEST_NAME, json.dumps({
+            "format": format,
+            "binaryFormatVersion": binary_format.FORMAT_VERSION,
+            "models": manifest
+        }, indent=2))
+    yield buffer.drain()
+
+
+def import_archive(model_manager, fileobj, run=_call, max_entry_bytes=None):
+    # fileobj must be seekable (uploads are spooled to disk by Werkzeug).
+    # Entries are decompressed here and imported one at a time through run
+    # (the CAD pool's run in the routes), like exports. Entries that would
+    # decompress to more than max_entry_bytes are refused without being read.
+    results = []
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or info.filename == MANIFEST_NAME:
+                continue
+            try:
+                if max_entry_bytes is not None and info.file_size > max_entry_bytes:
+                    raise ValueError(f"Entry is larger than {max_entry_bytes} bytes")
+                with archive.open(info) as entry:
+                    data = entry.read()
+                results.append({"entry": info.filename, "success": True, "modelId": run(model_manager.import_model, data)})
+            except Exception as e:
+                results.append({"entry": info.filename, "success": False, "error": str(e)})
+    return results
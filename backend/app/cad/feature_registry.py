@@ -0,0 +1,241 @@
+import importlib
+import math
+
+# Feature types known to the application.
+#
+# Each feature declares the function that builds it (by module path, imported
+# on first use so registering features does not pull in cadquery), its
+# parameters in call order, which of them change the geometry (only those key
+# cached rebuild results), whether its result may be cached, whether it adds
+# material (hiding it then only hides its faces) or removes it (hiding it means
+# rebuilding without it) and which argument values it can be built with. Routes use the schema to turn request
+# parameters into feature arguments; import resolves stored feature types by
+# name.
+
+REQUIRED = object()
+
+
+class FeatureParam:
+    def __init__(self, name, type=float, default=REQUIRED, key=None, geometry=True):
+        self.name = name
+        self.type = type
+        self.default = default
+        # Name of the parameter in request bodies
+        self.key = key or _camel_case(name)
+        # False for parameters that do not change the feature's shape
+        self.geometry = geometry
+
+    @property
+    def required(self):
+        return self.default is REQUIRED
+
+    def coerce(self, value, model_parameters=()):
+        # Strings naming a model parameter are kept and resolved at rebuild
+        # time; any other value must convert to the parameter's type
+        if isinstance(value, str) and self.type is not str and value in model_parameters:
+            return value
+        if self.type in (int, float) and isinstance(value, bool):
+            raise ValueError(f"Invalid value for {self.key}: {value!r}")
+        try:
+            return self.type(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for {self.key}: {value!r}")
+
+    def to_dict(self):
+        return {
+            "name": self.key,
+            "type": self.type.__name__,
+            "required": self.required,
+            "default": None if self.required else self.default,
+            "affectsGeometry": self.geometry
+        }
+
+
+class FeatureSpec:
+    def __init__(self, name, target, params, cacheable=True, aliases=(), description='', additive=False,
+                 validate=None):
+        self.name = name
+        # "package.module:function"
+        self.target = target
+        self.params = list(params)
+        self.cacheable = cacheable
+        self.aliases = tuple(aliases)
+        self.description = description
+        # bool, or a function of the parameter values by name
+        self.additive = additive
+        # Function of the parameter values by name, raises ValueError for
+        # values the feature cannot be built with
+        self.validate = validate
+        self._func = None
+
+    def load(self):
+        if self._func is None:
+            module_name, _, func_name = self.target.partition(':')
+            self._func = getattr(importlib.import_module(module_name), func_name)
+        return self._func
+
+    def bind(self, parameters, model_parameters=()):
+        # Request parameters -> positional feature arguments
+        args = []
+        for param in self.params:
+            if param.key in parameters:
+                args.append(param.coerce(parameters[param.key], model_parameters))
+            elif param.required:
+                raise ValueError(f"Missing required parameter for {self.name}: {param.key}")
+            else:
+                args.append(param.default)
+        self.check(args)
+        return args
+
+    def values(self, args, kwargs=None):
+        # Argument values by parameter name, defaults included
+        values = {param.name: param.default for param in self.params if not param.required}
+        values.update(zip((param.name for param in self.params), args))
+        values.update(kwargs or {})
+        return values
+
+    def geometry_args(self, args, kwargs=None):
+        # Argument values by parameter name without those that do not affect
+        # the geometry
+        ignored = {param.name for param in self.params if not param.geometry}
+        return {name: value for name, value in self.values(args, kwargs).items() if name not in ignored}
+
+    def is_additive(self, args, kwargs=None):
+        if not callable(self.additive):
+            return self.additive
+        return bool(self.additive(self.values(args, kwargs)))
+
+    def check(self, args, kwargs=None):
+        # Values that are still names of model parameters are checked by the
+        # model once they are resolved
+        if self.validate is not None:
+            self.validate(self.values(args, kwargs))
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "description": self.description,
+            "parameters": [param.to_dict() for param in self.params],
+            "cacheable": self.cacheable
+        }
+
+
+class FeatureRegistry:
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+            register_builtin_features(cls._instance)
+        return cls._instance
+
+    def __init__(self):
+        self.specs = {}
+        self._aliases = {}
+
+    def register(self, spec):
+        if spec.name in self.specs:
+            raise ValueError(f"Feature type already registered: {spec.name}")
+        self.specs[spec.name] = spec
+        for alias in spec.aliases:
+            self._aliases[alias] = spec.name
+        return spec
+
+    def get(self, name):
+        spec = self.specs.get(self._aliases.get(name, name))
+        if spec is None:
+            raise ValueError(f"Unknown feature type: {name}")
+        return spec
+
+    def resolve(self, name):
+        return self.get(name).load()
+
+    def names(self):
+        return list(self.specs)
+
+    def describe(self):
+        return [spec.to_dict() for spec in self.specs.values()]
+
+
+def _camel_case(name):
+    first, *rest = name.split('_')
+    return first + ''.join(part.capitalize() for part in rest)
+
+
+def _extrudes(values):
+    return values.get('operation') == 'extrude'
+
+
+def _require(values, name, test, message):
+    value = values.get(name)
+    if isinstance(value, str) or value is None:
+        return
+    if not (math.isfinite(value) and test(value)):
+        raise ValueError(f"Invalid value for {_camel_case(name)}: {value!r} ({message})")
+
+
+def _check_pattern(values):
+    # Checked before the feature is added: a zero direction or count would
+    # otherwise only fail (or never finish) inside the boolean
+    _require(values, 'radius', lambda value: value > 0, 'must be positive')
+    _require(values, 'depth', lambda value: value > 0, 'must be positive')
+    _require(values, 'count', lambda value: value >= 1, 'must be at least 1')
+    if values.get('operation') not in ('cut', 'extrude'):
+        raise ValueError(f"Unknown pattern operation: {values.get('operation')!r}")
+
+
+def _check_linear_pattern(values):
+    _check_pattern(values)
+    _require(values, 'spacing', lambda value: True, 'must be finite')
+    direction = (values.get('direction_x'), values.get('direction_y'))
+    for name in ('direction_x', 'direction_y'):
+        _require(values, name, lambda value: True, 'must be finite')
+    if not any(isinstance(value, str) for value in direction) and math.hypot(*direction) == 0:
+        raise ValueError("Invalid value for direction: directionX and directionY must not both be zero")
+
+
+def _check_circular_pattern(values):
+    _check_pattern(values)
+    for name in ('pattern_radius', 'total_angle', 'start_angle'):
+        _require(values, name, lambda value: True, 'must be finite')
+
+
+def register_builtin_features(registry):
+    module = f'{__package__}.parametric_feature_functions'
+    registry.register(FeatureSpec('create_cylinder', f'{module}:create_cylinder', [
+        FeatureParam('radius'),
+        FeatureParam('height')
+    ], description='Cylinder centred on the workplane', additive=True))
+    registry.register(FeatureSpec('circular_cut', f'{module}:circular_cut', [
+        FeatureParam('radius'),
+        FeatureParam('depth')
+    ], description='Circular pocket in the top face'))
+    registry.register(FeatureSpec('concentric_extrude', f'{module}:concentric_extrude', [
+        FeatureParam('outer_radius'),
+        FeatureParam('inner_radius'),
+        FeatureParam('height')
+    ], description='Ring extruded from the top face', additive=True))
+    # The mirror plane is an object, so its results are not cached
+    registry.register(FeatureSpec('mirror_feature', f'{module}:mirror_feature', [
+        FeatureParam('mirror_plane', type=dict)
+    ], cacheable=False, aliases=('mirror',), description='Mirror of the model across a plane'))
+    registry.register(FeatureSpec('linear_pattern', f'{module}:linear_pattern', [
+        FeatureParam('radius'),
+        FeatureParam('depth'),
+        FeatureParam('count', type=int),
+        FeatureParam('spacing'),
+        FeatureParam('direction_x', default=1.0),
+        FeatureParam('direction_y', default=0.0),
+        FeatureParam('operation', type=str, default='cut')
+    ], description='Row of holes or bosses on the top face', additive=_extrudes, validate=_check_linear_pattern))
+    registry.register(FeatureSpec('circular_pattern', f'{module}:circular_pattern', [
+        FeatureParam('radius'),
+        FeatureParam('depth'),
+        FeatureParam('count', type=int),
+        FeatureParam('pattern_radius'),
+        FeatureParam('total_angle', default=360.0),
+        FeatureParam('start_angle', default=0.0),
+        FeatureParam('operation', type=str, default='cut')
+    ], description='Holes or bosses on a circle around the centre of the top face', additive=_extrudes,
+        validate=_check_circular_pattern))
@@ -1,6 +1,9 @@
+import functools
 import json
 import uuid
-from cadquery import Workplane, Sketch
+from . import binary_format
+from .feature_registry import FeatureRegistry
+from ..services.model_events import ModelEventHub
 
 class ModelManager:
     _instance = None
@@ -19,6 +22,8 @@ class ModelManager:
         from ..models.parametric_model import ParametricModel
         model_id = str(uuid.uuid4())
         self.models[model_id] = ParametricModel()
+        # Subscribers to /models/<id>/events hear about every rebuild
+        self.models[model_id].rebuild_listeners.append(functools.partial(ModelEventHub.get_instance().publish, model_id))
         self.history[model_id] = []
         return model_id
 
@@ -45,6 +50,33 @@ class ModelManager:
             self._add_to_history(model_id, 'add_feature', {'feature_type': feature_type, 'args': args, 'kwargs': kwargs})
             return feature_id
 
+    def rebuild_model(self, model_id):
+        model = self.get_model(model_id)
+        if model is None:
+            raise ValueError(f"Unknown model: {model_id}")
+        model.rebuild()
+
+    def set_feature_visibility(self, model_id, feature_id, visible):
+        model = self.get_model(model_id)
+        if model:
+            feature = model.get_feature(feature_id)
+            old_state = (feature['visible'], feature['suppressed'])
+            model.set_feature_visibility(feature_id, visible)
+            self._add_to_history(model_id, 'set_feature_visibility', {'feature_id': feature_id, 'old_state': old_state})
+
+    def set_feature_suppressed(self, model_id, feature_id, suppressed):
+        model = self.get_model(model_id)
+        if model:
+            feature = model.get_feature(feature_id)
+            old_state = (feature['visible'], feature['suppressed'])
+            model.set_feature_suppressed(feature_id, suppressed)
+            self._add_to_history(model_id, 'set_feature_suppressed', {'feature_id': feature_id, 'old_state': old_state})
+
+    def set_feature_color(self, model_id, feature_id, color):
+        model = self.get_model(model_id)
+        if model:
+            model.set_feature_color(feature_id, color)
+
     def remove_feature(self, model_id, feature_id):
         model = self.get_model(model_id)
         if model:
@@ -81,7 +113,7 @@ class ModelManager:
         from ..routes.structural_analysis import StructuralAnalysis
         model = self.get_model(model_id)
         if model:
-            analyzer = StructuralAnalysis(model)
+            analyzer = StructuralAnalysis(model_id)
             results, failure_points = analyzer.perform_analysis(material_properties, loads, constraints)
             self._add_to_history(model_id, 'structural_analysis', {
                 'material_properties': material_properties,
@@ -113,12 +145,14 @@ class ModelManager:
                 model.remove_last_feature()
             elif action['type'] == 'remove_feature':
                 model.add_feature(action['data']['feature_data'])
+            elif action['type'] in ('set_feature_visibility', 'set_feature_suppressed'):
+                model.restore_feature_state(action['data']['feature_id'], *action['data']['old_state'])
             # Add more reverse actions for other operation types
 
-    def export_model(self, model_id):
+    def _export_data(self, model_id):
         model = self.get_model(model_id)
         if model:
-            export_data = {
+            return {
                 "modelId": model_id,
                 "parameters": model.parameters,
                 "features": [
@@ -134,26 +168,49 @@ class ModelManager:
                     "failurePoints": model.failure_points if hasattr(model, 'failure_points') else None
                 }
             }
-            return json.dumps(export_data, indent=2)
 
-    def import_model(self, json_data):
-        import_data = json.loads(json_data)
+    def export_model(self, model_id, format='json'):
+        export_data = self._export_data(model_id)
+        if export_data:
+            if format == 'binary':
+                return binary_format.dumps(export_data)
+            elif format == 'json':
+                return json.dumps(export_data, indent=2)
+            else:
+                raise ValueError(f"Unknown export format: {format}")
+
+    def import_model(self, data):
+        # Accepts either a JSON document (text or bytes) or a binary model archive
+        if binary_format.is_binary(data):
+            import_data = binary_format.ModelArchive(data)
+            parameters = import_data.parameters
+            features = import_data.features
+            structural_analysis = import_data.structural_analysis
+        else:
+            import_data = json.loads(data)
+            parameters = import_data["parameters"]
+            features = import_data["features"]
+            structural_analysis = import_data.get("structuralAnalysis")
+
         model_id = self.create_new_model()
         model = self.get_model(model_id)
 
-        for name, value in import_data["parameters"].items():
+        for name, value in parameters.items():
             model.add_parameter(name, value)
 
-        for feature in import_data["features"]:
-            model.add_feature(feature["type"], *feature["args"], **feature["kwargs"])
+        for feature in features:
+            model.add_feature(self._resolve_feature_func(feature["type"]), *feature["args"], **feature["kwargs"])
 
-        if "structuralAnalysis" in import_data:
-            model.analysis_results = import_data["structuralAnalysis"]["results"]
-            model.failure_points = import_data["structuralAnalysis"]["failurePoints"]
+        if structural_analysis:
+            model.analysis_results = structural_analysis["results"]
+            model.failure_points = structural_analysis["failurePoints"]
 
         model.rebuild()
         return model_id
 
+    def _resolve_feature_func(self, feature_type):
+        return FeatureRegistry.get_instance().resolve(feature_type)
+
     def get_model_data(self, model_id):
         model = self.get_model(model_id)
         if model:
@@ -165,7 +222,9 @@ class ModelManager:
                         "id": feature['id'],
                         "type": feature['type'],
                         "args": feature['args'],
-                        "kwargs": feature['kwargs']
+                        "kwargs": feature['kwargs'],
+                        "visible": feature['visible'],
+                        "suppressed": feature['suppressed']
                     } for feature in model.features
                 ],
                 "boundingBox": model.bounding_box(),
@@ -1,15 +1,64 @@
+import math
 import cadquery as cq
+from . import transforms
+from .boolean_ops import cut, fuse_all
 
 def create_cylinder(workplane, radius, height):
     return workplane.cylinder(height, radius)
 
+# Features that change an existing body build their tool and apply it with
+# boolean_ops, which records the face history used to attribute faces
+
 def circular_cut(workplane, radius, depth):
-    return workplane.faces(">Z").circle(radius).cutBlind(-depth)
+    tool = workplane.faces(">Z").circle(radius).extrude(-depth, combine=False).val()
+    return workplane.newObject([cut(workplane.findSolid(), [tool])])
 
 def concentric_extrude(workplane, outer_radius, inner_radius, height):
-    return workplane.faces(">Z").circle(outer_radius).circle(inner_radius).extrude(height)
+    tool = workplane.faces(">Z").circle(outer_radius).circle(inner_radius).extrude(height, combine=False).val()
+    return workplane.newObject([fuse_all([workplane.findSolid(), tool])])
 
 def mirror_feature(workplane, mirror_plane):
     return workplane.mirror(mirror_plane.origin, mirror_plane.normal)
 
+# Patterns build a single cylindrical tool body on the top face, place copies
+# of it (sharing the same geometry, only the location differs) and apply all of
+# them to the model in one boolean instead of one feature per instance.
+
+def _apply_pattern(workplane, radius, depth, matrices, operation):
+    if not (math.isfinite(radius) and radius > 0 and math.isfinite(depth) and depth > 0):
+        raise ValueError(f"Pattern radius and depth must be positive: {radius}, {depth}")
+    solid = workplane.findSolid()
+    top = workplane.faces(">Z").val()
+    center = top.Center()
+    if operation == 'cut':
+        base = cq.Vector(center.x, center.y, center.z - depth)
+    elif operation == 'extrude':
+        base = center
+    else:
+        raise ValueError(f"Unknown pattern operation: {operation}")
+
+    tool = cq.Solid.makeCylinder(radius, depth, base)
+    # Matrices are relative to the centre of the top face
+    to_center = transforms.translation(center.toTuple())
+    from_center = transforms.translation((-center.x, -center.y, -center.z))
+    tools = [tool.moved(transforms.location(to_center @ matrix @ from_center)) for matrix in matrices]
+
+    if operation == 'cut':
+        result = cut(solid, tools)
+    else:
+        result = fuse_all([solid] + tools)
+    return workplane.newObject([result])
+
+def linear_pattern(workplane, radius, depth, count, spacing, direction_x=1.0, direction_y=0.0, operation='cut'):
+    matrices = transforms.linear_pattern((direction_x, direction_y, 0.0), spacing, int(count))
+    return _apply_pattern(workplane, radius, depth, matrices, operation)
+
+def circular_pattern(workplane, radius, depth, count, pattern_radius, total_angle=360.0, start_angle=0.0, operation='cut'):
+    # Instances on a circle of pattern_radius around the centre of the top face;
+    # angles in degrees
+    start = transforms.rotation(math.radians(start_angle), (0.0, 0.0, 0.0), (0.0, 0.0, 1.0))
+    offset = transforms.translation((pattern_radius, 0.0, 0.0))
+    matrices = transforms.circular_pattern(int(count), total_angle=math.radians(total_angle)) @ start @ offset
+    return _apply_pattern(workplane, radius, depth, matrices, operation)
+
 # Add more parametric feature functions as needed
\ No newline at end of file
@@ -0,0 +1,133 @@
+import numpy as np
+
+# Affine transforms on whole point arrays.
+#
+# A transform is a homogeneous (d+1)x(d+1) matrix for d = 2 or 3, acting on
+# column vectors: p' = M[:d, :d] @ p + M[:d, d]. Matrices are built once and
+# applied to (N, d) arrays in a single NumPy operation; several of them can be
+# stacked to produce patterns.
+
+
+def as_vector(value, dimensions=None):
+    # Accepts tuples, lists, arrays and cadquery Vectors
+    if hasattr(value, 'toTuple'):
+        value = value.toTuple()
+    vector = np.asarray(value, dtype=np.float64).ravel()
+    return vector[:dimensions] if dimensions else vector
+
+
+def identity(dimensions=3):
+    return np.eye(dimensions + 1)
+
+
+def translation(offset):
+    offset = as_vector(offset)
+    matrix = identity(len(offset))
+    matrix[:-1, -1] = offset
+    return matrix
+
+
+def reflection(origin, normal):
+    # Mirror across the line (2D) or plane (3D) through origin with the given normal
+    origin = as_vector(origin)
+    normal = as_vector(normal, len(origin))
+    length_squared = normal @ normal
+    if length_squared == 0:
+        raise ValueError("Mirror normal must not be zero")
+
+    matrix = identity(len(origin))
+    matrix[:-1, :-1] -= 2.0 * np.outer(normal, normal) / length_squared
+    matrix[:-1, -1] = 2.0 * (origin @ normal) * normal / length_squared
+    return matrix
+
+
+def line_reflection(start, end):
+    # Mirror across the 2D line through start and end
+    start = as_vector(start, 2)
+    direction = as_vector(end, 2) - start
+    if not direction.any():
+        raise ValueError("Mirror line needs two distinct points")
+    return reflection(start, (-direction[1], direction[0]))
+
+
+def rotation(angle, center=(0.0, 0.0), axis=None):
+    # Rotation by angle (radians), counter-clockwise about center in 2D or
+    # about the axis through center in 3D
+    center = as_vector(center)
+    if axis is None:
+        cos, sin = np.cos(angle), np.sin(angle)
+        linear = np.array([[cos, -sin], [sin, cos]])
+    else:
+        axis = _unit(axis, 3, "Rotation axis")
+        cross = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]], [-axis[1], axis[0], 0]])
+        linear = np.eye(3) + np.sin(angle) * cross + (1 - np.cos(angle)) * (cross @ cross)
+
+    matrix = identity(len(center))
+    matrix[:-1, :-1] = linear
+    matrix[:-1, -1] = center - linear @ center
+    return matrix
+
+
+def apply(points, matrix):
+    points = np.asarray(points, dtype=np.float64)
+    return points @ matrix[:-1, :-1].T + matrix[:-1, -1]
+
+
+def apply_many(points, matrices):
+    # (N, d) points under each of K matrices -> (K, N, d)
+    points = np.asarray(points, dtype=np.float64)
+    matrices = np.asarray(matrices, dtype=np.float64)
+    return points @ matrices[:, :-1, :-1].transpose(0, 2, 1) + matrices[:, None, :-1, -1]
+
+
+def _unit(vector, dimensions, name):
+    vector = as_vector(vector, dimensions)
+    length = np.linalg.norm(vector)
+    if not np.isfinite(length) or length == 0:
+        raise ValueError(f"{name} must be a non-zero, finite vector")
+    return vector / length
+
+
+def _check_count(count):
+    if count < 1:
+        raise ValueError(f"Pattern count must be at least 1: {count}")
+
+
+def linear_pattern(direction, spacing, count):
+    # count translations by multiples of spacing along direction, the first
+    # being the identity
+    _check_count(count)
+    if not np.isfinite(spacing):
+        raise ValueError(f"Pattern spacing must be finite: {spacing}")
+    direction = _unit(direction, None, "Pattern direction")
+    matrices = np.tile(identity(len(direction)), (count, 1, 1))
+    matrices[:, :-1, -1] = np.arange(count)[:, None] * spacing * direction
+    return matrices
+
+
+def circular_pattern(count, center=(0.0, 0.0, 0.0), axis=(0.0, 0.0, 1.0), total_angle=2 * np.pi):
+    # count rotations spread evenly over total_angle; a full turn does not
+    # repeat the first instance
+    _check_count(count)
+    if not np.isfinite(total_angle):
+        raise ValueError(f"Pattern angle must be finite: {total_angle}")
+    center = as_vector(center)
+    step = total_angle / (count if np.isclose(total_angle, 2 * np.pi) else max(count - 1, 1))
+    return np.array([
+        rotation(i * step, center, axis if len(center) == 3 else None) for i in range(count)
+    ])
+
+
+def is_rigid(matrix, tolerance=1e-9):
+    # Rotation and translation only (no scaling, shear or reflection)
+    linear = np.asarray(matrix, dtype=np.float64)[:-1, :-1]
+    return np.allclose(linear @ linear.T, np.eye(len(linear)), atol=tolerance) and np.linalg.det(linear) > 0
+
+
+def location(matrix):
+    # cadquery Location of a 3D matrix, for placing shapes without copying their geometry
+    import cadquery as cq
+    from OCP.gp import gp_Trsf
+    trsf = gp_Trsf()
+    trsf.SetValues(*np.asarray(matrix, dtype=np.float64)[:3, :4].ravel().tolist())
+    return cq.Location(trsf)
@@ -0,0 +1,160 @@
+import math
+import threading
+import cadquery as cq
+import numpy as np
+from ..cad import transforms
+from ..services.result_cache import digest
+
+# An assembly places instances of parts, where a part is an ordinary parametric
+# model of the ModelManager. Each part is built and tessellated once, by its own
+# model (cached per model revision); instances only add a transform. The
+# assembly's shape places the part shapes with locations, sharing their
+# geometry, and its data carries each part's mesh once plus the instance
+# transforms. Editing a part rebuilds that part's model only; the assembly
+# picks up the new revision the next time it is read.
+
+
+def parse_transform(value):
+    # None, a 4x4 matrix (nested lists) or {"translation": [x, y, z],
+    # "rotation": {"axis": [x, y, z], "angle": degrees, "center": [x, y, z]}}
+    if value is None:
+        return transforms.identity(3)
+    if isinstance(value, dict):
+        matrix = transforms.identity(3)
+        rotation = value.get('rotation')
+        if rotation:
+            matrix = transforms.rotation(math.radians(float(rotation.get('angle', 0.0))),
+                                         rotation.get('center', (0.0, 0.0, 0.0)), rotation.get('axis', (0.0, 0.0, 1.0)))
+        if value.get('translation') is not None:
+            matrix = transforms.translation(transforms.as_vector(value['translation'], 3)) @ matrix
+    else:
+        try:
+            matrix = np.array(value, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid transform")
+    if matrix.shape != (4, 4) or not np.isfinite(matrix).all():
+        raise ValueError("Transform must be a 4x4 matrix")
+    if not np.allclose(matrix[3], (0.0, 0.0, 0.0, 1.0)) or not transforms.is_rigid(matrix, 1e-6):
+        raise ValueError("Instance transforms may only rotate and translate")
+    return matrix
+
+
+def _box_corners(box):
+    (xmin, ymin, zmin), (xmax, ymax, zmax) = box['min'], box['max']
+    return np.array([(x, y, z) for x in (xmin, xmax) for y in (ymin, ymax) for z in (zmin, zmax)])
+
+
+class Assembly:
+    def __init__(self, model_manager, name=None):
+        self.model_manager = model_manager
+        self.name = name
+        self.instances = []
+        self._next_instance_id = 0
+        # Bumped on structural edits and when a part's model has been rebuilt
+        self._revision = 0
+        self._part_revisions = {}
+        # Bumped on structural edits only
+        self._instances_revision = 0
+        self._shape = None
+        self._lock = threading.RLock()
+
+    def part(self, model_id):
+        model = self.model_manager.get_model(model_id)
+        if model is None:
+            raise ValueError(f"Unknown model: {model_id}")
+        return model
+
+    def part_ids(self):
+        # In order of first use
+        return list(dict.fromkeys(instance['modelId'] for instance in self.instances))
+
+    def add_instance(self, model_id, transform=None, name=None):
+        self.part(model_id)
+        with self._lock:
+            instance_id = self._next_instance_id
+            self._next_instance_id += 1
+            self.instances.append({
+                'id': instance_id,
+                'modelId': model_id,
+                'name': name or f'{model_id}:{instance_id}',
+                'transform': parse_transform(transform)
+            })
+            self._revision += 1
+            self._instances_revision += 1
+        return instance_id
+
+    def instance(self, instance_id):
+        for instance in self.instances:
+            if instance['id'] == instance_id:
+                return instance
+        raise ValueError(f"Invalid instance ID: {instance_id}")
+
+    def set_transform(self, instance_id, transform):
+        matrix = parse_transform(transform)
+        with self._lock:
+            self.instance(instance_id)['transform'] = matrix
+            self._revision += 1
+            self._instances_revision += 1
+
+    def remove_instance(self, instance_id):
+        with self._lock:
+            instance = self.instance(instance_id)
+            self.instances.remove(instance)
+            self._revision += 1
+            self._instances_revision += 1
+        return instance
+
+    @property
+    def revision(self):
+        with self._lock:
+            part_revisions = {model_id: self.part(model_id).revision for model_id in self.part_ids()}
+            if part_revisions != self._part_revisions:
+                self._part_revisions = part_revisions
+                self._revision += 1
+            return self._revision
+
+    @property
+    def geometry_revision(self):
+        # Changes with the instances and with the parts' rebuild results, not
+        # with their display (colors, hidden faces); exports are cached on it
+        with self._lock:
+            return digest(self._instances_revision,
+                          [(model_id, self.part(model_id).geometry_revision) for model_id in self.part_ids()])
+
+    def shape(self):
+        # Compound of the placed part shapes, cached per revision
+        with self._lock:
+            revision = self.revision
+            if self._shape is None or self._shape[0] != revision:
+                shapes = {model_id: self.part(model_id)._shape() for model_id in self.part_ids()}
+                placed = [
+                    shapes[instance['modelId']].moved(transforms.location(instance['transform']))
+                    for instance in self.instances if shapes[instance['modelId']] is not None
+                ]
+                self._shape = (revision, cq.Compound.makeCompound(placed) if placed else None)
+            return self._shape[1]
+
+    def get_model(self):
+        # Same interface as ParametricModel, for exports
+        shape = self.shape()
+        return cq.Workplane('XY').newObject([shape] if shape is not None else [])
+
+    def bounding_box(self):
+        # Box around the transformed boxes of the parts' exact geometry
+        boxes = {model_id: self.part(model_id).bounding_box() for model_id in self.part_ids()}
+        corners = [
+            transforms.apply(_box_corners(boxes[instance['modelId']]), instance['transform'])
+            for instance in self.instances if boxes[instance['modelId']] is not None
+        ]
+        if not corners:
+            return None
+        corners = np.concatenate(corners)
+        return {"min": corners.min(axis=0).tolist(), "max": corners.max(axis=0).tolist()}
+
+    def get_instances(self):
+        return [{
+            'id': instance['id'],
+            'modelId': instance['modelId'],
+            'name': instance['name'],
+            'transform': instance['transform']
+        } for instance in self.instances]
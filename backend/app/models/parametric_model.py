@@ -1,58 +1,348 @@
+import time
 import cadquery as cq
+import numpy as np
+from OCP.Bnd import Bnd_Box
+from OCP.BRep import BRep_Tool
+from OCP.BRepBndLib import BRepBndLib
+from OCP.TopAbs import TopAbs_Orientation
+from OCP.TopLoc import TopLoc_Location
+from ..cad import boolean_ops
+from ..cad.feature_registry import FeatureRegistry
+from ..services.metrics import count_boolean_operations, metrics, record_timing
+from ..services.result_cache import ResultCache, digest
+
+# Hiding a feature is a display setting where possible. Every rebuild records
+# which feature contributed each face of the result, so hiding a feature that
+# adds material only drops its faces from the tessellation of the current
+# geometry; nothing is rebuilt. Features that remove material cannot be hidden
+# that way and are suppressed instead: the model is rebuilt without them.
+#
+# Rebuild results (geometry, face owners and tessellation) are kept for the
+# last few combinations of parameters, features and suppressed features, so
+# toggling a suppression back, or dragging a parameter back to a previous
+# value, reuses the cached result instead of replaying the features.
+
+def _shape_of(workplane):
+    shapes = [value for value in workplane.vals() if isinstance(value, cq.Shape)]
+    return cq.Compound.makeCompound(shapes) if len(shapes) > 1 else (shapes[0] if shapes else None)
+
+
+def _tessellate(shape, tolerance, angular_tolerance=0.1):
+    # As cq.Shape.tessellate, plus the index (in shape.Faces()) of the face
+    # each triangle belongs to
+    shape.mesh(tolerance, angular_tolerance)
+    vertices, triangles, triangle_faces = [], [], []
+    offset = 0
+    for index, face in enumerate(shape.Faces()):
+        location = TopLoc_Location()
+        poly = BRep_Tool.Triangulation_s(face.wrapped, location)
+        if poly is None:
+            continue
+        trsf = location.Transformation()
+        nodes = [poly.Node(i).Transformed(trsf) for i in range(1, poly.NbNodes() + 1)]
+        vertices.append(np.array([(node.X(), node.Y(), node.Z()) for node in nodes], dtype=np.float64).reshape(-1, 3))
+        face_triangles = np.array([(t.Value(1), t.Value(2), t.Value(3)) for t in poly.Triangles()],
+                                  dtype=np.int64).reshape(-1, 3) + (offset - 1)
+        if face.wrapped.Orientation() == TopAbs_Orientation.TopAbs_REVERSED:
+            face_triangles = face_triangles[:, [0, 2, 1]]
+        triangles.append(face_triangles)
+        triangle_faces.append(np.full(len(face_triangles), index, dtype=np.int64))
+        offset += len(nodes)
+    if not vertices:
+        return np.empty((0, 3)), np.empty((0, 3), dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(vertices), np.concatenate(triangles), np.concatenate(triangle_faces)
+
+
+def _face_owners(owners, histories, shape, feature_id):
+    # Face of shape -> id of the feature that created it. Faces the feature's
+    # booleans only split or trimmed keep the owner of the face they came from
+    # (followed through the recorded OCC histories); the rest are the
+    # feature's own. Features that did not go through boolean_ops fall back to
+    # matching unchanged faces.
+    if histories:
+        traced = {}
+        for face, owner in owners.items():
+            for result in boolean_ops.trace(histories, face):
+                traced.setdefault(result, owner)
+        owners = traced
+    return {face: owners.get(face, feature_id) for face in shape.Faces()}
+
+
+def _resolve(args, kwargs, parameters):
+    # Feature arguments with names of model parameters replaced by their values
+    def value(arg):
+        return parameters.get(arg, arg) if isinstance(arg, str) else arg
+    return [value(arg) for arg in args], {k: value(v) for k, v in kwargs.items()}
+
 
 class ParametricModel:
+    # Rebuild results kept per model
+    variant_cache_size = 4
+
     def __init__(self):
         self.parameters = {}
         self.features = []
         self.workplane = cq.Workplane("XY")
+        # Bumped on every rebuild (and display change) so derived data (exports,
+        # meshes) can be cached per revision
+        self.revision = 0
+        # Revision at which the rebuild result last changed; display changes
+        # (colors, hidden faces) and rebuilds that reuse the same cached result
+        # keep it, so exports and analysis meshes are cached on it
+        self.geometry_revision = 0
+        # Called with the model after every rebuild or display change
+        self.rebuild_listeners = []
+        self.tolerance = 0.1
+        # Current rebuild result: workplane, face owners and (once computed) mesh
+        self._variant = {"workplane": self.workplane, "faceFeatures": np.empty(0, dtype=np.int64), "mesh": None}
+        self._variants = ResultCache(self.variant_cache_size)
+        self._visible_triangles = None
+        self._geometry_variant = self._variant
 
     def add_parameter(self, name, value):
         self.parameters[name] = value
 
     def update_parameter(self, name, value):
         if name in self.parameters:
+            parameters = dict(self.parameters)
+            parameters[name] = value
+            for feature in self.features:
+                self._check_feature(feature['type'], feature['args'], feature['kwargs'], parameters)
             self.parameters[name] = value
             self.rebuild()
         else:
             raise ValueError(f"Parameter {name} does not exist")
 
     def add_feature(self, feature_func, *args, **kwargs):
+        # Invalid arguments are refused before the feature becomes part of the model
+        self._check_feature(feature_func.__name__, args, kwargs, self.parameters)
         feature_id = len(self.features)
         self.features.append({
             'id': feature_id,
+            'type': feature_func.__name__,
             'func': feature_func,
             'args': args,
             'kwargs': kwargs,
             'visible': True,
+            # Left out of the rebuild
+            'suppressed': False,
             'color': (0.7, 0.7, 0.7)  # Default color (light gray)
         })
         return feature_id
 
-    def set_feature_visibility(self, feature_id, visible):
+    def get_feature(self, feature_id):
         if 0 <= feature_id < len(self.features):
-            self.features[feature_id]['visible'] = visible
-            self.rebuild()
+            return self.features[feature_id]
+        raise ValueError(f"Invalid feature ID: {feature_id}")
+
+    def is_additive(self, feature):
+        try:
+            spec = FeatureRegistry.get_instance().get(feature['type'])
+        except ValueError:
+            return False
+        return spec.is_additive(*_resolve(feature['args'], feature['kwargs'], self.parameters))
+
+    def _check_feature(self, feature_type, args, kwargs, parameters):
+        try:
+            spec = FeatureRegistry.get_instance().get(feature_type)
+        except ValueError:
+            return
+        spec.check(*_resolve(args, kwargs, parameters))
+
+    def set_feature_visibility(self, feature_id, visible):
+        # Hides the feature's faces, or suppresses it if it removes material
+        feature = self.get_feature(feature_id)
+        feature['visible'] = visible
+        if self.is_additive(feature):
+            self._changed()
         else:
-            raise ValueError(f"Invalid feature ID: {feature_id}")
+            feature['suppressed'] = not visible
+            self.rebuild()
 
-    def set_feature_color(self, feature_id, color):
-        if 0 <= feature_id < len(self.features):
-            self.features[feature_id]['color'] = color
+    def set_feature_suppressed(self, feature_id, suppressed):
+        feature = self.get_feature(feature_id)
+        feature['suppressed'] = suppressed
+        if not self.is_additive(feature):
+            feature['visible'] = not suppressed
+        self.rebuild()
+
+    def restore_feature_state(self, feature_id, visible, suppressed):
+        feature = self.get_feature(feature_id)
+        rebuild = feature['suppressed'] != suppressed
+        feature['visible'], feature['suppressed'] = visible, suppressed
+        if rebuild:
             self.rebuild()
         else:
-            raise ValueError(f"Invalid feature ID: {feature_id}")
+            self._changed()
+
+    def hidden_features(self):
+        # Features whose faces are left out of the tessellation
+        return sorted(f['id'] for f in self.features if not f['visible'] and not f['suppressed'])
+
+    def set_feature_color(self, feature_id, color):
+        # Display only, the geometry is unchanged
+        self.get_feature(feature_id)['color'] = color
+        self._changed()
 
     def rebuild(self):
-        self.workplane = cq.Workplane("XY")
+        profiling = metrics.active()
+        if profiling:
+            start = time.perf_counter()
+            if metrics.enabled:
+                count_boolean_operations()
+
+        key = self._variant_key()
+        variant = self._variants.get(key) if key is not None else None
+        if metrics.enabled:
+            metrics.rebuild_variants.inc('hit' if variant is not None else 'miss')
+        if variant is None:
+            variant = self._replay(profiling)
+            if key is not None:
+                self._variants.put(key, variant)
+        self._variant = variant
+        self.workplane = variant['workplane']
+
+        if profiling:
+            elapsed = time.perf_counter() - start
+            if metrics.enabled:
+                metrics.rebuild_seconds.observe(value=elapsed)
+            record_timing('rebuild', elapsed)
+        self._changed()
+
+    def _variant_key(self):
+        # None if a feature's result must not be cached. Only argument values
+        # that affect geometry (model parameters resolved) are part of the key,
+        # so edits to other arguments or to unused model parameters reuse it
+        registry = FeatureRegistry.get_instance()
+        key = []
         for feature in self.features:
-            if feature['visible']:
-                func = feature['func']
-                args = [self.parameters.get(arg, arg) for arg in feature['args']]
-                kwargs = {k: self.parameters.get(v, v) for k, v in feature['kwargs'].items()}
-                self.workplane = func(self.workplane, *args, **kwargs)
+            try:
+                spec = registry.get(feature['type'])
+            except ValueError:
+                return None
+            if not spec.cacheable:
+                return None
+            args, kwargs = _resolve(feature['args'], feature['kwargs'], self.parameters)
+            key.append((feature['type'], spec.geometry_args(args, kwargs), feature['suppressed']))
+        return digest(key)
+
+    def _replay(self, profiling=False):
+        workplane = cq.Workplane("XY")
+        # Face -> id of the feature that created it
+        owners = {}
+        for feature in self.features:
+            if feature['suppressed']:
+                continue
+            func = feature['func']
+            args, kwargs = _resolve(feature['args'], feature['kwargs'], self.parameters)
+            with boolean_ops.record_history() as histories:
+                if profiling:
+                    workplane = self._profile_feature(feature['type'], func, workplane, args, kwargs)
+                else:
+                    workplane = func(workplane, *args, **kwargs)
+            shape = _shape_of(workplane)
+            owners = _face_owners(owners, histories, shape, feature['id']) if shape is not None else {}
+
+        shape = _shape_of(workplane)
+        face_features = [owners[face] for face in shape.Faces()] if shape is not None else []
+        return {"workplane": workplane, "faceFeatures": np.array(face_features, dtype=np.int64), "mesh": None}
+
+    def _changed(self):
+        self.revision += 1
+        if self._variant is not self._geometry_variant:
+            self.geometry_revision = self.revision
+            self._geometry_variant = self._variant
+        for listener in self.rebuild_listeners:
+            listener(self)
+
+    def clear_cache(self):
+        # Drops cached rebuild results and the current tessellation
+        self._variants.clear()
+        self._variant['mesh'] = None
+        self._visible_triangles = None
 
     def get_model(self):
         return self.workplane
 
+    def _profile_feature(self, feature_type, func, workplane, args, kwargs):
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        workplane = func(workplane, *args, **kwargs)
+        elapsed, cpu = time.perf_counter() - start, time.thread_time() - cpu_start
+
+        if metrics.enabled:
+            metrics.feature_seconds.observe(feature_type, value=elapsed)
+            metrics.feature_cpu_seconds.inc(feature_type, amount=cpu)
+            shape = _shape_of(workplane)
+            if shape is not None:
+                metrics.feature_faces.observe(feature_type, value=len(shape.Faces()))
+                metrics.feature_edges.observe(feature_type, value=len(shape.Edges()))
+        record_timing(f'feature-{feature_type}', elapsed)
+        return workplane
+
+    def _shape(self):
+        return _shape_of(self.workplane)
+
+    def _mesh(self):
+        # (vertices (N, 3), triangles (T, 3), face index of each triangle) of
+        # the current geometry, hidden features included
+        variant = self._variant
+        if variant['mesh'] is None or variant['mesh'][0] != self.tolerance:
+            shape = self._shape()
+            if shape is None:
+                mesh = np.empty((0, 3)), np.empty((0, 3), dtype=np.int64), np.empty(0, dtype=np.int64)
+            else:
+                with metrics.timed('tessellation', metrics.tessellation_seconds):
+                    mesh = _tessellate(shape, self.tolerance)
+            variant['mesh'] = (self.tolerance,) + mesh
+        return variant['mesh'][1:]
+
+    def tessellation(self):
+        # (vertices (N, 3), triangles (T, 3)) without the faces of hidden features
+        vertices, triangles, triangle_faces = self._mesh()
+        hidden = self.hidden_features()
+        if not hidden:
+            return vertices, triangles
+        cached = self._visible_triangles
+        if cached is None or cached[0] is not triangles or cached[1] != hidden:
+            hidden_faces = np.isin(self._variant['faceFeatures'], hidden)
+            cached = self._visible_triangles = (triangles, hidden, triangles[~hidden_faces[triangle_faces]])
+        return vertices, cached[2]
+
+    def bounding_box(self):
+        shape = self._shape()
+        if shape is None:
+            return None
+        # From the exact geometry, not the tessellation, so it does not depend
+        # on whether the model has been tessellated yet
+        box = Bnd_Box()
+        BRepBndLib.AddOptimal_s(shape.wrapped, box, False, False)
+        xmin, ymin, zmin, xmax, ymax, zmax = box.Get()
+        return {"min": [xmin, ymin, zmin], "max": [xmax, ymax, zmax]}
+
+    def vertices(self):
+        return self.tessellation()[0]
+
+    def faces(self):
+        return self.tessellation()[1]
+
+    def edges(self):
+        # One polyline (K, 3) per edge of the faces that are shown
+        shape = self._shape()
+        if shape is None:
+            return []
+        hidden = set(self.hidden_features())
+        if hidden:
+            owners = self._variant['faceFeatures']
+            edges = list(dict.fromkeys(
+                edge for face, owner in zip(shape.Faces(), owners) if owner not in hidden for edge in face.Edges()
+            ))
+        else:
+            edges = shape.Edges()
+        return [
+            np.array([point.toTuple() for point in edge.sample(self.tolerance)[0]], dtype=np.float64)
+            for edge in edges
+        ]
+
     def get_features(self):
-        return [{'id': f['id'], 'visible': f['visible'], 'color': f['color']} for f in self.features]
\ No newline at end of file
+        return [{'id': f['id'], 'visible': f['visible'], 'suppressed': f['suppressed'], 'color': f['color']}
+                for f in self.features]
\ No newline at end of file
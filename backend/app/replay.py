@@ -0,0 +1,112 @@
+import argparse
+import cProfile
+import io
+import json
+import pstats
+import time
+
+# Re-runs a request captured by the slow request recorder against a fresh
+# in-process app: the captured model is imported into the ModelManager and the
+# request is sent again, with the model id replaced by the imported one.
+#
+#   cd backend && python -m app.replay slow_requests/<capture>.json --repeat 3 --profile
+#
+# For native (OCC) frames run it under a native profiler instead, e.g.
+#   py-spy record --native -o profile.svg -- python -m app.replay <capture>.json
+
+
+def load_capture(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def prepare(capture, model_manager):
+    # Imports the captured model; returns its new id (None if there was none)
+    if not capture.get('model'):
+        return None
+    return model_manager.import_model(json.dumps(capture['model']))
+
+
+def replay_request(client, capture, model_id):
+    request = capture['request']
+    if request.get('files'):
+        raise ValueError("Requests with file uploads cannot be replayed")
+
+    path = request['path']
+    body = request.get('json')
+    if model_id is not None and capture.get('modelId'):
+        path = path.replace(capture['modelId'], model_id)
+        if isinstance(body, dict) and 'modelId' in body:
+            body = dict(body, modelId=model_id)
+    return client.open(path, method=request['method'], query_string=request.get('query'), json=body)
+
+
+def replay(capture, repeat=1, profile=False, fresh_model=True):
+    from . import create_app
+    from .cad.model_manager import ModelManager
+    from .services.cad_pool import CadPool
+
+    # CAD work runs on this thread so cProfile sees it; the process's pool is
+    # put back afterwards
+    previous_pool = CadPool._instance
+    CadPool._instance = CadPool(max_workers=1, inline=True)
+    try:
+        app = create_app('testing')
+        client = app.test_client()
+        model_manager = ModelManager.get_instance()
+        profiler = cProfile.Profile() if profile else None
+
+        model_id = prepare(capture, model_manager)
+        timings = []
+        for _ in range(repeat):
+            if fresh_model and timings:
+                # Each run starts from the captured state, not the previous run's result
+                model_id = prepare(capture, model_manager)
+            start = time.perf_counter()
+            if profiler:
+                profiler.enable()
+            response = replay_request(client, capture, model_id)
+            if profiler:
+                profiler.disable()
+            timings.append((time.perf_counter() - start, response.status_code))
+    finally:
+        CadPool._instance.executor.shutdown(wait=False)
+        CadPool._instance = previous_pool
+    return timings, profiler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a captured slow request")
+    parser.add_argument('capture', help="capture file written by the slow request recorder")
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--profile', action='store_true', help="profile the replays with cProfile")
+    parser.add_argument('--sort', default='cumulative', help="pstats sort key")
+    parser.add_argument('--limit', type=int, default=30, help="number of profile rows to print")
+    parser.add_argument('--stats', help="write the cProfile stats to this file (for snakeviz etc.)")
+    parser.add_argument('--folded', help="write the captured stack samples in folded format to this file")
+    args = parser.parse_args(argv)
+
+    capture = load_capture(args.capture)
+    request = capture['request']
+    print(f"{request['method']} {request['path']}: captured {capture['durationSeconds'] * 1000:.1f} ms, "
+          f"status {capture['status']}, {capture['profile']['samples']} stack samples")
+
+    if args.folded:
+        with open(args.folded, 'w') as f:
+            for entry in capture['profile']['stacks']:
+                f.write(f"{entry['stack']} {entry['count']}\n")
+
+    timings, profiler = replay(capture, args.repeat, args.profile)
+    for i, (seconds, status) in enumerate(timings, 1):
+        print(f"  run {i}: {seconds * 1000:9.1f} ms  status {status}")
+
+    if profiler:
+        if args.stats:
+            profiler.dump_stats(args.stats)
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats(args.sort).print_stats(args.limit)
+        print(output.getvalue())
+
+
+if __name__ == '__main__':
+    main()
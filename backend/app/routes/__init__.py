@@ -1,7 +1,13 @@
-from flask import Blueprint
+from flask import Blueprint, Response
 
 main = Blueprint('main', __name__)
 
 @main.route('/api/test')
 def test():
-    return {'message': 'Test route is working!'}
\ No newline at end of file
+    return {'message': 'Test route is working!'}
+
+# Prometheus scrape endpoint (per worker process)
+@main.route('/metrics')
+def prometheus_metrics():
+    from ..services.metrics import metrics
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -1,8 +1,12 @@
-from flask import request, jsonify
-from .model_manager import ModelManager
-from .parametric_feature_functions import circular_cut, concentric_extrude, mirror_feature
+from flask import Blueprint, request, jsonify
+from ..cad.model_manager import ModelManager
+from ..cad.feature_registry import FeatureRegistry
+from ..services.cad_pool import cad_route
 
-@app.route('/api/add_feature', methods=['POST'])
+add_feature_blueprint = Blueprint('add_feature', __name__)
+
+@add_feature_blueprint.route('/add_feature', methods=['POST'])
+@cad_route
 def add_feature():
     data = request.json
     model_id = data.get('modelId')
@@ -12,20 +16,22 @@ def add_feature():
     if not all([model_id, feature_type]):
         return jsonify({"success": False, "error": "Missing required parameters"}), 400
 
+    model_manager = ModelManager.get_instance()
+    model = model_manager.get_model(model_id)
     try:
-        model_manager = ModelManager.get_instance()
-        
-        if feature_type == 'circular_cut':
-            model_manager.add_feature(model_id, circular_cut, parameters['radius'], parameters['depth'])
-        elif feature_type == 'concentric_extrude':
-            model_manager.add_feature(model_id, concentric_extrude, parameters['outerRadius'], parameters['innerRadius'], parameters['height'])
-        elif feature_type == 'mirror':
-            model_manager.add_feature(model_id, mirror_feature, parameters['mirrorPlane'])
-        else:
-            return jsonify({"success": False, "error": f"Unknown feature type: {feature_type}"}), 400
+        spec = FeatureRegistry.get_instance().get(feature_type)
+        args = spec.bind(parameters, model.parameters if model else {})
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
 
+    try:
+        model_manager.add_feature(model_id, spec.load(), *args)
         model_manager.rebuild_model(model_id)
         updated_model_data = model_manager.get_model_data(model_id)
         return jsonify({"success": True, "updatedModel": updated_model_data})
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 400
\ No newline at end of file
+        return jsonify({"success": False, "error": str(e)}), 400
+
+@add_feature_blueprint.route('/feature_types', methods=['GET'])
+def feature_types():
+    return jsonify({"success": True, "featureTypes": FeatureRegistry.get_instance().describe()})
@@ -1,8 +1,42 @@
-from flask import Blueprint, request, jsonify
+import json
+import math
+import time
+from flask import Blueprint, current_app, request, jsonify
 from .structural_analysis import StructuralAnalysis
+from ..services.calculix_runner import CalculixRunner
+from ..services.cad_pool import CadPoolBusy, cad_pool
+from ..services.event_streams import event_stream
 
 structural_analysis = Blueprint('structural_analysis', __name__)
 
+def _calculix_runner():
+    return CalculixRunner.get_instance(
+        ccx_path=current_app.config.get('CALCULIX_PATH'),
+        work_dir=current_app.config.get('CALCULIX_WORK_DIR'),
+        core_budget=current_app.config.get('CALCULIX_CORE_BUDGET'),
+        threads_per_job=current_app.config.get('CALCULIX_THREADS_PER_JOB'),
+        timeout=current_app.config.get('CALCULIX_TIMEOUT'),
+        job_ttl=current_app.config.get('CALCULIX_JOB_TTL')
+    )
+
+def _mesh_options(data):
+    # (meshSize, elementOrder) of an analysis request; ValueError if invalid
+    mesh_size = data.get('meshSize')
+    if mesh_size is not None:
+        try:
+            mesh_size = None if isinstance(mesh_size, bool) else float(mesh_size)
+        except (TypeError, ValueError):
+            mesh_size = None
+        if mesh_size is None or not math.isfinite(mesh_size) or mesh_size <= 0:
+            raise ValueError(f"meshSize must be a positive number: {data.get('meshSize')!r}")
+    element_order = data.get('elementOrder', 1)
+    if isinstance(element_order, bool) or element_order not in (1, 2):
+        raise ValueError(f"elementOrder must be 1 or 2: {element_order!r}")
+    return mesh_size, element_order
+
+# Meshing reads the model's geometry and runs on a CAD thread; the solver then
+# runs on this request thread (or in the background), so a long CalculiX run
+# never holds the CAD thread
 @structural_analysis.route('/analyze', methods=['POST'])
 def analyze():
     data = request.json
@@ -10,13 +44,83 @@ def analyze():
     material_properties = data.get('materialProperties')
     loads = data.get('loads')
     constraints = data.get('constraints')
+    # Several load cases ({"name", "loads", "constraints"}) can be solved
+    # against one mesh instead of a single set of loads and constraints
+    load_cases = data.get('loadCases')
 
-    if not all([model_id, material_properties, loads, constraints]):
+    if not all([model_id, material_properties]) or not (load_cases or all([loads, constraints])):
         return jsonify({"success": False, "error": "Missing required parameters"}), 400
 
     try:
-        analysis = StructuralAnalysis(model_id)
-        results = analysis.perform_analysis(material_properties, loads, constraints)
-        return jsonify({"success": True, "results": results})
+        mesh_size, element_order = _mesh_options(data)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    try:
+        runner = _calculix_runner()
+        analysis = StructuralAnalysis(model_id, mesh_size, element_order)
+        if analysis.model is None:
+            return jsonify({"success": False, "error": f"Model not found: {model_id}"}), 404
+        cad_pool().run(analysis.generate_mesh)
+        if load_cases:
+            task = analysis.perform_load_cases
+            args = (material_properties, load_cases, data.get('solverRuns', 1))
+        else:
+            task = analysis.perform_analysis
+            args = (material_properties, loads, constraints)
+
+        # Long analyses can run in the background and be polled via /analysis_jobs
+        if data.get('async'):
+            job = runner.submit(task, *args)
+            return jsonify({"success": True, "jobId": job['id']}), 202
+
+        results, failure_points = task(*args)
+        return jsonify({"success": True, "results": results, "failurePoints": failure_points})
+    except CadPoolBusy as e:
+        return jsonify({"success": False, "error": str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"success": False, "error": str(e)}), 500
+
+def _job_status(job):
+    response = {"success": True, "jobId": job['id'], "status": job['status'], "error": job['error'],
+                "progress": job['progress']}
+    if job['status'] == 'done':
+        response['results'], response['failurePoints'] = job['result']
+    return response
+
+@structural_analysis.route('/analysis_jobs/<job_id>', methods=['GET'])
+def analysis_job_status(job_id):
+    job = _calculix_runner().get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": f"Analysis job not found: {job_id}"}), 404
+    return jsonify(_job_status(job))
+
+# Server-sent events: a "progress" event whenever the solver log of the job
+# advances, then a final "done" or "failed" event carrying the full status.
+@structural_analysis.route('/analysis_jobs/<job_id>/events', methods=['GET'])
+def analysis_job_events(job_id):
+    job = _calculix_runner().get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": f"Analysis job not found: {job_id}"}), 404
+    poll_interval = current_app.config.get('ANALYSIS_EVENTS_POLL_INTERVAL', 0.25)
+
+    def generate():
+        sequence = None
+        idle = 0.0
+        while True:
+            if job['status'] in ('done', 'failed'):
+                yield f"event: {job['status']}\ndata: {json.dumps(_job_status(job))}\n\n"
+                return
+            if job['sequence'] != sequence:
+                sequence = job['sequence']
+                idle = 0.0
+                payload = {"jobId": job_id, "status": job['status'], "progress": job['progress']}
+                yield f"event: progress\ndata: {json.dumps(payload)}\n\n"
+            elif idle >= 15:
+                # Comment line keeps proxies from closing an idle connection
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            time.sleep(poll_interval)
+            idle += poll_interval
+
+    return event_stream(generate)
@@ -0,0 +1,122 @@
+from flask import Blueprint, current_app, request, jsonify
+from ..cad.assembly_manager import AssemblyManager
+from ..cad.model_manager import ModelManager
+from ..services.cad_pool import CadPoolBusy, cad_pool, cad_route
+from .export_import import export_response
+
+assemblies = Blueprint('assemblies', __name__)
+
+assembly_manager = AssemblyManager.get_instance()
+
+def _not_found(assembly_id):
+    return jsonify({"success": False, "error": f"Assembly not found: {assembly_id}"}), 404
+
+def _instance_data(assembly, instance_id):
+    instance = next(i for i in assembly.get_instances() if i['id'] == instance_id)
+    return {"success": True, "instance": instance, "revision": assembly.revision}
+
+@assemblies.route('/assemblies', methods=['POST'])
+def create_assembly():
+    data = request.get_json(silent=True) or {}
+    assembly_id = assembly_manager.create_assembly(data.get('name'))
+    return jsonify({"success": True, "assemblyId": assembly_id})
+
+# Parts' meshes once, plus the instance transforms. Like models, the ETag is
+# the revision, which changes when an instance or a part changes. As for
+# models, the revision check stays on the request thread and the parts are
+# built and tessellated on a CAD thread.
+@assemblies.route('/assemblies/<assembly_id>', methods=['GET'])
+def get_assembly(assembly_id):
+    assembly = assembly_manager.get_assembly(assembly_id)
+    if assembly is None:
+        return _not_found(assembly_id)
+
+    etag = f"{assembly_id}-{assembly.revision}"
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        try:
+            assembly_data = cad_pool().run(assembly_manager.get_assembly_data, assembly_id)
+        except CadPoolBusy as e:
+            return jsonify({"success": False, "error": str(e)}), 503, {'Retry-After': '1'}
+        etag = f"{assembly_id}-{assembly_data['revision']}"
+        response = jsonify({"success": True, "assembly": assembly_data})
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# Instance edits only change transforms, so they answer with the instance
+# rather than the assembly's geometry
+@assemblies.route('/assemblies/<assembly_id>/instances', methods=['POST'])
+def add_instance(assembly_id):
+    assembly = assembly_manager.get_assembly(assembly_id)
+    if assembly is None:
+        return _not_found(assembly_id)
+    data = request.json
+    model_id = data.get('modelId')
+    if not model_id:
+        return jsonify({"success": False, "error": "Missing required parameters"}), 400
+
+    try:
+        instance_id = assembly.add_instance(model_id, data.get('transform'), data.get('name'))
+        return jsonify(_instance_data(assembly, instance_id))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+@assemblies.route('/assemblies/<assembly_id>/instances/<int:instance_id>', methods=['POST'])
+def set_instance_transform(assembly_id, instance_id):
+    assembly = assembly_manager.get_assembly(assembly_id)
+    if assembly is None:
+        return _not_found(assembly_id)
+    data = request.json
+    if 'transform' not in data:
+        return jsonify({"success": False, "error": "Missing required parameters"}), 400
+
+    try:
+        assembly.set_transform(instance_id, data['transform'])
+        return jsonify(_instance_data(assembly, instance_id))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+@assemblies.route('/assemblies/<assembly_id>/instances/<int:instance_id>', methods=['DELETE'])
+def remove_instance(assembly_id, instance_id):
+    assembly = assembly_manager.get_assembly(assembly_id)
+    if assembly is None:
+        return _not_found(assembly_id)
+    try:
+        assembly.remove_instance(instance_id)
+        return jsonify({"success": True, "revision": assembly.revision})
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+
+# Editing a part rebuilds that part only; the response carries the part's new
+# geometry, which every instance of it shares
+@assemblies.route('/assemblies/<assembly_id>/parts/<model_id>/update_parameter', methods=['POST'])
+@cad_route
+def update_part_parameter(assembly_id, model_id):
+    data = request.json
+    parameter_name = data.get('parameterName')
+    new_value = data.get('newValue')
+    if parameter_name is None or new_value is None:
+        return jsonify({"success": False, "error": "Missing required parameters"}), 400
+
+    try:
+        assembly_manager.update_part_parameter(assembly_id, model_id, parameter_name, new_value)
+        return jsonify({
+            "success": True,
+            "revision": assembly_manager.get_assembly(assembly_id).revision,
+            "updatedPart": ModelManager.get_instance().get_model_data(model_id)
+        })
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+# The assembly's shape is placed (and its parts rebuilt, if needed) on a CAD thread
+@assemblies.route('/assemblies/<assembly_id>/export/<export_format>', methods=['GET'])
+@cad_route
+def export_assembly(assembly_id, export_format):
+    assembly = assembly_manager.get_assembly(assembly_id)
+    if assembly is None:
+        return _not_found(assembly_id)
+    options = request.args.to_dict()
+    run_async = options.pop('async', '').lower() in ('1', 'true', 'yes')
+    return export_response(assembly_id, assembly, export_format, options, run_async, name='assembly')
@@ -1,13 +1,17 @@
-import cadquery as cq
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, current_app, request, jsonify
 from ..cad.model_manager import ModelManager
-from ..cad.parametric_feature_functions import circular_cut, concentric_extrude, mirror_feature
+from ..cad.feature_registry import FeatureRegistry
+from ..services.cad_pool import CadPoolBusy, cad_pool, cad_route
+from ..services.event_streams import event_stream
+from ..services.model_events import ModelEventHub
 
 # Create a Blueprint
 cad_operations = Blueprint('cad_operations', __name__)
 
 # Initialize the ModelManager singleton
 model_manager = ModelManager.get_instance()
+features = FeatureRegistry.get_instance()
 
 # Route to create a new model
 @cad_operations.route('/create_new_model', methods=['POST'])
@@ -20,6 +24,7 @@ def create_new_model():
 
 # Route to perform a circular cut on a model
 @cad_operations.route('/circular_cut', methods=['POST'])
+@cad_route
 def circular_cut():
     data = request.json
     model_id = data.get('modelId')
@@ -31,7 +36,7 @@ def circular_cut():
         return jsonify({"success": False, "error": "Missing required parameters"}), 400
 
     try:
-        model_manager.add_feature(model_id, circular_cut, radius, depth)
+        model_manager.add_feature(model_id, features.resolve('circular_cut'), radius, depth)
         model_manager.rebuild_model(model_id)
         updated_model_data = model_manager.get_model_data(model_id)
         return jsonify({"success": True, "updatedModel": updated_model_data})
@@ -40,6 +45,7 @@ def circular_cut():
 
 # Route to perform a concentric extrude on a model
 @cad_operations.route('/concentric_extrude', methods=['POST'])
+@cad_route
 def concentric_extrude():
     data = request.json
     model_id = data.get('modelId')
@@ -52,7 +58,7 @@ def concentric_extrude():
         return jsonify({"success": False, "error": "Missing required parameters"}), 400
 
     try:
-        model_manager.add_feature(model_id, concentric_extrude, outer_radius, inner_radius, height)
+        model_manager.add_feature(model_id, features.resolve('concentric_extrude'), outer_radius, inner_radius, height)
         model_manager.rebuild_model(model_id)
         updated_model_data = model_manager.get_model_data(model_id)
         return jsonify({"success": True, "updatedModel": updated_model_data})
@@ -61,6 +67,7 @@ def concentric_extrude():
 
 # Route to mirror features of a model
 @cad_operations.route('/mirror', methods=['POST'])
+@cad_route
 def mirror():
     data = request.json
     model_id = data.get('modelId')
@@ -73,15 +80,91 @@ def mirror():
         return jsonify({"success": False, "error": "Missing required parameters"}), 400
 
     try:
-        model_manager.add_feature(model_id, mirror_feature, mirror_plane)
+        model_manager.add_feature(model_id, features.resolve('mirror_feature'), mirror_plane)
         model_manager.rebuild_model(model_id)
         updated_model_data = model_manager.get_model_data(model_id)
         return jsonify({"success": True, "updatedModel": updated_model_data})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 400
 
+# Route to add a linear pattern of holes (or bosses) to a model
+@cad_operations.route('/linear_pattern', methods=['POST'])
+@cad_route
+def linear_pattern():
+    return add_pattern('linear_pattern', request.json)
+
+# Route to add a circular pattern of holes (or bosses) to a model
+@cad_operations.route('/circular_pattern', methods=['POST'])
+@cad_route
+def circular_pattern():
+    return add_pattern('circular_pattern', request.json)
+
+def add_pattern(feature_type, data):
+    model_id = data.get('modelId')
+    if not model_id:
+        return jsonify({"success": False, "error": "Missing required parameters"}), 400
+
+    try:
+        spec = features.get(feature_type)
+        model = model_manager.get_model(model_id)
+        model_manager.add_feature(model_id, spec.load(), *spec.bind(data, model.parameters if model else {}))
+        model_manager.rebuild_model(model_id)
+        updated_model_data = model_manager.get_model_data(model_id)
+        return jsonify({"success": True, "updatedModel": updated_model_data})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+# Full model data. The ETag is the model revision, so a client that already
+# has the current revision gets 304 without the geometry being serialized.
+# The revision check stays on the request thread; tessellation (and a rebuild,
+# if needed) runs on a CAD thread like every other access to the geometry.
+@cad_operations.route('/models/<model_id>', methods=['GET'])
+def get_model(model_id):
+    model = model_manager.get_model(model_id)
+    if model is None:
+        return jsonify({"success": False, "error": f"Model not found: {model_id}"}), 404
+
+    etag = f"{model_id}-{model.revision}"
+    # Weak, so it also matches the compressed representations
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        try:
+            revision, model_data = cad_pool().run(lambda: (model.revision, model_manager.get_model_data(model_id)))
+        except CadPoolBusy as e:
+            return jsonify({"success": False, "error": str(e)}), 503, {'Retry-After': '1'}
+        etag = f"{model_id}-{revision}"
+        response = jsonify({"success": True, "model": model_data})
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# Server-sent events for a model: a "model" event with the full state on
+# connect, then one per rebuild carrying only what changed. Clients that fall
+# behind get a single event covering every rebuild they missed. Events carry
+# no mesh: when geometry.changed is set the client refetches GET /models/<id>.
+@cad_operations.route('/models/<model_id>/events', methods=['GET'])
+def model_events(model_id):
+    model = model_manager.get_model(model_id)
+    if model is None:
+        return jsonify({"success": False, "error": f"Model not found: {model_id}"}), 404
+    keepalive = current_app.config.get('MODEL_EVENTS_KEEPALIVE', 15)
+    subscription = ModelEventHub.get_instance().subscribe(model_id, model)
+
+    def generate():
+        while True:
+            delta = subscription.next_delta(timeout=keepalive)
+            if delta is None:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: model\nid: {delta['revision']}\ndata: {json.dumps(delta)}\n\n"
+
+    return event_stream(generate, on_close=subscription.close)
+
 # Route to update a parameter in the model
 @cad_operations.route('/update_parameter', methods=['POST'])
+@cad_route
 def update_parameter():
     data = request.json
     model_id = data.get('modelId')
@@ -92,8 +175,8 @@ def update_parameter():
         return jsonify({"success": False, "error": "Missing required parameters"}), 400
 
     try:
+        # Rebuilds (once) and notifies the model's subscribers
         model_manager.update_parameter(model_id, parameter_name, new_value)
-        model_manager.rebuild_model(model_id)
         updated_model_data = model_manager.get_model_data(model_id)
         return jsonify({"success": True, "updatedModel": updated_model_data})
     except Exception as e:
@@ -1,25 +1,41 @@
-from flask import Blueprint, request, jsonify, send_file
-from .model_manager import ModelManager
+from flask import Blueprint, Response, current_app, request, jsonify, send_file, stream_with_context
+from ..cad.model_manager import ModelManager
+from ..cad.bulk_transfer import iter_export_archive, import_archive
+from ..services.export_service import EXPORT_FORMATS, ExportService
+from ..services.cad_pool import CadPoolBusy, cad_pool
 import io
 import json
+import os
+import shutil
+import tempfile
+import zipfile
 
 export_import = Blueprint('export_import', __name__)
 
-@export_import.route('/export_model/<int:model_id>', methods=['GET'])
+@export_import.route('/export_model/<model_id>', methods=['GET'])
 def export_model(model_id):
+    export_format = request.args.get('format', 'json')
     try:
         model_manager = ModelManager.get_instance()
-        export_data = model_manager.export_model(model_id)
-        
-        # Create a BytesIO object
-        bytes_io = io.BytesIO(export_data.encode('utf-8'))
-        
+        export_data = model_manager.export_model(model_id, format=export_format)
+        if export_data is None:
+            return jsonify({"success": False, "error": f"Model not found: {model_id}"}), 404
+
+        if export_format == 'binary':
+            bytes_io = io.BytesIO(export_data)
+            mimetype = 'application/octet-stream'
+            filename = f'model_{model_id}.ccad'
+        else:
+            bytes_io = io.BytesIO(export_data.encode('utf-8'))
+            mimetype = 'application/json'
+            filename = f'model_{model_id}.json'
+
         # Send the file
         return send_file(
             bytes_io,
-            mimetype='application/json',
+            mimetype=mimetype,
             as_attachment=True,
-            attachment_filename=f'model_{model_id}.json'
+            download_name=filename
         )
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 400
@@ -33,17 +49,155 @@ def import_model():
         return jsonify({"success": False, "error": "No selected file"}), 400
     if file:
         try:
-            json_data = file.read().decode('utf-8')
-            # Validate JSON structure
-            json.loads(json_data)  # This will raise an exception if JSON is invalid
-            
+            # import_model detects binary archives and parses JSON itself. The
+            # upload is read on the request thread, the rebuild and tessellation
+            # run on a CAD thread
+            data = file.read()
             model_manager = ModelManager.get_instance()
-            model_id = model_manager.import_model(json_data)
-            model_data = model_manager.get_model_data(model_id)
+
+            def import_model():
+                model_id = model_manager.import_model(data)
+                return model_id, model_manager.get_model_data(model_id)
+
+            model_id, model_data = cad_pool().run(import_model)
             return jsonify({"success": True, "modelId": model_id, "modelData": model_data})
+        except CadPoolBusy as e:
+            return jsonify({"success": False, "error": str(e)}), 503, {'Retry-After': '1'}
         except json.JSONDecodeError:
             return jsonify({"success": False, "error": "Invalid JSON format"}), 400
         except ValueError as e:
             return jsonify({"success": False, "error": str(e)}), 400
         except Exception as e:
             return jsonify({"success": False, "error": f"An unexpected error occurred: {str(e)}"}), 500
+
+@export_import.route('/export_models', methods=['POST'])
+def export_models():
+    data = request.json or {}
+    export_format = data.get('format', 'binary')
+
+    model_manager = ModelManager.get_instance()
+    model_ids = data.get('modelIds') or list(model_manager.models.keys())
+
+    try:
+        chunks = iter_export_archive(model_manager, model_ids, format=export_format, run=cad_pool().run)
+        # Fail fast on bad arguments before the response starts streaming
+        first_chunk = next(chunks)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    def generate():
+        yield first_chunk
+        yield from chunks
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/zip',
+        headers={"Content-Disposition": "attachment; filename=models.zip"}
+    )
+
+@export_import.route('/import_models', methods=['POST'])
+def import_models():
+    if 'file' not in request.files:
+        return jsonify({"success": False, "error": "No file part"}), 400
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"success": False, "error": "No selected file"}), 400
+
+    try:
+        results = import_archive(ModelManager.get_instance(), file.stream, run=cad_pool().run,
+                                 max_entry_bytes=current_app.config.get('IMPORT_MAX_ENTRY_BYTES'))
+        imported = sum(1 for result in results if result['success'])
+        return jsonify({
+            "success": True,
+            "imported": imported,
+            "failed": len(results) - imported,
+            "results": results
+        })
+    except zipfile.BadZipFile:
+        return jsonify({"success": False, "error": "Invalid archive"}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": f"An unexpected error occurred: {str(e)}"}), 500
+
+@export_import.route('/import_dxf', methods=['POST'])
+def import_dxf():
+    if 'file' not in request.files:
+        return jsonify({"success": False, "error": "No file part"}), 400
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"success": False, "error": "No selected file"}), 400
+    if not file.filename.lower().endswith('.dxf'):
+        return jsonify({"success": False, "error": "Invalid file type"}), 400
+
+    # ezdxf is only loaded by workers that import DXF files
+    from ezdxf import DXFError
+    from ..services.import_dxf import FLATTENING_DISTANCE, read_dxf
+
+    # The reader streams from disk, so the upload is spooled to a temporary file
+    fd, path = tempfile.mkstemp(suffix='.dxf')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            shutil.copyfileobj(file.stream, f, 1024 * 1024)
+        geometry = cad_pool().run(read_dxf, path, float(request.form.get('flatteningDistance', FLATTENING_DISTANCE)))
+        return jsonify({"success": True, "geometry": geometry.to_dict()})
+    except CadPoolBusy as e:
+        return jsonify({"success": False, "error": str(e)}), 503, {'Retry-After': '1'}
+    except (ValueError, DXFError) as e:
+        return jsonify({"success": False, "error": f"Invalid DXF file: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": f"An unexpected error occurred: {str(e)}"}), 500
+    finally:
+        os.unlink(path)
+
+def _export_service():
+    return ExportService.get_instance(
+        cache_dir=current_app.config.get('EXPORT_CACHE_DIR'),
+        max_cache_bytes=current_app.config.get('EXPORT_CACHE_MAX_BYTES', 1024 * 1024 * 1024),
+        max_workers=current_app.config.get('MAX_WORKERS', 4),
+        job_ttl=current_app.config.get('EXPORT_JOB_TTL', 3600)
+    )
+
+# Export geometry as STEP, STL or BREP. Exports are cached per model revision,
+# format and options; the file is streamed from disk and supports Range requests.
+# Large models (or ?async=1) are exported in the background and return 202 with a job.
+@export_import.route('/export/<model_id>/<export_format>', methods=['GET'])
+def export_geometry(model_id, export_format):
+    options = request.args.to_dict()
+    run_async = options.pop('async', '').lower() in ('1', 'true', 'yes')
+
+    model = ModelManager.get_instance().get_model(model_id)
+    if model is None:
+        return jsonify({"success": False, "error": f"Model not found: {model_id}"}), 404
+    return export_response(model_id, model, export_format, options, run_async)
+
+def export_response(model_id, model, export_format, options, run_async=False, name='model'):
+    # model: anything with a revision and get_model() (models and assemblies)
+    try:
+        export_service = _export_service()
+        path = export_service.cached_path(model_id, model, export_format, options)
+        if path is None:
+            face_count = len(model.get_model().faces().vals())
+            if run_async or face_count > current_app.config.get('EXPORT_ASYNC_FACE_THRESHOLD', 2000):
+                job = export_service.submit(model_id, model, export_format, options)
+                return jsonify({"success": True, "job": job}), 202
+            path = cad_pool().run(export_service.export, model_id, model, export_format, options)
+    except CadPoolBusy as e:
+        return jsonify({"success": False, "error": str(e)}), 503, {'Retry-After': '1'}
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    return send_file(
+        path,
+        mimetype=EXPORT_FORMATS[export_format]['mimetype'],
+        as_attachment=True,
+        download_name=f'{name}_{model_id}{EXPORT_FORMATS[export_format]["extension"]}',
+        conditional=True
+    )
+
+@export_import.route('/export_jobs/<job_id>', methods=['GET'])
+def export_job_status(job_id):
+    job = _export_service().get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": f"Export job not found: {job_id}"}), 404
+    return jsonify({"success": True, "job": job})
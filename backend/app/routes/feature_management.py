@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
-from .model_manager import ModelManager
+from ..cad.model_manager import ModelManager
+from ..services.cad_pool import cad_route
 
 feature_management = Blueprint('feature_management', __name__)
 
@@ -12,7 +13,11 @@ def get_features(model_id):
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 400
 
+# Hiding a feature that adds material only hides its faces; hiding one that
+# removes material suppresses it, answered from cached results when the same
+# combination was built recently
 @feature_management.route('/set_feature_visibility', methods=['POST'])
+@cad_route
 def set_feature_visibility():
     data = request.json
     model_id = data.get('modelId')
@@ -30,7 +35,28 @@ def set_feature_visibility():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 400
 
+# Route to leave a feature out of the rebuild
+@feature_management.route('/set_feature_suppressed', methods=['POST'])
+@cad_route
+def set_feature_suppressed():
+    data = request.json
+    model_id = data.get('modelId')
+    feature_id = data.get('featureId')
+    suppressed = data.get('suppressed')
+
+    if not all([model_id, feature_id is not None, suppressed is not None]):
+        return jsonify({"success": False, "error": "Missing required parameters"}), 400
+
+    try:
+        model_manager = ModelManager.get_instance()
+        model_manager.set_feature_suppressed(model_id, feature_id, suppressed)
+        updated_model_data = model_manager.get_model_data(model_id)
+        return jsonify({"success": True, "updatedModel": updated_model_data})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
 @feature_management.route('/set_feature_color', methods=['POST'])
+@cad_route
 def set_feature_color():
     data = request.json
     model_id = data.get('modelId')
@@ -46,4 +72,4 @@ def set_feature_color():
         updated_model_data = model_manager.get_model_data(model_id)
         return jsonify({"success": True, "updatedModel": updated_model_data})
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 400
\ No newline at end of file
+        return jsonify({"success": False, "error": str(e)}), 400
@@ -1,61 +1,105 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from ..cad.model_manager import ModelManager
+from ..services import inp_writer
+from ..services.calculix_runner import CalculixRunner
+from ..services.fe_mesh import mesh_cache
+from ..services.frd_parser import nodal_results, parse_frd
+from ..services.result_cache import digest, load_case_cache
 
 class StructuralAnalysis:
-    def __init__(self, model_id):
+    def __init__(self, model_id, mesh_size=None, element_order=1):
         self.model_manager = ModelManager.get_instance()
+        self.model_id = model_id
         self.model = self.model_manager.get_model(model_id)
+        self.mesh_size = mesh_size
+        self.element_order = element_order
+        self.mesh = None
+        # Geometry revision of the model the mesh was generated from
+        self.mesh_revision = None
 
-    def prepare_inp_file(self, material_properties, loads, constraints):
+    def generate_mesh(self):
+        # Meshes are cached per geometry revision, so repeated load cases reuse them.
+        # The analysis keeps its mesh: it is generated once, on a CAD thread
+        # (see /analyze), and the solver runs later only write it out
+        if self.mesh is None:
+            self.mesh_revision = self.model.geometry_revision
+            shape = self.model.get_model().findSolid()
+            mesh_size = self.mesh_size or shape.BoundingBox().DiagonalLength / 20
+            self.mesh = mesh_cache.get_or_create(self.model_id, self.mesh_revision, shape, mesh_size,
+                                                 self.element_order)
+        return self.mesh
+
+    def _node_id(self, item):
+        # Loads and constraints reference a node id or a point snapped to the nearest node
+        if 'node' in item:
+            return item['node']
+        return self.mesh.nearest_node(item['point'])
+
+    def prepare_inp_file(self, material_properties, loads, constraints, path='model.inp'):
         # Convert our model to CalculiX input format
-        # This is a simplified version and would need to be expanded
-        inp_content = "*NODE\n"
-        for i, vertex in enumerate(self.model.vertices().vals(), 1):
-            inp_content += f"{i}, {vertex.X}, {vertex.Y}, {vertex.Z}\n"
-
-        inp_content += "*ELEMENT, TYPE=C3D8R\n"
-        # Add element definitions here
-
-        inp_content += "*MATERIAL, NAME=MATERIAL1\n"
-        inp_content += f"*ELASTIC\n{material_properties['young_modulus']}, {material_properties['poisson_ratio']}\n"
-
-        inp_content += "*BOUNDARY\n"
-        for constraint in constraints:
-            inp_content += f"{constraint['node']}, {constraint['dof']}, {constraint['value']}\n"
-
-        inp_content += "*STEP\n*STATIC\n"
-        inp_content += "*CLOAD\n"
-        for load in loads:
-            inp_content += f"{load['node']}, {load['direction']}, {load['magnitude']}\n"
-
-        inp_content += "*NODE PRINT, NSET=NALL\nU\n*EL PRINT, ELSET=EALL\nS\n*END STEP"
-
-        with open('model.inp', 'w') as f:
-            f.write(inp_content)
-
-    def run_analysis(self):
-        # Run CalculiX
-        subprocess.run(["ccx", "model"])
-
-    def process_results(self):
-        # Process the .frd file generated by CalculiX
-        # This is a simplified version and would need to be expanded
-        results = {}
-        with open('model.frd', 'r') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                if line.strip().startswith('1PSTRESS'):
-                    # Extract stress values
-                    stress_values = [float(val) for val in lines[i+1].split()]
-                    results[f'node_{i}'] = {
-                        'stress': max(stress_values)
-                    }
-        return results
+        self.prepare_load_cases_inp_file(material_properties, [{'loads': loads, 'constraints': constraints}], path)
 
-    def perform_analysis(self, material_properties, loads, constraints):
-        self.prepare_inp_file(material_properties, loads, constraints)
-        self.run_analysis()
-        return self.process_results()
+    def prepare_load_cases_inp_file(self, material_properties, load_cases, path='model.inp'):
+        # One deck for several load cases: the mesh and material are written
+        # once and every case becomes its own *STEP, in order
+        mesh = self.generate_mesh()
+
+        with inp_writer.open_deck(path) as f:
+            inp_writer.write_nodes(f, mesh.node_ids, mesh.nodes, nset='NALL')
+            inp_writer.write_elements(f, mesh.element_type, mesh.element_ids, mesh.elements + 1, elset='EALL')
+
+            f.write("*MATERIAL, NAME=MATERIAL1\n")
+            f.write(f"*ELASTIC\n{material_properties['young_modulus']}, {material_properties['poisson_ratio']}\n")
+            f.write("*SOLID SECTION, ELSET=EALL, MATERIAL=MATERIAL1\n")
+
+            for load_case in load_cases:
+                constraints = load_case['constraints']
+                loads = load_case['loads']
+                f.write("*STEP\n*STATIC\n")
+                # OP=NEW replaces the constraints and loads of the previous step
+                # instead of adding to them
+                inp_writer.write_boundary(
+                    f,
+                    [self._node_id(constraint) for constraint in constraints],
+                    [constraint['dof'] for constraint in constraints],
+                    [constraint['dof'] for constraint in constraints],
+                    [constraint['value'] for constraint in constraints],
+                    op='NEW'
+                )
+                inp_writer.write_cloads(
+                    f,
+                    [self._node_id(load) for load in loads],
+                    [load['direction'] for load in loads],
+                    [load['magnitude'] for load in loads],
+                    op='NEW'
+                )
+                f.write("*NODE FILE\nU\n*EL FILE\nS, E\n*END STEP\n")
+
+    def run_analysis(self, material_properties, loads, constraints):
+        # Run CalculiX in its own directory; the caller cleans up the returned run
+        runner = CalculixRunner.get_instance()
+        return runner.run(lambda path: self.prepare_inp_file(material_properties, loads, constraints, path))
+
+    def process_results(self, path='model.frd', step=None):
+        # Nodal result arrays (node ids, positions, von Mises and principal
+        # stresses, displacements) parsed from the .frd file generated by CalculiX
+        return nodal_results(parse_frd(path), step)
+
+    def serialize_results(self, results):
+        # Column-oriented lists keep the payload compact for large meshes
+        serialized = {
+            "nodeIds": results['node_ids'].tolist(),
+            "vonMises": results['von_mises'].tolist(),
+            "principalStresses": results['principal_stresses'].tolist(),
+            "maxVonMises": float(results['von_mises'].max()) if len(results['von_mises']) else None
+        }
+        if 'displacements' in results:
+            magnitudes = np.linalg.norm(results['displacements'], axis=1)
+            serialized["displacements"] = results['displacements'].tolist()
+            serialized["maxDisplacement"] = float(magnitudes.max()) if len(magnitudes) else None
+        return serialized
 
     def generate_recommendations(self, failure_point, material_properties):
         recommendations = []
@@ -79,29 +123,176 @@ class StructuralAnalysis:
         
         return recommendations
 
-    def identify_failure_points(self, results, material_properties):
+    def identify_failure_points(self, results, material_properties, count=5, separation=None):
+        stress = np.asarray(results['von_mises'], dtype=np.float64)
+        positions = np.asarray(results['positions'], dtype=np.float64)
+        with np.errstate(divide='ignore'):
+            safety_factors = np.where(stress > 0, material_properties['yield_strength'] / stress, np.inf)
+
+        # Consider points with safety factor < 2 as potential failure points
+        candidates = np.flatnonzero(safety_factors < 2)
+        if len(candidates) == 0:
+            return []
+
+        # Hot spots must be at least `separation` apart so the reported points
+        # are not all neighbouring nodes of the same stress concentration
+        if separation is None:
+            separation = 0.05 * float(np.linalg.norm(np.ptp(positions, axis=0)))
+        candidate_positions = positions[candidates]
+        selected = candidates[self._select_hot_spots(candidate_positions, stress[candidates], count, separation)]
+
+        # Nodes over the limit attributed to their nearest hot spot within the
+        # separation radius
+        nearest = np.full(len(candidates), -1)
+        nearest_distance = np.full(len(candidates), separation ** 2)
+        for i, index in enumerate(selected):
+            offsets = candidate_positions - positions[index]
+            distance = np.einsum('ij,ij->i', offsets, offsets)
+            closer = distance <= nearest_distance
+            nearest[closer] = i
+            nearest_distance[closer] = distance[closer]
+        affected = np.bincount(nearest[nearest >= 0], minlength=len(selected))
+
         failure_points = []
-        for node, data in results.items():
-            safety_factor = material_properties['yield_strength'] / data['stress']
-            if safety_factor < 2:  # Consider points with safety factor < 2 as potential failure points
-                severity = 1 - (safety_factor / 2)  # Normalize severity between 0 and 1
-                failure_point = {
-                    'node': node,
-                    'position': data['position'],
-                    'stress': data['stress'],
-                    'safety_factor': safety_factor,
-                    'severity': severity
-                }
-                failure_point['recommendations'] = self.generate_recommendations(failure_point, material_properties)
-                failure_points.append(failure_point)
-
-        # Sort failure points by severity (highest to lowest)
-        failure_points.sort(key=lambda x: x['severity'], reverse=True)
-        return failure_points[:5]  # Return top 5 most severe points
+        for index, node_count in zip(selected, affected):
+            safety_factor = float(safety_factors[index])
+            failure_point = {
+                'node': int(results['node_ids'][index]),
+                'position': positions[index].tolist(),
+                'stress': float(stress[index]),
+                'safety_factor': safety_factor,
+                'severity': 1 - (safety_factor / 2),  # Normalize severity between 0 and 1
+                'affected_nodes': int(node_count)
+            }
+            failure_point['recommendations'] = self.generate_recommendations(failure_point, material_properties)
+            failure_points.append(failure_point)
+        return failure_points
+
+    def _select_hot_spots(self, positions, stress, count, separation):
+        # Greedy selection in order of decreasing stress: take the most stressed
+        # node left and drop every node within `separation` of it. Only a pool
+        # of the most stressed nodes is sorted (argpartition); it grows if the
+        # pool runs out before `count` hot spots are found.
+        pool_size = count * 64
+        while True:
+            pool_size = min(pool_size, len(stress))
+            pool = np.argpartition(-stress, pool_size - 1)[:pool_size]
+            pool = pool[np.argsort(-stress[pool], kind='stable')]
+            pool_positions = positions[pool]
+
+            selected = []
+            available = np.ones(len(pool), dtype=bool)
+            while len(selected) < count and available.any():
+                first = int(np.argmax(available))
+                selected.append(pool[first])
+                offsets = pool_positions - pool_positions[first]
+                available &= np.einsum('ij,ij->i', offsets, offsets) >= separation ** 2
+                available[first] = False
+            if len(selected) == count or pool_size == len(stress):
+                return np.array(selected, dtype=np.int64)
+            pool_size *= 4
+
+    def solve_load_cases(self, material_properties, load_cases):
+        # Solves the cases in a single CalculiX run and returns their nodal
+        # results in order
+        runner = CalculixRunner.get_instance()
+        run = runner.run(lambda path: self.prepare_load_cases_inp_file(material_properties, load_cases, path))
+        try:
+            frd = parse_frd(run.frd_path)
+        finally:
+            run.cleanup()
+        return [nodal_results(frd, step) for step in range(1, len(load_cases) + 1)]
+
+    def load_case_key(self, material_properties, load_case):
+        # Results belong to the geometry that was meshed, even if the model has
+        # been edited since
+        self.generate_mesh()
+        return (self.model_id, self.mesh_revision, self.mesh_size, self.element_order,
+                digest(material_properties, load_case['loads'], load_case['constraints']))
+
+    def perform_load_cases(self, material_properties, load_cases, solver_runs=1):
+        # Cases already solved for this revision and material come from the
+        # cache; the rest share one mesh and are solved in up to `solver_runs`
+        # parallel CalculiX runs, each holding several *STEPs
+        keys = [self.load_case_key(material_properties, load_case) for load_case in load_cases]
+        results = [load_case_cache.get(key) for key in keys]
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        if pending:
+            batches = [batch for batch in np.array_split(pending, max(1, min(solver_runs, len(pending)))) if len(batch)]
+            with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+                # Each run gets a copy of this context so solver progress is
+                # still reported on the background job, if any
+                solved = [
+                    executor.submit(contextvars.copy_context().run, self.solve_load_cases,
+                                    material_properties, [load_cases[i] for i in batch])
+                    for batch in batches
+                ]
+                for batch, future in zip(batches, solved):
+                    for i, result in zip(batch, future.result()):
+                        load_case_cache.put(keys[i], result)
+                        results[i] = result
+
+        cases = []
+        for i, (load_case, result) in enumerate(zip(load_cases, results)):
+            cases.append({
+                "name": load_case.get('name') or f"Load case {i + 1}",
+                "results": self.serialize_results(result),
+                "failurePoints": self.identify_failure_points(result, material_properties)
+            })
+
+        envelope = self.envelope(results)
+        failure_points = self.identify_failure_points(envelope, material_properties)
+        for failure_point in failure_points:
+            index = int(np.searchsorted(envelope['node_ids'], failure_point['node']))
+            failure_point['load_case'] = cases[envelope['governing_case'][index]]['name']
+
+        serialized_envelope = self.serialize_results(envelope)
+        serialized_envelope["governingCase"] = envelope['governing_case'].tolist()
+        return {"loadCases": cases, "envelope": serialized_envelope}, failure_points
+
+    def envelope(self, results):
+        # Worst value per node over all load cases, aligned on sorted node ids
+        node_ids = np.unique(np.concatenate([result['node_ids'] for result in results]))
+        von_mises = np.zeros((len(results), len(node_ids)))
+        principal = np.zeros((len(results), len(node_ids), 3))
+        displacements = np.zeros((len(results), len(node_ids), 3))
+        positions = np.zeros((len(node_ids), 3))
+        has_displacements = all('displacements' in result for result in results)
+
+        for i, result in enumerate(results):
+            index = np.searchsorted(node_ids, result['node_ids'])
+            von_mises[i, index] = result['von_mises']
+            principal[i, index] = result['principal_stresses']
+            positions[index] = result['positions']
+            if has_displacements:
+                displacements[i, index] = result['displacements']
+
+        governing = von_mises.argmax(axis=0)
+        columns = np.arange(len(node_ids))
+        envelope = {
+            'node_ids': node_ids,
+            'positions': positions,
+            'von_mises': von_mises[governing, columns],
+            'principal_stresses': principal[governing, columns],
+            'governing_case': governing
+        }
+        if has_displacements:
+            largest = np.linalg.norm(displacements, axis=2).argmax(axis=0)
+            envelope['displacements'] = displacements[largest, columns]
+        return envelope
 
     def perform_analysis(self, material_properties, loads, constraints):
-        self.prepare_inp_file(material_properties, loads, constraints)
-        self.run_analysis()
-        results = self.process_results()
+        # Repeating an analysis with identical inputs on the same revision is
+        # served from the load case cache instead of rerunning CalculiX
+        key = self.load_case_key(material_properties, {'loads': loads, 'constraints': constraints})
+        results = load_case_cache.get(key)
+        if results is None:
+            run = self.run_analysis(material_properties, loads, constraints)
+            try:
+                results = self.process_results(run.frd_path)
+            finally:
+                run.cleanup()
+            load_case_cache.put(key, results)
         failure_points = self.identify_failure_points(results, material_properties)
-        return results, failure_points
\ No newline at end of file
+        return self.serialize_results(results), failure_points
\ No newline at end of file
@@ -13,8 +13,8 @@ def update_parameter():
 
     try:
         model_manager = ModelManager.get_instance()
+        # Rebuilds (once) and notifies the model's subscribers
         model_manager.update_parameter(model_id, parameter_name, new_value)
-        model_manager.rebuild_model(model_id)
         updated_model_data = model_manager.get_model_data(model_id)
         return jsonify({"success": True, "updatedModel": updated_model_data})
     except Exception as e:
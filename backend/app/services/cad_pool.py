@@ -0,0 +1,85 @@
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import copy_current_request_context, current_app, jsonify
+from config import Config
+from .slow_requests import capture_thread
+
+# CPU-bound CAD work (rebuilds, booleans, imports that parse geometry) runs on a
+# small pool of CAD threads, separate from the request threads that gunicorn's
+# gthread workers use for I/O. Uploads, downloads, job polling and event streams
+# stay on request threads and never wait for a CAD thread; a CAD request holds
+# its request thread only while its work is queued or running, and once the
+# queue is full further CAD requests are refused with 503 instead of tying up
+# every request thread.
+
+
+class CadPoolBusy(Exception):
+    pass
+
+
+class CadPool:
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, **kwargs):
+        if cls._instance is None:
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    def __init__(self, max_workers=None, queue_limit=None, inline=False):
+        self.max_workers = max_workers or Config.CAD_WORKERS
+        # Run work on the calling thread (for profiling and replays)
+        self.inline = inline
+        self.queue_limit = Config.CAD_QUEUE_LIMIT if queue_limit is None else queue_limit
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cad')
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def in_pool(self):
+        return getattr(self._local, 'active', False)
+
+    def run(self, func, *args, **kwargs):
+        # Work submitted from a CAD thread runs inline instead of waiting for a
+        # second thread of the same pool
+        if self.inline or self.in_pool():
+            return func(*args, **kwargs)
+
+        with self._lock:
+            if self.pending >= self.max_workers + self.queue_limit:
+                raise CadPoolBusy("Too many CAD requests in progress, try again later")
+            self.pending += 1
+        try:
+            # Context variables (such as the request's timing recorder) follow the work
+            return self.executor.submit(contextvars.copy_context().run, self._call, func, args, kwargs).result()
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def _call(self, func, args, kwargs):
+        self._local.active = True
+        try:
+            with capture_thread():
+                return func(*args, **kwargs)
+        finally:
+            self._local.active = False
+
+
+def cad_pool():
+    return CadPool.get_instance(
+        max_workers=current_app.config.get('CAD_WORKERS'),
+        queue_limit=current_app.config.get('CAD_QUEUE_LIMIT')
+    )
+
+
+def cad_route(view):
+    # Runs the whole view on a CAD thread
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            return cad_pool().run(copy_current_request_context(view), *args, **kwargs)
+        except CadPoolBusy as e:
+            return jsonify({"success": False, "error": str(e)}), 503, {'Retry-After': '1'}
+    return wrapper
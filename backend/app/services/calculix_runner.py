@@ -0,0 +1,212 @@
+import contextvars
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from .solver_progress import SolverLogTail
+
+# Runs CalculiX jobs in isolated temporary directories. Each job declares how
+# many threads it uses (OMP_NUM_THREADS) and jobs only start while the total
+# stays within the core budget, so concurrent analyses never share files or
+# oversubscribe the machine.
+#
+# While a background job's solver runs, its log is tailed and the parsed
+# progress is published on the job (job['progress'], one entry per run) so it
+# can be polled or streamed to the client.
+
+# Background job whose task is executing in the current context
+_current_job = contextvars.ContextVar('calculix_job', default=None)
+
+
+class SolverError(Exception):
+    pass
+
+
+class SolverRun:
+    def __init__(self, run_dir, job_name, returncode):
+        self.run_dir = run_dir
+        self.job_name = job_name
+        self.returncode = returncode
+
+    @property
+    def inp_path(self):
+        return os.path.join(self.run_dir, f'{self.job_name}.inp')
+
+    @property
+    def frd_path(self):
+        return os.path.join(self.run_dir, f'{self.job_name}.frd')
+
+    @property
+    def log_path(self):
+        return os.path.join(self.run_dir, f'{self.job_name}.log')
+
+    def read_log(self):
+        with open(self.log_path, errors='replace') as f:
+            return f.read()
+
+    def cleanup(self):
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+
+class CalculixRunner:
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, **kwargs):
+        if cls._instance is None:
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    def __init__(self, ccx_path=None, work_dir=None, core_budget=None, threads_per_job=None, timeout=None,
+                 poll_interval=0.25, job_ttl=None):
+        self.ccx_path = ccx_path or Config.CALCULIX_PATH
+        self.work_dir = work_dir or Config.CALCULIX_WORK_DIR
+        self.core_budget = core_budget or Config.CALCULIX_CORE_BUDGET
+        self.threads_per_job = threads_per_job or Config.CALCULIX_THREADS_PER_JOB
+        self.timeout = timeout or Config.CALCULIX_TIMEOUT
+        self.poll_interval = poll_interval
+        os.makedirs(self.work_dir, exist_ok=True)
+
+        self._cores_in_use = 0
+        self._cores_available = threading.Condition()
+        # Finished jobs (and their results) are kept for job_ttl seconds so
+        # clients can poll them
+        self.job_ttl = job_ttl or Config.CALCULIX_JOB_TTL
+        self.jobs = {}
+        self._jobs_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.core_budget)
+
+    def _acquire_cores(self, count):
+        with self._cores_available:
+            self._cores_available.wait_for(lambda: self._cores_in_use + count <= self.core_budget)
+            self._cores_in_use += count
+
+    def _release_cores(self, count):
+        with self._cores_available:
+            self._cores_in_use -= count
+            self._cores_available.notify_all()
+
+    def create_run_dir(self):
+        return tempfile.mkdtemp(prefix='ccx-', dir=self.work_dir)
+
+    def run(self, write_input, job_name='model', threads=None, timeout=None, run_dir=None):
+        # write_input(path) writes the .inp deck; the caller owns the returned
+        # SolverRun and must call cleanup() once the results have been read.
+        threads = min(threads or self.threads_per_job, self.core_budget)
+        timeout = timeout or self.timeout
+        run = SolverRun(run_dir or self.create_run_dir(), job_name, None)
+
+        try:
+            write_input(run.inp_path)
+
+            env = dict(os.environ)
+            env['OMP_NUM_THREADS'] = str(threads)
+            env['CCX_NPROC_EQUATION_SOLVER'] = str(threads)
+
+            self._acquire_cores(threads)
+            try:
+                with open(run.log_path, 'wb') as log:
+                    try:
+                        process = subprocess.Popen(
+                            [self.ccx_path, '-i', job_name],
+                            cwd=run.run_dir,
+                            env=env,
+                            stdout=log,
+                            stderr=subprocess.STDOUT
+                        )
+                    except FileNotFoundError as e:
+                        raise SolverError(f"CalculiX executable not found: {self.ccx_path}") from e
+                    run.returncode = self._wait(process, run, timeout)
+            finally:
+                self._release_cores(threads)
+
+            if run.returncode != 0:
+                raise SolverError(f"CalculiX exited with code {run.returncode}: {run.read_log()[-2000:]}")
+            if not os.path.exists(run.frd_path):
+                raise SolverError("CalculiX did not produce a result file")
+        except Exception:
+            run.cleanup()
+            raise
+
+        return run
+
+    def _wait(self, process, run, timeout):
+        job = _current_job.get()
+        tail = SolverLogTail(run.log_path)
+        progress_index = self._add_progress(job, tail) if job else None
+        deadline = time.monotonic() + timeout
+
+        while True:
+            try:
+                returncode = process.wait(timeout=min(self.poll_interval, max(deadline - time.monotonic(), 0)))
+            except subprocess.TimeoutExpired:
+                returncode = None
+            if job and tail.poll():
+                self._update_progress(job, progress_index, tail)
+            if returncode is not None:
+                return returncode
+            if time.monotonic() >= deadline:
+                process.kill()
+                process.wait()
+                raise SolverError(f"CalculiX timed out after {timeout} seconds")
+
+    def _add_progress(self, job, tail):
+        with self._jobs_lock:
+            job['progress'].append(tail.snapshot())
+            job['sequence'] += 1
+            return len(job['progress']) - 1
+
+    def _update_progress(self, job, index, tail):
+        with self._jobs_lock:
+            job['progress'][index] = tail.snapshot()
+            job['sequence'] += 1
+
+    def submit(self, task, *args, **kwargs):
+        # Run task (typically StructuralAnalysis.perform_analysis) in the background
+        job_id = str(uuid.uuid4())
+        # sequence changes whenever status or progress does, so watchers only
+        # need to compare it
+        job = {"id": job_id, "status": "pending", "result": None, "error": None, "progress": [], "sequence": 0,
+               "finishedAt": None}
+        with self._jobs_lock:
+            self._expire_jobs()
+            self.jobs[job_id] = job
+
+        def set_status(status):
+            with self._jobs_lock:
+                job['status'] = status
+                job['sequence'] += 1
+                if status in ('done', 'failed'):
+                    job['finishedAt'] = time.time()
+
+        def execute():
+            token = _current_job.set(job)
+            set_status('running')
+            try:
+                job['result'] = task(*args, **kwargs)
+                set_status('done')
+            except Exception as e:
+                job['error'] = str(e)
+                set_status('failed')
+            finally:
+                _current_job.reset(token)
+
+        self._executor.submit(execute)
+        return job
+
+    def get_job(self, job_id):
+        with self._jobs_lock:
+            self._expire_jobs()
+            return self.jobs.get(job_id)
+
+    def _expire_jobs(self):
+        # Called with _jobs_lock held
+        cutoff = time.time() - self.job_ttl
+        for job_id, job in list(self.jobs.items()):
+            if job['finishedAt'] is not None and job['finishedAt'] < cutoff:
+                del self.jobs[job_id]
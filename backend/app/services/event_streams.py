@@ -0,0 +1,59 @@
+import threading
+from flask import Response, current_app, jsonify, stream_with_context
+from config import Config
+
+# Server-sent event streams (model events, analysis progress) hold a request
+# thread for as long as the client stays connected. With gthread workers those
+# are the same threads that serve uploads, downloads and polling, so the number
+# of open streams per process is capped (EVENT_STREAM_LIMIT, kept well below
+# gunicorn's IO_THREADS); beyond it new streams are refused with 503 and clients
+# fall back to polling.
+
+
+class EventStreamLimit:
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, **kwargs):
+        if cls._instance is None:
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    def __init__(self, max_streams=None):
+        self.max_streams = max_streams or Config.EVENT_STREAM_LIMIT
+        self.open = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.open >= self.max_streams:
+                return False
+            self.open += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.open -= 1
+
+
+def event_stream_limit():
+    return EventStreamLimit.get_instance(max_streams=current_app.config.get('EVENT_STREAM_LIMIT'))
+
+
+def event_stream(generate, on_close=None):
+    # text/event-stream response for the generator function, or 503 if the
+    # process already serves its limit of streams. on_close runs when the
+    # response is closed, whether or not the stream was ever started.
+    limit = event_stream_limit()
+    if not limit.acquire():
+        if on_close is not None:
+            on_close()
+        return jsonify({"success": False, "error": "Too many open event streams, poll instead"}), 503, \
+            {'Retry-After': '5'}
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(limit.release)
+    if on_close is not None:
+        response.call_on_close(on_close)
+    return response
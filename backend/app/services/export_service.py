@@ -0,0 +1,219 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Geometry export (STEP/STL/BREP) with an on-disk cache keyed by geometry revision,
+# format and options. Files stay in the cache after the response is sent, so
+# downloads can be streamed (and range-requested) straight from disk.
+
+EXPORT_FORMATS = {
+    'step': {'extension': '.step', 'mimetype': 'application/step', 'options': {}},
+    'stl': {
+        'extension': '.stl',
+        'mimetype': 'model/stl',
+        'options': {'tolerance': 1e-3, 'angularTolerance': 0.1, 'ascii': False}
+    },
+    'brep': {'extension': '.brep', 'mimetype': 'application/octet-stream', 'options': {}}
+}
+
+# Exports in progress; never served or evicted
+_PARTIAL_PREFIX = '.partial-'
+
+# Files used this recently are never evicted, so a path handed out by
+# cached_path() or export() is still there when send_file() opens it
+_EVICTION_GRACE_SECONDS = 30
+
+
+def normalize_options(export_format, options):
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    defaults = EXPORT_FORMATS[export_format]['options']
+    unknown = set(options or {}) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown options for {export_format}: {', '.join(sorted(unknown))}")
+
+    normalized = dict(defaults)
+    for name, value in (options or {}).items():
+        if isinstance(defaults[name], bool):
+            normalized[name] = _to_bool(value)
+        else:
+            normalized[name] = type(defaults[name])(value)
+    return normalized
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def write_export(shape, export_format, options, path):
+    if export_format == 'step':
+        shape.exportStep(path)
+    elif export_format == 'stl':
+        shape.exportStl(path, options['tolerance'], options['angularTolerance'], options['ascii'])
+    elif export_format == 'brep':
+        shape.exportBrep(path)
+    else:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+
+class ExportService:
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, **kwargs):
+        if cls._instance is None:
+            cls._instance = cls(**kwargs)
+        return cls._instance
+
+    def __init__(self, cache_dir=None, max_cache_bytes=1024 * 1024 * 1024, max_workers=2, job_ttl=3600):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'cloudcad_exports')
+        self.max_cache_bytes = max_cache_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Finished jobs are kept for job_ttl seconds so clients can poll them
+        self.job_ttl = job_ttl
+        self.jobs = {}
+        self._jobs_lock = threading.Lock()
+        # key -> (lock, number of exports using it); dropped by the last user
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def cache_key(self, model_id, revision, export_format, options):
+        payload = json.dumps([str(model_id), revision, export_format, options], sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def cache_path(self, key, export_format):
+        return os.path.join(self.cache_dir, key + EXPORT_FORMATS[export_format]['extension'])
+
+    def cached_path(self, model_id, model, export_format, options=None):
+        options = normalize_options(export_format, options)
+        path = self.cache_path(self.cache_key(model_id, model.geometry_revision, export_format, options), export_format)
+        try:
+            # Marks the file as recently used, which keeps it from being evicted
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def export(self, model_id, model, export_format, options=None):
+        # Export synchronously (or return the cached file) and return its path
+        options = normalize_options(export_format, options)
+        return self._export(model_id, model.geometry_revision, model.get_model().findSolid(), export_format, options)
+
+    def submit(self, model_id, model, export_format, options=None):
+        # Export in the background; the shape is captured now so later edits
+        # to the model don't leak into this revision's file.
+        options = normalize_options(export_format, options)
+        revision = model.geometry_revision
+        shape = model.get_model().findSolid()
+
+        job_id = str(uuid.uuid4())
+        job = {
+            "id": job_id,
+            "modelId": model_id,
+            "revision": revision,
+            "format": export_format,
+            "options": options,
+            "status": "pending",
+            "error": None,
+            "finishedAt": None
+        }
+        with self._jobs_lock:
+            self._expire_jobs()
+            self.jobs[job_id] = job
+
+        def run():
+            job['status'] = 'running'
+            try:
+                self._export(model_id, revision, shape, export_format, options)
+                job['status'] = 'done'
+            except Exception as e:
+                job['status'] = 'failed'
+                job['error'] = str(e)
+            job['finishedAt'] = time.time()
+
+        self._executor.submit(run)
+        return job
+
+    def get_job(self, job_id):
+        with self._jobs_lock:
+            self._expire_jobs()
+            return self.jobs.get(job_id)
+
+    def _expire_jobs(self):
+        # Called with _jobs_lock held
+        cutoff = time.time() - self.job_ttl
+        for job_id, job in list(self.jobs.items()):
+            if job['finishedAt'] is not None and job['finishedAt'] < cutoff:
+                del self.jobs[job_id]
+
+    @contextlib.contextmanager
+    def _key_lock(self, key):
+        with self._locks_lock:
+            lock, users = self._locks.get(key, (None, 0))
+            lock = lock or threading.Lock()
+            self._locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._locks_lock:
+                lock, users = self._locks[key]
+                if users == 1:
+                    del self._locks[key]
+                else:
+                    self._locks[key] = (lock, users - 1)
+
+    def _export(self, model_id, revision, shape, export_format, options):
+        key = self.cache_key(model_id, revision, export_format, options)
+        path = self.cache_path(key, export_format)
+
+        # Concurrent requests for the same export wait for a single writer
+        with self._key_lock(key):
+            if os.path.exists(path):
+                os.utime(path)
+                return path
+
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=_PARTIAL_PREFIX)
+            os.close(fd)
+            try:
+                write_export(shape, export_format, options, temp_path)
+                os.replace(temp_path, path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+
+        self._prune()
+        return path
+
+    def _prune(self):
+        # Evict least recently used exports once the cache exceeds its budget
+        recent = time.time() - _EVICTION_GRACE_SECONDS
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(_PARTIAL_PREFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_cache_bytes or mtime > recent:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,242 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Volumetric tetrahedral meshing for structural analysis.
+#
+# Gmsh is used when it is installed (it meshes the exact BREP). Otherwise a
+# coarser fallback samples the boundary and interior of the solid and keeps the
+# Delaunay tetrahedra whose centroid lies inside it.
+
+ELEMENT_TYPES = {1: 'C3D4', 2: 'C3D10'}
+
+# Gmsh orders the last two mid-side nodes of a 10-node tetrahedron the other
+# way round from CalculiX/Abaqus.
+_GMSH_TET10_ORDER = [0, 1, 2, 3, 4, 5, 6, 7, 9, 8]
+
+# Corner pairs of the mid-side nodes 5-10 of a C3D10 element
+_TET10_EDGES = np.array([[0, 1], [1, 2], [2, 0], [0, 3], [1, 3], [2, 3]])
+
+_gmsh_lock = threading.Lock()
+
+
+class TetMesh:
+    def __init__(self, nodes, elements):
+        # nodes: (N, 3) float64 coordinates, node i has CalculiX id i + 1
+        # elements: (M, 4) or (M, 10) zero-based node indices
+        self.nodes = np.ascontiguousarray(nodes, dtype=np.float64)
+        self.elements = np.ascontiguousarray(elements, dtype=np.int64)
+
+    @property
+    def order(self):
+        return 1 if self.elements.shape[1] == 4 else 2
+
+    @property
+    def element_type(self):
+        return ELEMENT_TYPES[self.order]
+
+    @property
+    def node_ids(self):
+        return np.arange(1, len(self.nodes) + 1)
+
+    @property
+    def element_ids(self):
+        return np.arange(1, len(self.elements) + 1)
+
+    def nearest_node(self, point):
+        # One-based id of the node closest to point
+        distances = np.einsum('ij,ij->i', self.nodes - point, self.nodes - point)
+        return int(np.argmin(distances)) + 1
+
+
+def gmsh_available():
+    try:
+        import gmsh  # noqa: F401
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def generate_tet_mesh(shape, mesh_size, order=1, backend=None):
+    if order not in ELEMENT_TYPES:
+        raise ValueError(f"Unsupported element order: {order}")
+    if mesh_size <= 0:
+        raise ValueError("Mesh size must be positive")
+
+    backend = backend or ('gmsh' if gmsh_available() else 'delaunay')
+    if backend == 'gmsh':
+        return _gmsh_mesh(shape, mesh_size, order)
+    elif backend == 'delaunay':
+        mesh = _delaunay_mesh(shape, mesh_size)
+        return to_quadratic(mesh) if order == 2 else mesh
+    else:
+        raise ValueError(f"Unknown meshing backend: {backend}")
+
+
+def _gmsh_mesh(shape, mesh_size, order):
+    import gmsh
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        brep_path = os.path.join(temp_dir, 'shape.brep')
+        shape.exportBrep(brep_path)
+
+        # The gmsh API keeps global state, so only one mesh can be built at a time
+        with _gmsh_lock:
+            gmsh.initialize()
+            try:
+                gmsh.option.setNumber('General.Terminal', 0)
+                gmsh.model.add('cloudcad')
+                gmsh.model.occ.importShapes(brep_path)
+                gmsh.model.occ.synchronize()
+                gmsh.option.setNumber('Mesh.MeshSizeMax', mesh_size)
+                gmsh.model.mesh.generate(3)
+                if order == 2:
+                    gmsh.model.mesh.setOrder(2)
+
+                node_tags, coords, _ = gmsh.model.mesh.getNodes()
+                _, element_nodes = gmsh.model.mesh.getElementsByType(4 if order == 1 else 11)
+            finally:
+                gmsh.finalize()
+
+    node_tags = np.asarray(node_tags, dtype=np.int64)
+    lookup = np.full(node_tags.max() + 1, -1, dtype=np.int64)
+    lookup[node_tags] = np.arange(len(node_tags))
+
+    elements = lookup[np.asarray(element_nodes, dtype=np.int64)].reshape(-1, 4 if order == 1 else 10)
+    if order == 2:
+        elements = elements[:, _GMSH_TET10_ORDER]
+
+    # Drop nodes that only belong to lower-dimensional elements
+    used = np.unique(elements)
+    remap = np.full(len(node_tags), -1, dtype=np.int64)
+    remap[used] = np.arange(len(used))
+    return orient(TetMesh(np.asarray(coords).reshape(-1, 3)[used], remap[elements]))
+
+
+def _delaunay_mesh(shape, mesh_size):
+    from scipy.spatial import Delaunay, cKDTree
+    from OCP.BRepClass3d import BRepClass3d_SolidClassifier
+    from OCP.TopAbs import TopAbs_IN, TopAbs_ON
+    from OCP.gp import gp_Pnt
+
+    classifier = BRepClass3d_SolidClassifier(shape.wrapped)
+    tolerance = mesh_size * 1e-3
+
+    def inside(points, states=(TopAbs_IN,)):
+        mask = np.zeros(len(points), dtype=bool)
+        for i, (x, y, z) in enumerate(points):
+            classifier.Perform(gp_Pnt(x, y, z), tolerance)
+            mask[i] = classifier.State() in states
+        return mask
+
+    # Boundary: the surface triangulation plus points sampled across every
+    # triangle at roughly mesh_size spacing, thinned to one sample per cell
+    vertices, triangles = shape.tessellate(mesh_size / 4)
+    vertices = np.array([v.toTuple() for v in vertices])
+    corners = vertices[np.asarray(triangles)]
+    edge_lengths = np.linalg.norm(corners - np.roll(corners, 1, axis=1), axis=2).max(axis=1)
+    divisions = np.ceil(edge_lengths / mesh_size).astype(np.int64)
+
+    samples = []
+    for count in np.unique(divisions[divisions > 1]):
+        i, j = np.tril_indices(count + 1)
+        weights = np.column_stack([count - i, i - j, j]) / count
+        samples.append(np.einsum('kc,tcd->tkd', weights, corners[divisions == count]).reshape(-1, 3))
+    if samples:
+        samples = np.vstack(samples)
+        _, first = np.unique(np.floor(samples / (mesh_size / 2)).astype(np.int64), axis=0, return_index=True)
+        samples = samples[first]
+        vertices = np.vstack([vertices, samples])
+    boundary = np.unique(np.round(vertices, 9), axis=0)
+
+    # Interior: a regular grid at mesh_size spacing, dropping points so close
+    # to the boundary samples that they would only produce slivers
+    bbox = shape.BoundingBox()
+    axes = [
+        np.arange(low + mesh_size / 2, high, mesh_size)
+        for low, high in ((bbox.xmin, bbox.xmax), (bbox.ymin, bbox.ymax), (bbox.zmin, bbox.zmax))
+    ]
+    grid = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+    distances, _ = cKDTree(boundary).query(grid)
+    grid = grid[distances > mesh_size / 3]
+    grid = grid[inside(grid)]
+
+    points = np.vstack([boundary, grid])
+    tetrahedra = Delaunay(points).simplices
+
+    # Tetrahedra spanned only by interior points are inside; the rest are
+    # classified by their centroid
+    touches_boundary = (tetrahedra < len(boundary)).any(axis=1)
+    keep = ~touches_boundary
+    keep[touches_boundary] = inside(points[tetrahedra[touches_boundary]].mean(axis=1), (TopAbs_IN, TopAbs_ON))
+    tetrahedra = tetrahedra[keep]
+    tetrahedra = tetrahedra[np.abs(_signed_volumes(points, tetrahedra)) > (mesh_size ** 3) * 1e-9]
+
+    used = np.unique(tetrahedra)
+    remap = np.full(len(points), -1, dtype=np.int64)
+    remap[used] = np.arange(len(used))
+    return orient(TetMesh(points[used], remap[tetrahedra]))
+
+
+def _signed_volumes(nodes, elements):
+    a, b, c, d = (nodes[elements[:, i]] for i in range(4))
+    return np.einsum('ij,ij->i', np.cross(b - a, c - a), d - a) / 6.0
+
+
+def orient(mesh):
+    # CalculiX needs positive element volumes; swap corners 2 and 3 (and the
+    # mid-side nodes that depend on them) where the ordering is inverted.
+    elements = mesh.elements.copy()
+    flipped = _signed_volumes(mesh.nodes, elements) < 0
+    if mesh.order == 1:
+        elements[flipped] = elements[flipped][:, [0, 2, 1, 3]]
+    else:
+        elements[flipped] = elements[flipped][:, [0, 2, 1, 3, 6, 5, 4, 7, 9, 8]]
+    return TetMesh(mesh.nodes, elements)
+
+
+def to_quadratic(mesh):
+    # Add one shared mid-side node per tetrahedron edge (C3D4 -> C3D10)
+    if mesh.order == 2:
+        return mesh
+    corners = mesh.elements
+    edges = np.sort(corners[:, _TET10_EDGES], axis=2).reshape(-1, 2)
+    unique_edges, inverse = np.unique(edges, axis=0, return_inverse=True)
+    midpoints = mesh.nodes[unique_edges].mean(axis=1)
+
+    mid_ids = inverse.reshape(-1, 6) + len(mesh.nodes)
+    return TetMesh(np.vstack([mesh.nodes, midpoints]), np.hstack([corners, mid_ids]))
+
+
+class MeshCache:
+    # Keeps the most recently used meshes, keyed by model revision and mesh
+    # settings, so several load cases on one revision share a mesh.
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, model_id, revision, shape, mesh_size, order=1):
+        key = (model_id, revision, float(mesh_size), order)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        mesh = generate_tet_mesh(shape, mesh_size, order)
+
+        with self._lock:
+            self._entries[key] = mesh
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return mesh
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+mesh_cache = MeshCache()
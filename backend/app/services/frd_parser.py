@@ -0,0 +1,224 @@
+import mmap
+import os
+import numpy as np
+
+# Streaming parser for CalculiX ASCII result files (.frd).
+#
+# Record lines are fixed width: a 3 character key (" -1"), a 10 character node
+# number and 12 character values. Data blocks are located with bytes.find and,
+# as every record in a block has the same length, decoded a chunk of rows at a
+# time by viewing the raw bytes as a 2-D array. Large files are memory-mapped
+# rather than read.
+
+_KEY_WIDTH = 3
+_ID_WIDTH = 10
+_VALUE_WIDTH = 12
+
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+
+class FrdField:
+    def __init__(self, name, step, components, node_ids, values):
+        self.name = name
+        self.step = step
+        self.components = components
+        self.node_ids = node_ids
+        self.values = values
+
+
+class FrdResults:
+    def __init__(self):
+        self.node_ids = np.empty(0, dtype=np.int64)
+        self.coordinates = np.empty((0, 3))
+        self.fields = []
+
+    @property
+    def steps(self):
+        return sorted({field.step for field in self.fields})
+
+    def field(self, name, step=None):
+        # Returns the named field of the given step (default: the last one)
+        matches = [f for f in self.fields if f.name == name and (step is None or f.step == step)]
+        if not matches:
+            raise KeyError(f"No {name} results{'' if step is None else f' for step {step}'}")
+        return matches[-1]
+
+    def has_field(self, name):
+        return any(f.name == name for f in self.fields)
+
+    def positions(self, node_ids):
+        # Coordinates for the given node ids, via the sorted node id index
+        order = np.argsort(self.node_ids)
+        index = order[np.searchsorted(self.node_ids, node_ids, sorter=order)]
+        return self.coordinates[index]
+
+
+def von_mises(stress):
+    # stress: (N, 6) columns SXX, SYY, SZZ, SXY, SYZ, SZX
+    sxx, syy, szz, sxy, syz, szx = stress.T
+    return np.sqrt(
+        0.5 * ((sxx - syy) ** 2 + (syy - szz) ** 2 + (szz - sxx) ** 2)
+        + 3.0 * (sxy ** 2 + syz ** 2 + szx ** 2)
+    )
+
+
+def principal_stresses(stress):
+    # Returns (N, 3) principal stresses, largest first
+    tensors = np.empty((len(stress), 3, 3))
+    tensors[:, 0, 0], tensors[:, 1, 1], tensors[:, 2, 2] = stress[:, 0], stress[:, 1], stress[:, 2]
+    tensors[:, 0, 1] = tensors[:, 1, 0] = stress[:, 3]
+    tensors[:, 1, 2] = tensors[:, 2, 1] = stress[:, 4]
+    tensors[:, 2, 0] = tensors[:, 0, 2] = stress[:, 5]
+    return np.linalg.eigvalsh(tensors)[:, ::-1]
+
+
+def nodal_results(frd, step=None):
+    # Stress-derived quantities and displacements per node for one step,
+    # aligned on the node ids of the stress field
+    stress = frd.field('STRESS', step)
+    node_ids = stress.node_ids
+    results = {
+        'node_ids': node_ids,
+        'positions': frd.positions(node_ids),
+        'von_mises': von_mises(stress.values),
+        'principal_stresses': principal_stresses(stress.values)
+    }
+    if frd.has_field('DISP'):
+        displacement = frd.field('DISP', stress.step)
+        order = np.argsort(displacement.node_ids)
+        index = order[np.searchsorted(displacement.node_ids, node_ids, sorter=order)]
+        results['displacements'] = displacement.values[index]
+    return results
+
+
+def parse_frd(path, chunk_rows=1000000, mmap_threshold=MMAP_THRESHOLD):
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= mmap_threshold:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+
+    try:
+        return _parse(data, chunk_rows)
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+def _parse(data, chunk_rows):
+    results = FrdResults()
+    step = 0
+    position = 0
+
+    while position < len(data):
+        line_end = data.find(b'\n', position)
+        if line_end == -1:
+            line_end = len(data)
+        line = data[position:line_end].rstrip(b'\r')
+        tokens = line.split()
+        next_line = line_end + 1
+
+        if not tokens:
+            position = next_line
+        elif tokens[0] == b'2C':
+            node_ids, coordinates, position = _read_records(data, next_line, 3, chunk_rows)
+            results.node_ids = node_ids
+            results.coordinates = coordinates
+        elif tokens[0] == b'3C':
+            # Element connectivity is not needed for results; skip the block
+            position = _block_end(data, next_line)
+        elif tokens[0] == b'100CL':
+            step = _step_number(tokens, step)
+            position = next_line
+        elif tokens[0] == b'-4':
+            name = tokens[1].decode('ascii')
+            components, position = _read_components(data, next_line)
+            node_ids, values, position = _read_records(data, position, len(components), chunk_rows)
+            results.fields.append(FrdField(name, step, components, node_ids, values))
+        elif tokens[0] == b'9999':
+            break
+        else:
+            position = next_line
+
+    return results
+
+
+def _step_number(tokens, previous):
+    # "100CL  101 1.000000000  8  0  1  1": the sixth token is the step number
+    try:
+        return int(tokens[5])
+    except (IndexError, ValueError):
+        return previous + 1
+
+
+def _read_components(data, position):
+    components = []
+    # data may be an mmap, which has no startswith
+    while data[position:position + 3] == b' -5':
+        line_end = data.find(b'\n', position)
+        tokens = data[position:line_end].split()
+        # DISP blocks also announce an "ALL" pseudo component that has no column
+        if tokens[1] != b'ALL':
+            components.append(tokens[1].decode('ascii'))
+        position = line_end + 1
+    return components, position
+
+
+def _block_end(data, position):
+    # Position just after the " -3" line closing the block starting at position
+    marker = data.find(b'\n -3', position - 1)
+    if marker == -1:
+        return len(data)
+    line_end = data.find(b'\n', marker + 1)
+    return len(data) if line_end == -1 else line_end + 1
+
+
+def _read_records(data, position, columns, chunk_rows):
+    marker = data.find(b'\n -3', position - 1)
+    end = len(data) if marker == -1 else marker + 1
+    first_line_end = data.find(b'\n', position)
+    line_length = first_line_end - position + 1 if first_line_end != -1 else 0
+    record_width = _KEY_WIDTH + _ID_WIDTH + columns * _VALUE_WIDTH
+
+    if line_length <= 0 or (end - position) % line_length or line_length - 1 < record_width:
+        node_ids, values = _read_records_slow(data[position:end], columns)
+    else:
+        rows = (end - position) // line_length
+        node_ids = np.empty(rows, dtype=np.int64)
+        values = np.empty((rows, columns), dtype=np.float64)
+        for start in range(0, rows, chunk_rows):
+            count = min(chunk_rows, rows - start)
+            block = np.frombuffer(data, dtype=np.uint8, count=count * line_length,
+                                  offset=position + start * line_length).reshape(count, line_length)
+            if not (block[:, 1] == ord('-')).all() or not (block[:, 2] == ord('1')).all():
+                # Continuation records (" -2") break the fixed layout
+                node_ids, values = _read_records_slow(data[position:end], columns)
+                break
+            node_ids[start:start + count] = _as_numbers(block[:, _KEY_WIDTH:_KEY_WIDTH + _ID_WIDTH], np.int64)
+            values[start:start + count] = _as_numbers(
+                block[:, _KEY_WIDTH + _ID_WIDTH:record_width], np.float64, _VALUE_WIDTH
+            ).reshape(count, columns)
+
+    return node_ids, values, _block_end(data, position)
+
+
+def _as_numbers(columns, dtype, width=None):
+    width = width or columns.shape[1]
+    text = np.ascontiguousarray(columns).view(f'S{width}')
+    return text.ravel().astype(dtype)
+
+
+def _read_records_slow(block, columns):
+    node_ids = []
+    values = []
+    for line in bytes(block).splitlines():
+        if not line.startswith(b' -1'):
+            continue
+        node_ids.append(int(line[_KEY_WIDTH:_KEY_WIDTH + _ID_WIDTH]))
+        offset = _KEY_WIDTH + _ID_WIDTH
+        values.append([
+            float(line[offset + i * _VALUE_WIDTH:offset + (i + 1) * _VALUE_WIDTH])
+            for i in range(columns)
+        ])
+    return np.array(node_ids, dtype=np.int64), np.array(values, dtype=np.float64).reshape(-1, columns)
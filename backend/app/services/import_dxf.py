@@ -1,33 +1,615 @@
+import math
+import numpy as np
 import ezdxf
-from flask import request, jsonify
-
-@app.route('/api/import_dxf', methods=['POST'])
-def import_dxf():
-    if 'file' not in request.files:
-        return jsonify({"error": "No file part"}), 400
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({"error": "No selected file"}), 400
-    if file and file.filename.endswith('.dxf'):
+import ezdxf.path
+from ezdxf.addons import iterdxf
+from ezdxf.entities import factory
+from ezdxf.lldxf.extendedtags import ExtendedTags
+from ezdxf.math import Vec3
+
+# DXF import into packed NumPy arrays, one group per entity type.
+#
+# ASCII files are read in a single pass by a small group-code reader
+# (_read_tags), so the document is never loaded as a whole; ezdxf only supplies
+# the encoding, links POLYLINE/INSERT to their sub-entities and builds the
+# entities that are not decoded from their tags. Binary DXF files are loaded
+# with ezdxf.readfile. Block definitions are read once;
+# each block is converted to packed arrays the first time it is referenced and
+# every INSERT then only transforms those arrays. Inserts that are not a planar
+# similarity (non-uniform scale, tilted extrusion) are expanded entity by
+# entity and their curves flattened into polylines.
+#
+# Curves other than LINE, CIRCLE, ARC, LWPOLYLINE and SPLINE (ELLIPSE,
+# POLYLINE, ...) and circles/arcs/polylines outside the XY plane are flattened
+# into polylines as well. Entities of any other type (TEXT, HATCH, DIMENSION,
+# ...) are not imported; they are counted by type in DxfGeometry.skipped, once
+# per reference for entities inside blocks.
+
+FLATTENING_DISTANCE = 0.01
+MAX_BLOCK_DEPTH = 16
+
+_TYPES = {'LINE', 'CIRCLE', 'ARC', 'LWPOLYLINE', 'SPLINE', 'ELLIPSE', 'POLYLINE', 'VERTEX', 'SEQEND', 'INSERT'}
+# Decoded straight from their group codes
+_TAG_TYPES = {'LINE', 'CIRCLE', 'ARC', 'LWPOLYLINE'}
+
+_ARRAYS = ('lines', 'circle_centers', 'circle_radii', 'arc_centers', 'arc_radii', 'arc_start_angles',
+           'arc_end_angles', 'polyline_points', 'polyline_bulges', 'polyline_sizes', 'polyline_closed',
+           'spline_degrees', 'spline_closed', 'spline_control_points', 'spline_weights', 'spline_sizes',
+           'spline_knots', 'spline_knot_sizes')
+
+
+class DxfGeometry:
+    # Angles are in degrees, arcs run counter-clockwise about +Z. Polyline and
+    # spline points are stored back to back; *_sizes holds the count per entity.
+    def __init__(self, lines=None, circle_centers=None, circle_radii=None, arc_centers=None, arc_radii=None,
+                 arc_start_angles=None, arc_end_angles=None, polyline_points=None, polyline_bulges=None,
+                 polyline_sizes=None, polyline_closed=None, spline_degrees=None, spline_closed=None,
+                 spline_control_points=None, spline_weights=None, spline_sizes=None, spline_knots=None,
+                 spline_knot_sizes=None):
+        self.lines = _array(lines, (-1, 2, 3))
+        self.circle_centers = _array(circle_centers, (-1, 3))
+        self.circle_radii = _array(circle_radii, (-1,))
+        self.arc_centers = _array(arc_centers, (-1, 3))
+        self.arc_radii = _array(arc_radii, (-1,))
+        self.arc_start_angles = _array(arc_start_angles, (-1,))
+        self.arc_end_angles = _array(arc_end_angles, (-1,))
+        self.polyline_points = _array(polyline_points, (-1, 3))
+        self.polyline_bulges = _array(polyline_bulges, (-1,))
+        self.polyline_sizes = _array(polyline_sizes, (-1,), np.int64)
+        self.polyline_closed = _array(polyline_closed, (-1,), bool)
+        self.spline_degrees = _array(spline_degrees, (-1,), np.int64)
+        self.spline_closed = _array(spline_closed, (-1,), bool)
+        self.spline_control_points = _array(spline_control_points, (-1, 3))
+        self.spline_weights = _array(spline_weights, (-1,))
+        self.spline_sizes = _array(spline_sizes, (-1,), np.int64)
+        self.spline_knots = _array(spline_knots, (-1,))
+        self.spline_knot_sizes = _array(spline_knot_sizes, (-1,), np.int64)
+        # Entities that could not be converted, by DXF type
+        self.skipped = {}
+
+    @property
+    def counts(self):
+        return {
+            'LINE': len(self.lines),
+            'CIRCLE': len(self.circle_radii),
+            'ARC': len(self.arc_radii),
+            'LWPOLYLINE': len(self.polyline_sizes),
+            'SPLINE': len(self.spline_degrees)
+        }
+
+    @property
+    def polyline_offsets(self):
+        return np.concatenate([[0], np.cumsum(self.polyline_sizes)])
+
+    @property
+    def spline_offsets(self):
+        return np.concatenate([[0], np.cumsum(self.spline_sizes)])
+
+    @property
+    def spline_knot_offsets(self):
+        return np.concatenate([[0], np.cumsum(self.spline_knot_sizes)])
+
+    @classmethod
+    def concatenate(cls, parts):
+        parts = list(parts)
+        if not parts:
+            return cls()
+        return cls(**{name: np.concatenate([getattr(part, name) for part in parts]) for name in _ARRAYS})
+
+    def transformed(self, matrix):
+        # matrix: 4x4 row-vector transform (ezdxf Matrix44 rows) that maps the
+        # XY plane onto itself with a uniform scale, possibly mirrored
+        matrix = np.asarray(matrix, dtype=np.float64)
+        linear, translation = matrix[:3, :3], matrix[3, :3]
+        planar = linear[:2, :2]
+        determinant = np.linalg.det(planar)
+        scale = math.sqrt(abs(determinant))
+        mirrored = determinant < 0
+
+        start = _rotate_angles(self.arc_start_angles, planar)
+        end = _rotate_angles(self.arc_end_angles, planar)
+        if mirrored:
+            # Mirroring reverses the direction of travel along the arc
+            start, end = end, start
+
+        result = DxfGeometry(**{name: getattr(self, name) for name in _ARRAYS})
+        result.lines = self.lines @ linear + translation
+        result.circle_centers = self.circle_centers @ linear + translation
+        result.circle_radii = self.circle_radii * scale
+        result.arc_centers = self.arc_centers @ linear + translation
+        result.arc_radii = self.arc_radii * scale
+        result.arc_start_angles = start
+        result.arc_end_angles = end
+        result.polyline_points = self.polyline_points @ linear + translation
+        result.polyline_bulges = -self.polyline_bulges if mirrored else self.polyline_bulges
+        result.spline_control_points = self.spline_control_points @ linear + translation
+        return result
+
+    def to_dict(self):
+        return {
+            "counts": self.counts,
+            "skipped": self.skipped,
+            "lines": self.lines.ravel().tolist(),
+            "circles": {
+                "centers": self.circle_centers.ravel().tolist(),
+                "radii": self.circle_radii.tolist()
+            },
+            "arcs": {
+                "centers": self.arc_centers.ravel().tolist(),
+                "radii": self.arc_radii.tolist(),
+                "startAngles": self.arc_start_angles.tolist(),
+                "endAngles": self.arc_end_angles.tolist()
+            },
+            "polylines": {
+                "points": self.polyline_points.ravel().tolist(),
+                "bulges": self.polyline_bulges.tolist(),
+                "offsets": self.polyline_offsets.tolist(),
+                "closed": self.polyline_closed.tolist()
+            },
+            "splines": {
+                "degrees": self.spline_degrees.tolist(),
+                "closed": self.spline_closed.tolist(),
+                "controlPoints": self.spline_control_points.ravel().tolist(),
+                "weights": self.spline_weights.tolist(),
+                "offsets": self.spline_offsets.tolist(),
+                "knots": self.spline_knots.tolist(),
+                "knotOffsets": self.spline_knot_offsets.tolist()
+            }
+        }
+
+
+def _array(values, shape, dtype=np.float64):
+    if values is None:
+        values = []
+    return np.asarray(values, dtype=dtype).reshape(shape)
+
+
+def _rotate_angles(angles, planar):
+    radians = np.radians(angles)
+    directions = np.column_stack([np.cos(radians), np.sin(radians)]) @ planar
+    return np.degrees(np.arctan2(directions[:, 1], directions[:, 0])) % 360.0
+
+
+def _is_planar_similarity(matrix, tolerance=1e-9):
+    planar = matrix[:2, :2]
+    if np.abs(matrix[:2, 2]).max() > tolerance or np.abs(matrix[2, :2]).max() > tolerance:
+        return False
+    gram = planar @ planar.T
+    return np.allclose(gram, gram[0, 0] * np.eye(2), rtol=0, atol=tolerance * max(1.0, gram[0, 0]))
+
+
+def _extrusion_sign(entity):
+    # +1 / -1 for entities in the XY plane, 0 otherwise
+    x, y, z = entity.dxf.extrusion
+    if abs(x) < 1e-12 and abs(y) < 1e-12:
+        return 1 if z > 0 else -1
+    return 0
+
+
+class _GeometryBuilder:
+    # Collects entities as flat Python lists (cheap appends) plus already
+    # packed parts from block inserts
+    def __init__(self):
+        self.lines = []
+        self.circles = []
+        self.arcs = []
+        self.polyline_points = []
+        self.polyline_bulges = []
+        self.polyline_sizes = []
+        self.polyline_closed = []
+        self.spline_degrees = []
+        self.spline_closed = []
+        self.spline_control_points = []
+        self.spline_weights = []
+        self.spline_sizes = []
+        self.spline_knots = []
+        self.spline_knot_sizes = []
+        self.parts = []
+        self.skipped = {}
+
+    def skip(self, dxftype, count=1):
+        self.skipped[dxftype] = self.skipped.get(dxftype, 0) + count
+
+    def skip_all(self, skipped):
+        for dxftype, count in skipped.items():
+            self.skip(dxftype, count)
+
+    def add_polyline(self, points, bulges, closed):
+        self.polyline_points.extend(points)
+        self.polyline_bulges.extend(bulges)
+        self.polyline_sizes.append(len(bulges))
+        self.polyline_closed.append(closed)
+
+    def build(self):
+        circles = np.asarray(self.circles, dtype=np.float64).reshape(-1, 4)
+        arcs = np.asarray(self.arcs, dtype=np.float64).reshape(-1, 6)
+        own = DxfGeometry(
+            lines=self.lines,
+            circle_centers=circles[:, :3], circle_radii=circles[:, 3],
+            arc_centers=arcs[:, :3], arc_radii=arcs[:, 3], arc_start_angles=arcs[:, 4], arc_end_angles=arcs[:, 5],
+            polyline_points=self.polyline_points, polyline_bulges=self.polyline_bulges,
+            polyline_sizes=self.polyline_sizes, polyline_closed=self.polyline_closed,
+            spline_degrees=self.spline_degrees, spline_closed=self.spline_closed,
+            spline_control_points=self.spline_control_points, spline_weights=self.spline_weights,
+            spline_sizes=self.spline_sizes, spline_knots=self.spline_knots, spline_knot_sizes=self.spline_knot_sizes
+        )
+        return DxfGeometry.concatenate([own] + self.parts)
+
+
+class _DxfReader:
+    def __init__(self, blocks, flattening_distance):
+        self.blocks = blocks
+        self.flattening_distance = flattening_distance
+        self._block_geometry = {}
+
+    def add(self, builder, entity, depth=0):
+        dxftype = entity.dxftype()
+        if dxftype == 'LINE':
+            builder.lines.extend(Vec3(entity.dxf.start).xyz + Vec3(entity.dxf.end).xyz)
+        elif dxftype in ('CIRCLE', 'ARC'):
+            self._add_circle(builder, entity)
+        elif dxftype == 'LWPOLYLINE':
+            self._add_lwpolyline(builder, entity)
+        elif dxftype == 'SPLINE':
+            self._add_spline(builder, entity)
+        elif dxftype == 'INSERT':
+            for matrix in self._insert_matrices(entity):
+                self._add_block(builder, entity.dxf.name, matrix, depth + 1)
+        else:
+            self._add_flattened(builder, entity)
+
+    def add_tags(self, builder, dxftype, tags):
+        # Same result as add() for a LINE, CIRCLE, ARC or LWPOLYLINE, read from
+        # its (group code, value) pairs without building an ezdxf entity
+        values = {}
+        if dxftype == 'LWPOLYLINE':
+            xs, ys, bulges = [], [], []
+            for code, value in tags:
+                if code == 10:
+                    xs.append(float(value))
+                    bulges.append(0.0)
+                elif code == 20:
+                    ys.append(float(value))
+                elif code == 42:
+                    bulges[-1] = float(value)
+                else:
+                    values[code] = value
+        else:
+            values = dict(tags)
+        if values.get(67, '0').strip() == '1':
+            return  # paperspace
+
+        if dxftype == 'LINE':
+            builder.lines.extend(float(values.get(code, 0.0)) for code in (10, 20, 30, 11, 21, 31))
+            return
+        extrusion = [float(values.get(code, default)) for code, default in ((210, 0.0), (220, 0.0), (230, 1.0))]
+        if abs(extrusion[0]) > 1e-12 or abs(extrusion[1]) > 1e-12:
+            # Out of plane: let ezdxf work out the OCS
+            self._add_flattened(builder, _load_entity(tags))
+            return
+        sign = 1 if extrusion[2] > 0 else -1
+
+        if dxftype == 'LWPOLYLINE':
+            elevation = sign * float(values.get(38, 0.0))
+            points = []
+            for x, y in zip(xs, ys):
+                points.extend((sign * x, y, elevation))
+            builder.add_polyline(points, [sign * bulge for bulge in bulges], bool(int(values.get(70, 0)) & 1))
+            return
+
+        x, y, z = (float(values.get(code, 0.0)) for code in (10, 20, 30))
+        radius = float(values.get(40, 0.0))
+        if dxftype == 'CIRCLE':
+            builder.circles.extend((sign * x, y, sign * z, radius))
+            return
+        start, end = float(values.get(50, 0.0)), float(values.get(51, 360.0))
+        if sign < 0:
+            start, end = 180.0 - end, 180.0 - start
+        builder.arcs.extend((sign * x, y, sign * z, radius, start % 360.0, end % 360.0))
+
+    def _add_circle(self, builder, entity):
+        sign = _extrusion_sign(entity)
+        if sign == 0:
+            self._add_flattened(builder, entity)
+            return
+        x, y, z = entity.dxf.center
+        radius = entity.dxf.radius
+        if sign < 0:
+            # The OCS of extrusion -Z has its x axis along -X: a mirror image
+            x, z = -x, -z
+        if entity.dxftype() == 'CIRCLE':
+            builder.circles.extend((x, y, z, radius))
+            return
+        start, end = entity.dxf.start_angle, entity.dxf.end_angle
+        if sign < 0:
+            start, end = 180.0 - end, 180.0 - start
+        builder.arcs.extend((x, y, z, radius, start % 360.0, end % 360.0))
+
+    def _add_lwpolyline(self, builder, entity):
+        sign = _extrusion_sign(entity)
+        if sign == 0:
+            self._add_flattened(builder, entity)
+            return
+        elevation = entity.dxf.elevation
+        vertices = entity.get_points('xyb')
+        points = []
+        for x, y, _ in vertices:
+            points.extend((sign * x, y, sign * elevation))
+        builder.add_polyline(points, [sign * bulge for _, _, bulge in vertices], entity.closed)
+
+    def _add_spline(self, builder, entity):
+        # Splines defined by fit points only are converted to control points
+        spline = entity.construction_tool()
+        control_points = spline.control_points
+        weights = spline.weights() or [1.0] * len(control_points)
+        knots = spline.knots()
+        builder.spline_degrees.append(spline.degree)
+        builder.spline_closed.append(entity.closed)
+        for point in control_points:
+            builder.spline_control_points.extend(Vec3(point).xyz)
+        builder.spline_weights.extend(weights)
+        builder.spline_sizes.append(len(control_points))
+        builder.spline_knots.extend(knots)
+        builder.spline_knot_sizes.append(len(knots))
+
+    def _add_flattened(self, builder, entity, matrix=None):
         try:
-            doc = ezdxf.readfile(file)
-            msp = doc.modelspace()
-            entities = []
-            for e in msp:
-                if e.dxftype() == 'LINE':
-                    entities.append({
-                        'type': 'LINE',
-                        'start': list(e.dxf.start),
-                        'end': list(e.dxf.end)
-                    })
-                elif e.dxftype() == 'CIRCLE':
-                    entities.append({
-                        'type': 'CIRCLE',
-                        'center': list(e.dxf.center),
-                        'radius': e.dxf.radius
-                    })
-                # Add more entity types as needed
-            return jsonify({"entities": entities})
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
-    return jsonify({"error": "Invalid file type"}), 400
\ No newline at end of file
+            path = ezdxf.path.make_path(entity)
+        except TypeError:
+            builder.skip(entity.dxftype())
+            return
+        if matrix is not None:
+            path = path.transform(matrix)
+        points = [Vec3(point) for point in path.flattening(self.flattening_distance)]
+        closed = len(points) > 2 and points[0].isclose(points[-1])
+        if closed:
+            points.pop()
+        builder.add_polyline([c for point in points for c in point.xyz], [0.0] * len(points), closed)
+
+    def _insert_matrices(self, insert):
+        # One matrix per grid element of a MINSERT; block base point moved to the insertion point
+        if insert.dxf.name not in self.blocks:
+            return []
+        base_point = self.blocks[insert.dxf.name][0]
+        grid = insert.dxf.get('row_count', 1) > 1 or insert.dxf.get('column_count', 1) > 1
+        matrices = []
+        for virtual in (insert.multi_insert() if grid else [insert]):
+            matrix = virtual.matrix44()
+            origin = Vec3(matrix.get_row(3)[:3]) - matrix.transform_direction(base_point)
+            matrix.set_row(3, origin.xyz)
+            matrices.append(matrix)
+        return matrices
+
+    def _add_block(self, builder, name, matrix, depth):
+        if depth > MAX_BLOCK_DEPTH or name not in self.blocks:
+            builder.skip('INSERT')
+            return
+        rows = np.array(list(matrix.rows()))
+        if _is_planar_similarity(rows):
+            geometry = self._geometry_of_block(name, depth)
+            builder.skip_all(geometry.skipped)
+            builder.parts.append(geometry.transformed(rows))
+            return
+
+        # General affine transform: expand the block entity by entity
+        builder.skip_all(self.blocks[name][2])
+        for entity in self.blocks[name][1]:
+            dxftype = entity.dxftype()
+            if dxftype == 'INSERT':
+                for child in self._insert_matrices(entity):
+                    self._add_block(builder, entity.dxf.name, child * matrix, depth + 1)
+            elif dxftype in ('LINE', 'SPLINE'):
+                self.add(builder, entity.copy().transform(matrix), depth)
+            else:
+                self._add_flattened(builder, entity, matrix)
+
+    def _geometry_of_block(self, name, depth):
+        if name not in self._block_geometry:
+            builder = _GeometryBuilder()
+            builder.skip_all(self.blocks[name][2])
+            for entity in self.blocks[name][1]:
+                self.add(builder, entity, depth)
+            self._block_geometry[name] = builder.build()
+            self._block_geometry[name].skipped = builder.skipped
+        return self._block_geometry[name]
+
+
+def _read_tags(path, encoding):
+    # Yields (section, tags) for every entity of the BLOCKS and ENTITIES sections
+    # of an ASCII DXF, in file order. tags is a list of (group code, value).
+    section = None
+    tags = None
+    with open(path, encoding=encoding, errors='surrogateescape') as f:
+        for code_line in f:
+            code = int(code_line)
+            value = f.readline().rstrip('\r\n')
+            if code != 0:
+                if tags is not None:
+                    tags.append((code, value))
+                elif code == 2 and section == '':
+                    section = value
+                continue
+
+            if tags is not None:
+                yield section, tags
+                tags = None
+            if value == 'SECTION':
+                section = ''
+            elif value == 'ENDSEC':
+                section = None
+            elif value == 'EOF':
+                return
+            elif section in ('BLOCKS', 'ENTITIES'):
+                tags = [(0, value)]
+    if tags is not None:
+        yield section, tags
+
+
+def _load_entity(tags):
+    text = ''.join(f"{code}\n{value}\n" for code, value in tags)
+    return factory.load(ExtendedTags.from_text(text))
+
+
+def _is_binary(path):
+    with open(path, 'rb') as f:
+        return f.read(22).startswith(b'AutoCAD Binary DXF')
+
+
+def read_dxf(path, flattening_distance=FLATTENING_DISTANCE):
+    # Single pass over the file. LINE, CIRCLE, ARC and LWPOLYLINE entities of the
+    # modelspace are decoded straight from their group codes; everything else
+    # (and all block content) is loaded through ezdxf's entity factory.
+    if _is_binary(path):
+        return _read_document(ezdxf.readfile(path), flattening_distance)
+
+    encoding = iterdxf.dxf_file_info(str(path)).encoding
+    blocks = {}
+    reader = _DxfReader(blocks, flattening_distance)
+    builder = _GeometryBuilder()
+    linked = iterdxf.entity_linker()
+    block = None
+    queued = None
+
+    for section, tags in _read_tags(path, encoding):
+        dxftype = tags[0][1]
+        if section == 'ENTITIES' and dxftype in _TAG_TYPES:
+            reader.add_tags(builder, dxftype, tags)
+        elif dxftype not in _TYPES and dxftype not in ('BLOCK', 'ENDBLK'):
+            # Not imported; counted unless it's on a paperspace layout
+            if section == 'BLOCKS' and block is not None:
+                block[3][dxftype] = block[3].get(dxftype, 0) + 1
+            elif section == 'ENTITIES' and not any(code == 67 and value.strip() == '1' for code, value in tags):
+                builder.skip(dxftype)
+        elif section == 'BLOCKS':
+            entity = _load_entity(tags)
+            if dxftype == 'BLOCK':
+                block = (entity.dxf.name, Vec3(entity.dxf.base_point), [], {})
+            elif dxftype == 'ENDBLK':
+                if block is not None:
+                    blocks[block[0]] = (block[1], [e for e in block[2] if not linked(e)], block[3])
+                block = None
+            elif block is not None:
+                block[2].append(entity)
+        else:
+            # POLYLINE and INSERT collect their VERTEX/SEQEND entities before
+            # they are converted
+            entity = _load_entity(tags)
+            if linked(entity) or entity.dxf.paperspace:
+                continue
+            if queued is not None:
+                reader.add(builder, queued)
+            queued = entity
+    if queued is not None:
+        reader.add(builder, queued)
+
+    geometry = builder.build()
+    geometry.skipped = builder.skipped
+    return geometry
+
+
+def _unsupported(entities):
+    # Counts by type of the entities read_dxf() does not import; the ATTRIBs
+    # of an INSERT are sub-entities, as in the ENTITIES section of a file
+    skipped = {}
+    for entity in entities:
+        dxftype = entity.dxftype()
+        if dxftype not in _TYPES:
+            skipped[dxftype] = skipped.get(dxftype, 0) + 1
+        elif dxftype == 'INSERT' and entity.attribs:
+            skipped['ATTRIB'] = skipped.get('ATTRIB', 0) + len(entity.attribs)
+    return skipped
+
+
+def _read_document(document, flattening_distance):
+    blocks = {
+        block.name: (Vec3(block.block.dxf.base_point), [e for e in block if e.dxftype() in _TYPES], _unsupported(block))
+        for block in document.blocks
+    }
+    reader = _DxfReader(blocks, flattening_distance)
+    builder = _GeometryBuilder()
+    builder.skip_all(_unsupported(document.modelspace()))
+    for entity in document.modelspace():
+        if entity.dxftype() in _TYPES:
+            reader.add(builder, entity)
+    geometry = builder.build()
+    geometry.skipped = builder.skipped
+    return geometry
+
+
+def to_workplane(geometry, plane='XY', tolerance=1e-6):
+    # Edges of the geometry combined into wires; the closed ones are pending on
+    # the returned workplane, ready for extrude()
+    import cadquery as cq
+
+    edges = []
+    for start, end in geometry.lines:
+        if np.linalg.norm(end - start) > tolerance:
+            edges.append(cq.Edge.makeLine(cq.Vector(*start), cq.Vector(*end)))
+    for center, radius in zip(geometry.circle_centers, geometry.circle_radii):
+        edges.append(cq.Edge.makeCircle(float(radius), cq.Vector(*center)))
+    for center, radius, start, end in zip(geometry.arc_centers, geometry.arc_radii,
+                                          geometry.arc_start_angles, geometry.arc_end_angles):
+        edges.append(cq.Edge.makeCircle(float(radius), cq.Vector(*center), angle1=float(start), angle2=float(end)))
+
+    offsets = geometry.polyline_offsets
+    for i, closed in enumerate(geometry.polyline_closed):
+        points = geometry.polyline_points[offsets[i]:offsets[i + 1]]
+        bulges = geometry.polyline_bulges[offsets[i]:offsets[i + 1]]
+        segments = len(points) if closed else len(points) - 1
+        for j in range(segments):
+            start, end = points[j], points[(j + 1) % len(points)]
+            if np.linalg.norm(end - start) <= tolerance:
+                continue
+            if abs(bulges[j]) > 1e-12:
+                edges.append(cq.Edge.makeThreePointArc(
+                    cq.Vector(*start), cq.Vector(*_bulge_midpoint(start, end, bulges[j])), cq.Vector(*end)
+                ))
+            else:
+                edges.append(cq.Edge.makeLine(cq.Vector(*start), cq.Vector(*end)))
+
+    control_offsets = geometry.spline_offsets
+    knot_offsets = geometry.spline_knot_offsets
+    for i, degree in enumerate(geometry.spline_degrees):
+        edges.append(_spline_edge(
+            geometry.spline_control_points[control_offsets[i]:control_offsets[i + 1]],
+            geometry.spline_weights[control_offsets[i]:control_offsets[i + 1]],
+            geometry.spline_knots[knot_offsets[i]:knot_offsets[i + 1]],
+            int(degree)
+        ))
+
+    wires = cq.Wire.combine(edges, tol=tolerance) if edges else []
+    closed = [wire for wire in wires if wire.IsClosed()]
+    return cq.Workplane(plane).add(closed).toPending()
+
+
+def _bulge_midpoint(start, end, bulge):
+    # Point halfway along the arc of a bulged polyline segment; positive bulges
+    # turn counter-clockwise
+    chord = end - start
+    normal = np.array([-chord[1], chord[0], 0.0])
+    return (start + end) / 2 - normal * bulge / 2
+
+
+def _spline_edge(control_points, weights, knots, degree):
+    import cadquery as cq
+    from OCP.BRepBuilderAPI import BRepBuilderAPI_MakeEdge
+    from OCP.Geom import Geom_BSplineCurve
+    from OCP.TColgp import TColgp_Array1OfPnt
+    from OCP.TColStd import TColStd_Array1OfInteger, TColStd_Array1OfReal
+    from OCP.gp import gp_Pnt
+
+    poles = TColgp_Array1OfPnt(1, len(control_points))
+    pole_weights = TColStd_Array1OfReal(1, len(control_points))
+    for i, (point, weight) in enumerate(zip(control_points, weights), 1):
+        poles.SetValue(i, gp_Pnt(*map(float, point)))
+        pole_weights.SetValue(i, float(weight))
+
+    values, multiplicities = np.unique(np.round(knots, 12), return_counts=True)
+    knot_values = TColStd_Array1OfReal(1, len(values))
+    knot_multiplicities = TColStd_Array1OfInteger(1, len(values))
+    for i, (value, multiplicity) in enumerate(zip(values, multiplicities), 1):
+        knot_values.SetValue(i, float(value))
+        knot_multiplicities.SetValue(i, int(multiplicity))
+
+    curve = Geom_BSplineCurve(poles, pole_weights, knot_values, knot_multiplicities, degree)
+    return cq.Edge(BRepBuilderAPI_MakeEdge(curve).Edge())
@@ -0,0 +1,78 @@
+import numpy as np
+
+# Writes CalculiX/Abaqus input decks (.inp) straight from NumPy arrays.
+#
+# Rows are formatted a chunk at a time: the columns of a chunk are interleaved
+# into one flat list and formatted with a single "%" against the row format
+# repeated for every row, then written in one call. This is several times
+# faster than np.savetxt (one format call per row) and never holds more than one
+# chunk of text in memory.
+
+CHUNK_ROWS = 65536
+
+# CalculiX reads at most 16 entries per data line of *NSET/*ELSET
+_SET_ENTRIES_PER_LINE = 16
+
+
+def open_deck(path):
+    return open(path, 'w', buffering=1024 * 1024)
+
+
+def write_rows(f, row_format, columns, chunk_rows=CHUNK_ROWS):
+    # columns: 1-D arrays of equal length; row_format formats one value of each
+    columns = [np.asarray(column) for column in columns]
+    count = len(columns[0]) if columns else 0
+    width = len(columns)
+    line_format = row_format + '\n'
+
+    for start in range(0, count, chunk_rows):
+        stop = min(start + chunk_rows, count)
+        flat = [None] * ((stop - start) * width)
+        for i, column in enumerate(columns):
+            flat[i::width] = column[start:stop].tolist()
+        f.write((line_format * (stop - start)) % tuple(flat))
+
+
+def write_nodes(f, node_ids, coordinates, nset='NALL'):
+    f.write(f"*NODE, NSET={nset}\n" if nset else "*NODE\n")
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    write_rows(f, '%d, %.9g, %.9g, %.9g', [node_ids, coordinates[:, 0], coordinates[:, 1], coordinates[:, 2]])
+
+
+def write_elements(f, element_type, element_ids, connectivity, elset='EALL'):
+    # connectivity holds one-based node ids
+    f.write(f"*ELEMENT, TYPE={element_type}, ELSET={elset}\n" if elset else f"*ELEMENT, TYPE={element_type}\n")
+    connectivity = np.asarray(connectivity, dtype=np.int64)
+    width = connectivity.shape[1]
+    # At most 16 entries per line, so up to C3D15 elements fit on a single line
+    write_rows(f, ', '.join(['%d'] * (width + 1)), [element_ids] + [connectivity[:, i] for i in range(width)])
+
+
+def _write_set(f, keyword, name, ids):
+    ids = np.unique(np.asarray(ids, dtype=np.int64))
+    f.write(f"*{keyword}, {keyword}={name}\n")
+    full = len(ids) - len(ids) % _SET_ENTRIES_PER_LINE
+    if full:
+        rows = ids[:full].reshape(-1, _SET_ENTRIES_PER_LINE)
+        write_rows(f, ', '.join(['%d'] * _SET_ENTRIES_PER_LINE), list(rows.T))
+    if full < len(ids):
+        f.write(', '.join(str(i) for i in ids[full:].tolist()) + '\n')
+
+
+def write_node_set(f, name, node_ids):
+    _write_set(f, 'NSET', name, node_ids)
+
+
+def write_element_set(f, name, element_ids):
+    _write_set(f, 'ELSET', name, element_ids)
+
+
+def write_boundary(f, targets, first_dofs, last_dofs, values, op=None):
+    # targets are node ids or node set names (one per row)
+    f.write("*BOUNDARY, OP=%s\n" % op if op else "*BOUNDARY\n")
+    write_rows(f, '%s, %d, %d, %.9g', [targets, first_dofs, last_dofs, values])
+
+
+def write_cloads(f, targets, directions, magnitudes, op=None):
+    f.write("*CLOAD, OP=%s\n" % op if op else "*CLOAD\n")
+    write_rows(f, '%s, %d, %.9g', [targets, directions, magnitudes])
@@ -0,0 +1,56 @@
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+from .metrics import metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the standard library encoder is used instead
+    orjson = None
+
+# JSON encoding for responses. orjson, when installed, writes NumPy arrays
+# directly from their buffers and is several times faster than the standard
+# library on the large vertex and triangle lists of model payloads; otherwise
+# arrays are converted to lists for the standard encoder.
+
+
+def _default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, 'toTuple'):
+        # cadquery Vector
+        return value.toTuple()
+    return DefaultJSONProvider.default(value)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(value):
+        return orjson.dumps(value, default=_default, option=_OPTIONS)
+else:
+    import json
+
+    def dumps_bytes(value):
+        return json.dumps(value, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        value = self._prepare_response_obj(args, kwargs)
+        if metrics.active():
+            with metrics.timed('serialization', metrics.serialization_seconds):
+                data = dumps_bytes(value)
+        else:
+            data = dumps_bytes(value)
+        return self._app.response_class(data, mimetype=self.mimetype)
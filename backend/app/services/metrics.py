@@ -0,0 +1,195 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Process-wide metrics in the Prometheus text format, plus per-request timing.
+#
+# Recording is off unless metrics are enabled (METRICS_ENABLED) or the current
+# request asked for a timing breakdown, so the rebuild hot path only pays for a
+# flag check. Each gunicorn worker process keeps its own metrics.
+
+_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_SIZE_BUCKETS = (10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+# Timings of the request being served: a list of (name, seconds) or None
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+def _label_text(names, values):
+    if not names:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if value != float('inf') else '+Inf'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1.0):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _label_text(self.labels, key), value) for key, value in sorted(self.values.items())]
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=_LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *labels, value):
+        with self._lock:
+            counts = self.values.get(labels)
+            if counts is None:
+                # per-bucket counts, sum
+                counts = self.values[labels] = [[0] * len(self.buckets), 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[0][i] += 1
+                    break
+            counts[1] += value
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self.values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                label_text = _label_text(self.labels + ('le',), key + (_number(bound),))
+                samples.append((self.name + '_bucket', label_text, cumulative))
+            label_text = _label_text(self.labels, key)
+            samples.append((self.name + '_sum', label_text, total))
+            samples.append((self.name + '_count', label_text, cumulative))
+        return samples
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.metrics = []
+
+        self.rebuild_seconds = self.add(Histogram(
+            'cad_rebuild_seconds', 'Wall time of model rebuilds'))
+        self.rebuild_variants = self.add(Counter(
+            'cad_rebuild_variants_total', 'Rebuilds served from cached results (hit) or replayed (miss)', ('result',)))
+        self.feature_seconds = self.add(Histogram(
+            'cad_feature_seconds', 'Wall time of a feature during rebuild', ('feature',)))
+        self.feature_cpu_seconds = self.add(Counter(
+            'cad_feature_cpu_seconds_total', 'CPU time of the rebuilding thread spent in features', ('feature',)))
+        self.feature_faces = self.add(Histogram(
+            'cad_feature_faces', 'Faces of the model after a feature', ('feature',), _SIZE_BUCKETS))
+        self.feature_edges = self.add(Histogram(
+            'cad_feature_edges', 'Edges of the model after a feature', ('feature',), _SIZE_BUCKETS))
+        self.boolean_operations = self.add(Counter(
+            'cad_boolean_operations_total', 'OCC boolean operations', ('operation',)))
+        self.tessellation_seconds = self.add(Histogram(
+            'cad_tessellation_seconds', 'Wall time of model tessellation'))
+        self.serialization_seconds = self.add(Histogram(
+            'http_serialization_seconds', 'Time spent encoding JSON responses'))
+        self.request_seconds = self.add(Histogram(
+            'http_request_seconds', 'Request handling time', ('endpoint', 'method', 'status')))
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(f'{name}{labels} {_number(value)}' for name, labels, value in metric.samples())
+        return '\n'.join(lines) + '\n'
+
+    def active(self):
+        return self.enabled or _request_timings.get() is not None
+
+    @contextmanager
+    def timed(self, name, histogram=None, labels=()):
+        # Observes the block in histogram (if metrics are on) and in the request timings
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.enabled and histogram is not None:
+                histogram.observe(*labels, value=elapsed)
+            record_timing(name, elapsed)
+
+
+metrics = Metrics()
+
+
+def start_request_timing():
+    _request_timings.set([])
+
+
+def request_timings():
+    return _request_timings.get()
+
+
+def stop_request_timing():
+    _request_timings.set(None)
+
+
+def record_timing(name, seconds):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+def server_timing_header(timings):
+    # Same-named entries (a feature used twice) are summed
+    totals = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ', '.join(f'{name};dur={seconds * 1000:.3f}' for name, seconds in totals.items())
+
+
+_boolean_patch_lock = threading.Lock()
+_boolean_patched = False
+
+
+def count_boolean_operations():
+    # Wraps cadquery's single entry point for OCC booleans so each operation is
+    # counted by type (Fuse, Cut, Common, ...). Only installed when metrics are
+    # enabled.
+    global _boolean_patched
+    if _boolean_patched:
+        return
+    import cadquery as cq
+
+    with _boolean_patch_lock:
+        if _boolean_patched:
+            return
+        bool_op = cq.Shape._bool_op
+
+        def counted_bool_op(self, args, tools, op, parallel=True):
+            if metrics.enabled:
+                metrics.boolean_operations.inc(type(op).__name__.replace('BRepAlgoAPI_', ''))
+            return bool_op(self, args, tools, op, parallel)
+
+        cq.Shape._bool_op = counted_bool_op
+        _boolean_patched = True
@@ -1,4 +1,5 @@
 import cadquery as cq
+from ..cad.boolean_ops import contains, fuse_all, shapes_of
 
 class MirrorOperation:
     def __init__(self, mirror_type, objects, mirror_plane, keep_original, align_to_axis, partial_features=None):
@@ -10,26 +11,32 @@ class MirrorOperation:
         self.partial_features = partial_features
 
     def apply(self, model):
-        mirrored_objects = []
+        mirrored_shapes = []
         for obj in self.objects:
             if self.partial_features and obj in self.partial_features:
                 mirrored = self.mirror_partial_feature(obj, self.partial_features[obj])
             else:
-                mirrored = obj.mirror(self.mirror_plane.origin, self.mirror_plane.normal)
-            
+                mirrored = self.mirror(obj)
+
             if self.align_to_axis:
-                mirrored = self.align_to_axis(mirrored, self.align_to_axis)
-            mirrored_objects.append(mirrored)
-        
-        result = model
-        for mirrored in mirrored_objects:
-            result = result.union(mirrored)
-        
+                mirrored = self.align_object_to_axis(mirrored, self.align_to_axis)
+            mirrored_shapes.extend(shapes_of(mirrored))
+
+        # Originals that are already part of the model are not fused again
+        model_shapes = shapes_of(model)
+        originals = []
         if self.keep_original:
             for obj in self.objects:
-                result = result.union(obj)
-        
-        return result
+                originals.extend(shape for shape in shapes_of(obj) if not contains(model_shapes, shape))
+
+        # One n-ary fuse instead of a union per object
+        result = fuse_all(model_shapes + mirrored_shapes + originals)
+        return model.newObject([result]) if isinstance(model, cq.Workplane) else result
+
+    def mirror(self, obj):
+        # cq.Plane has no .normal, its normal is zDir
+        normal = self.mirror_plane.zDir if isinstance(self.mirror_plane, cq.Plane) else self.mirror_plane.normal
+        return obj.mirror(normal, self.mirror_plane.origin)
 
     def mirror_partial_feature(self, obj, feature_selectors):
         # Clone the object
@@ -40,12 +47,12 @@ class MirrorOperation:
             cloned_obj = cloned_obj.selectors(selector)
         
         # Mirror the partial feature
-        mirrored_partial = cloned_obj.mirror(self.mirror_plane.origin, self.mirror_plane.normal)
+        mirrored_partial = self.mirror(cloned_obj)
         
         # Union the mirrored partial feature with the original object
         return obj.union(mirrored_partial)
 
-    def align_to_axis(self, obj, axis):
+    def align_object_to_axis(self, obj, axis):
         if axis == 'x':
             return obj.rotateAboutCenter((0, 90, 0))
         elif axis == 'y':
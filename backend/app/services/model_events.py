@@ -0,0 +1,143 @@
+import threading
+
+# Push channel for model updates. Every rebuild publishes a snapshot of the
+# model's parameters and feature tree; each subscriber is sent the difference
+# between the state it last received and the newest snapshot.
+#
+# Publishing never blocks and nothing queues up per subscriber: a subscriber
+# only remembers the newest snapshot, so a slow consumer that misses several
+# rebuilds receives one delta spanning all of them.
+#
+# Deltas do not carry geometry. Their "geometry" entry says whether the shown
+# geometry (the rebuild result, or which features' faces are hidden) changed
+# since the subscriber's last event; if so, clients refetch
+# the mesh from geometry['url'] (GET /api/models/<id>, which honours the ETag).
+# Color changes and parameter edits that rebuild to the same result do not
+# require a refetch.
+
+_MISSING = object()
+
+
+def model_snapshot(model):
+    return {
+        "revision": model.revision,
+        "geometryRevision": model.geometry_revision,
+        "hiddenFeatures": model.hidden_features(),
+        "parameters": dict(model.parameters),
+        "features": {
+            feature['id']: {
+                "id": feature['id'],
+                "type": feature['type'],
+                "args": list(feature['args']),
+                "kwargs": dict(feature['kwargs']),
+                "visible": feature['visible'],
+                "suppressed": feature['suppressed'],
+                "color": list(feature['color'])
+            } for feature in model.features
+        }
+    }
+
+
+def _changes(old, new):
+    changed = {key: value for key, value in new.items() if old.get(key, _MISSING) != value}
+    removed = [key for key in old if key not in new]
+    return changed, removed
+
+
+def snapshot_delta(model_id, old, new):
+    # old is None for the initial event, which then carries the full state
+    old = old or {"revision": None, "geometryRevision": None, "hiddenFeatures": None, "parameters": {}, "features": {}}
+    parameters, removed_parameters = _changes(old['parameters'], new['parameters'])
+    features, removed_features = _changes(old['features'], new['features'])
+    return {
+        "modelId": model_id,
+        "fromRevision": old['revision'],
+        "revision": new['revision'],
+        "parameters": parameters,
+        "removedParameters": removed_parameters,
+        "features": list(features.values()),
+        "removedFeatures": removed_features,
+        "geometry": {
+            "revision": new['geometryRevision'],
+            "changed": (old['geometryRevision'], old['hiddenFeatures']) != (new['geometryRevision'], new['hiddenFeatures']),
+            "url": f"/api/models/{model_id}"
+        }
+    }
+
+
+class ModelSubscription:
+    def __init__(self, hub, model_id, snapshot):
+        self.hub = hub
+        self.model_id = model_id
+        self.latest = snapshot
+        self.sent = None
+        self.published = 0
+        self.closed = False
+        self._condition = threading.Condition()
+
+    def push(self, snapshot):
+        with self._condition:
+            self.latest = snapshot
+            self.published += 1
+            self._condition.notify()
+
+    def next_delta(self, timeout=None):
+        # Delta since the last call, or None if nothing changed within timeout
+        with self._condition:
+            if self.sent is self.latest and not self.closed:
+                self._condition.wait(timeout)
+            if self.sent is self.latest or self.latest is None:
+                return None
+            delta = snapshot_delta(self.model_id, self.sent, self.latest)
+            # Rebuilds folded into this delta
+            delta['coalesced'] = self.published
+            self.sent = self.latest
+            self.published = 0
+        return delta
+
+    def close(self):
+        self.hub.unsubscribe(self)
+        with self._condition:
+            self.closed = True
+            self._condition.notify()
+
+
+class ModelEventHub:
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, model_id, model=None):
+        subscription = ModelSubscription(self, model_id, model_snapshot(model) if model is not None else None)
+        with self._lock:
+            self.subscriptions.setdefault(model_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self.subscriptions.get(subscription.model_id)
+            if subscriptions:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscriptions[subscription.model_id]
+
+    def subscriber_count(self, model_id):
+        with self._lock:
+            return len(self.subscriptions.get(model_id, ()))
+
+    def publish(self, model_id, model):
+        with self._lock:
+            subscriptions = list(self.subscriptions.get(model_id, ()))
+        if not subscriptions:
+            return
+        snapshot = model_snapshot(model)
+        for subscription in subscriptions:
+            subscription.push(snapshot)
@@ -1,6 +1,6 @@
 import cadquery as cq
 import json
-from .parametric_feature_functions import circular_cut, concentric_extrude, mirror_feature
+from ..cad.feature_registry import FeatureRegistry
 
 class ParametricModel:
     def __init__(self):
@@ -161,15 +161,7 @@ class ModelManager:
 
         # Import features
         for feature in import_data.get("features", []):
-            feature_type = feature.get("type")
-            if feature_type == "circular_cut":
-                feature_func = circular_cut
-            elif feature_type == "concentric_extrude":
-                feature_func = concentric_extrude
-            elif feature_type == "mirror_feature":
-                feature_func = mirror_feature
-            else:
-                raise ValueError(f"Unknown feature type: {feature_type}")
+            feature_func = FeatureRegistry.get_instance().resolve(feature.get("type"))
 
             args = feature.get("args", [])
             kwargs = feature.get("kwargs", {})
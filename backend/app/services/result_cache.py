@@ -0,0 +1,41 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# In-memory cache of analysis results. Keys combine the model revision and mesh
+# settings with a digest of the inputs (material, loads, constraints), so a load
+# case that was already solved for the current geometry is not solved again.
+
+
+def digest(*parts):
+    text = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+load_case_cache = ResultCache()
@@ -0,0 +1,247 @@
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+# Opt-in capture of slow requests (SLOW_REQUEST_CAPTURE). While a request runs,
+# its threads (the request thread and the CAD thread doing its work) are
+# sampled by a stack sampler; if the request takes longer than the threshold,
+# the request, the model it worked on as it was before the request, and the
+# sampled stacks are written to a JSON file in the capture directory. Old
+# captures are rotated out. `python -m app.replay <file>` re-runs a capture.
+#
+# Every request only copies the model's parameters and feature list (no
+# geometry, no serialization); the copy is turned into an export document when
+# the request turned out slow and is saved.
+#
+# Stacks are Python frames only: time spent inside OCC shows up on the Python
+# frame that called into it. For native frames run the replay under a native
+# profiler such as py-spy (--native).
+
+_current_capture = contextvars.ContextVar('slow_request_capture', default=None)
+
+
+class RequestCapture:
+    def __init__(self, model_id=None, model=None):
+        self.model_id = model_id
+        # Parameters and features of the model as they were when the request
+        # started, in the layout of ModelManager.export_model
+        self.model = model
+        self.started = time.perf_counter()
+        self.threads = {threading.get_ident()}
+        self.stacks = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def add_sample(self, stack):
+        with self._lock:
+            self.stacks[stack] += 1
+            self.samples += 1
+
+    def profile(self, interval):
+        with self._lock:
+            stacks = self.stacks.most_common()
+        return {
+            "interval": interval,
+            "samples": self.samples,
+            # Folded stacks (root first, ';'-separated) as used by flame graph tools
+            "stacks": [{"stack": stack, "count": count} for stack, count in stacks]
+        }
+
+
+def _folded_stack(frame, max_depth=128):
+    names = []
+    while frame is not None and len(names) < max_depth:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    # One thread samples every active capture; it exits when none are left
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.captures = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, capture):
+        with self._lock:
+            self.captures.add(capture)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+
+    def remove(self, capture):
+        with self._lock:
+            self.captures.discard(capture)
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self.captures:
+                    self._thread = None
+                    return
+                captures = list(self.captures)
+            frames = sys._current_frames()
+            for capture in captures:
+                for ident in list(capture.threads):
+                    frame = frames.get(ident)
+                    if frame is not None and ident != own:
+                        capture.add_sample(_folded_stack(frame))
+            del frames
+            time.sleep(self.interval)
+
+
+@contextmanager
+def capture_thread():
+    # Work for the current request done on another thread (CAD threads) is
+    # sampled too while it runs
+    capture = _current_capture.get()
+    if capture is None:
+        yield
+        return
+    ident = threading.get_ident()
+    capture.threads.add(ident)
+    try:
+        yield
+    finally:
+        capture.threads.discard(ident)
+
+
+def _request_inputs(request):
+    inputs = {
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "viewArgs": request.view_args or {},
+        "query": request.args.to_dict(flat=False),
+        "json": request.get_json(silent=True)
+    }
+    if request.files:
+        # Uploads are not stored, only their names
+        inputs["files"] = {
+            name: {"filename": file.filename, "contentType": file.content_type}
+            for name, file in request.files.items()
+        }
+        inputs["form"] = request.form.to_dict()
+    return inputs
+
+
+def _model_id(request):
+    model_id = (request.view_args or {}).get('model_id')
+    if model_id is None:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            model_id = body.get('modelId')
+    return model_id
+
+
+class SlowRequestRecorder:
+    def __init__(self, directory, threshold=1.0, max_files=50, interval=0.005, model_manager=None):
+        self.directory = directory
+        self.threshold = threshold
+        self.max_files = max_files
+        self.sampler = StackSampler(interval)
+        self.model_manager = model_manager
+
+    def init_app(self, app):
+        from flask import g, request
+
+        @app.before_request
+        def start_capture():
+            model_id = _model_id(request)
+            capture = RequestCapture(model_id, self._model_state(model_id))
+            g.slow_request_capture = capture
+            _current_capture.set(capture)
+            self.sampler.add(capture)
+
+        @app.after_request
+        def finish_capture(response):
+            capture = g.pop('slow_request_capture', None)
+            if capture is not None:
+                self.sampler.remove(capture)
+                duration = time.perf_counter() - capture.started
+                if duration >= self.threshold:
+                    self.save(capture, _request_inputs(request), response.status_code, duration)
+            return response
+
+        @app.teardown_request
+        def stop_capture(exception=None):
+            capture = _current_capture.get()
+            if capture is not None:
+                self.sampler.remove(capture)
+                _current_capture.set(None)
+
+    def _model_state(self, model_id):
+        # Shallow copy of what export_model writes; cheap enough for every request
+        if model_id is None:
+            return None
+        model_manager = self.model_manager
+        if model_manager is None:
+            from ..cad.model_manager import ModelManager
+            model_manager = ModelManager.get_instance()
+        model = model_manager.get_model(model_id)
+        if model is None:
+            return None
+        return {
+            "modelId": model_id,
+            "parameters": dict(model.parameters),
+            "features": [
+                {"id": feature['id'], "type": feature['type'], "args": feature['args'], "kwargs": dict(feature['kwargs'])}
+                for feature in model.features
+            ],
+            "structuralAnalysis": {
+                "results": getattr(model, 'analysis_results', None),
+                "failurePoints": getattr(model, 'failure_points', None)
+            }
+        }
+
+    def _export_model(self, state):
+        if state is None:
+            return None
+        try:
+            return json.loads(json.dumps(state))
+        except (TypeError, ValueError):
+            # Feature arguments that cannot be serialized
+            return None
+
+    def save(self, capture, inputs, status, duration):
+        os.makedirs(self.directory, exist_ok=True)
+        record = {
+            "capturedAt": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            "durationSeconds": duration,
+            "status": status,
+            "request": inputs,
+            "modelId": capture.model_id,
+            "model": self._export_model(capture.model),
+            "profile": capture.profile(self.sampler.interval)
+        }
+        name = f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}-{inputs['endpoint'] or 'unknown'}-{uuid.uuid4().hex[:8]}.json"
+        path = os.path.join(self.directory, name)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(record, f, default=str)
+        os.replace(path + '.tmp', path)
+        self.rotate()
+        return path
+
+    def captures(self):
+        # Oldest first
+        names = [name for name in os.listdir(self.directory) if name.endswith('.json')]
+        paths = [os.path.join(self.directory, name) for name in names]
+        return sorted(paths, key=lambda path: (os.path.getmtime(path), path))
+
+    def rotate(self):
+        paths = self.captures()
+        for path in paths[:max(len(paths) - self.max_files, 0)]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
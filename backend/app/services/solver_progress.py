@@ -0,0 +1,84 @@
+import re
+from collections import deque
+
+# Follows the output CalculiX writes while it runs (stdout redirected to the
+# job's .log file) and extracts the current step, increment and iteration and
+# the latest residuals, so clients can watch convergence of a running job.
+
+_STEP = re.compile(rb'^\s*STEP\s+(\d+)')
+_INCREMENT = re.compile(rb'increment\s+(\d+)\s+attempt\s+(\d+)')
+_ITERATION = re.compile(rb'^\s*iteration\s+(\d+)')
+_RESIDUAL = re.compile(rb'largest residual force=\s*([-+0-9.eEdD]+)')
+_AVERAGE_FORCE = re.compile(rb'average force=\s*([-+0-9.eEdD]+)')
+_FINISHED = re.compile(rb'Job finished')
+
+
+def _number(match):
+    return float(match.group(1).replace(b'D', b'E').replace(b'd', b'e'))
+
+
+class SolverLogTail:
+    def __init__(self, path, max_lines=50):
+        self.path = path
+        self.offset = 0
+        self._partial = b''
+        self.lines = deque(maxlen=max_lines)
+        self.state = {
+            "step": None,
+            "increment": None,
+            "attempt": None,
+            "iteration": None,
+            "residualForce": None,
+            "averageForce": None,
+            "finished": False
+        }
+
+    def poll(self):
+        # Reads what was appended since the last call; returns the number of new
+        # complete lines
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+        if not data:
+            return 0
+        self.offset += len(data)
+
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self._parse(line.rstrip(b'\r'))
+        return len(lines)
+
+    def _parse(self, line):
+        if not line.strip():
+            return
+        self.lines.append(line.decode('utf-8', errors='replace'))
+
+        match = _STEP.search(line)
+        if match:
+            self.state.update(step=int(match.group(1)), increment=None, attempt=None, iteration=None)
+            return
+        match = _INCREMENT.search(line)
+        if match:
+            self.state.update(increment=int(match.group(1)), attempt=int(match.group(2)), iteration=None)
+            return
+        match = _ITERATION.search(line)
+        if match:
+            self.state['iteration'] = int(match.group(1))
+            return
+        match = _RESIDUAL.search(line)
+        if match:
+            self.state['residualForce'] = _number(match)
+            return
+        match = _AVERAGE_FORCE.search(line)
+        if match:
+            self.state['averageForce'] = _number(match)
+            return
+        if _FINISHED.search(line):
+            self.state['finished'] = True
+
+    def snapshot(self):
+        return dict(self.state, log=list(self.lines))
@@ -0,0 +1,18 @@
+# CAD libraries are imported on first use so workers start serving quickly.
+# preload_cad() does that work up front instead: called in a process that then
+# forks its workers (gunicorn with preload_app), OCC is imported and
+# initialised once and every worker starts with it already in memory.
+
+
+def preload_cad():
+    import cadquery as cq
+    from .cad.feature_registry import FeatureRegistry
+    from .models.parametric_model import ParametricModel  # noqa: F401
+
+    registry = FeatureRegistry.get_instance()
+    for name in registry.names():
+        registry.resolve(name)
+
+    # A small boolean and a tessellation set up OCC state that is otherwise created lazily
+    shape = cq.Workplane('XY').box(10, 10, 10).faces('>Z').circle(2).cutBlind(-5).val()
+    shape.tessellate(0.1)
@@ -0,0 +1,48 @@
+import json
+import time
+from app.cad import binary_format
+
+# Compares the JSON export path with the binary model format on a synthetic
+# export of a few thousand features.
+#
+#   cd backend && python -m benchmarks.binary_format
+
+def make_export_data(feature_count):
+    return {
+        "modelId": "benchmark",
+        "parameters": {f"p{i}": float(i) for i in range(100)},
+        "features": [
+            {
+                "id": i,
+                "type": "circular_cut" if i % 2 else "concentric_extrude",
+                "args": [f"p{i % 100}", 2.5, i * 0.1],
+                "kwargs": {}
+            } for i in range(feature_count)
+        ],
+        "structuralAnalysis": {"results": None, "failurePoints": None}
+    }
+
+def measure(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main(feature_count=5000):
+    export_data = make_export_data(feature_count)
+
+    json_dump_time, json_data = measure(lambda: json.dumps(export_data, indent=2))
+    json_load_time, _ = measure(lambda: json.loads(json_data))
+    binary_dump_time, binary_data = measure(lambda: binary_format.dumps(export_data))
+    binary_load_time, _ = measure(lambda: binary_format.loads(binary_data))
+    header_time, _ = measure(lambda: binary_format.ModelArchive(binary_data).parameters)
+
+    print(f"{feature_count} features")
+    print(f"  json   dump {json_dump_time * 1000:8.2f} ms  load {json_load_time * 1000:8.2f} ms  size {len(json_data.encode('utf-8')):>10} bytes")
+    print(f"  binary dump {binary_dump_time * 1000:8.2f} ms  load {binary_load_time * 1000:8.2f} ms  size {len(binary_data):>10} bytes")
+    print(f"  binary parameters only (lazy) {header_time * 1000:8.2f} ms")
+
+if __name__ == '__main__':
+    main()
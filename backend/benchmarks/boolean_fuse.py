@@ -0,0 +1,34 @@
+import math
+import time
+import cadquery as cq
+from app.cad.boolean_ops import fuse_all
+
+# Fuses a ring of overlapping cylinders one at a time (as MirrorOperation used
+# to), with a single n-ary fuse and with a balanced tree.
+#
+#   cd backend && python -m benchmarks.boolean_fuse
+
+def make_ring(count, radius=20.0):
+    return [
+        cq.Solid.makeCylinder(3.0, 5.0, cq.Vector(radius * math.cos(a), radius * math.sin(a), 0))
+        for a in (2 * math.pi * i / count for i in range(count))
+    ]
+
+def sequential(shapes):
+    result = shapes[0]
+    for shape in shapes[1:]:
+        result = result.fuse(shape).clean()
+    return result
+
+def main(counts=(16, 64)):
+    for count in counts:
+        shapes = make_ring(count)
+        print(f"{count} cylinders")
+        for name, fuse in [('sequential', sequential), ('n-ary', lambda s: fuse_all(s, method='nary')),
+                           ('tree', lambda s: fuse_all(s, method='tree'))]:
+            start = time.perf_counter()
+            result = fuse(shapes)
+            print(f"  {name:<10} {(time.perf_counter() - start) * 1000:9.1f} ms  volume {result.Volume():.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import time
+import numpy as np
+from app.services import inp_writer
+
+# Writes the node and element sections of a synthetic 1M node tetrahedral deck
+# with string concatenation, np.savetxt and the chunked inp_writer.
+#
+#   cd backend && python -m benchmarks.inp_writer
+
+def make_mesh(node_count, elements_per_node):
+    rng = np.random.default_rng(0)
+    nodes = rng.uniform(0, 1000, (node_count, 3))
+    elements = rng.integers(1, node_count + 1, (node_count * elements_per_node, 4))
+    return nodes, elements
+
+def write_concatenated(path, nodes, elements):
+    deck = "*NODE, NSET=NALL\n"
+    for i, (x, y, z) in enumerate(nodes.tolist(), 1):
+        deck += f"{i}, {x}, {y}, {z}\n"
+    deck += "*ELEMENT, TYPE=C3D4, ELSET=EALL\n"
+    for i, (a, b, c, d) in enumerate(elements.tolist(), 1):
+        deck += f"{i}, {a}, {b}, {c}, {d}\n"
+    with open(path, 'w') as f:
+        f.write(deck)
+
+def write_savetxt(path, nodes, elements):
+    with open(path, 'w') as f:
+        f.write("*NODE, NSET=NALL\n")
+        np.savetxt(f, np.column_stack([np.arange(1, len(nodes) + 1), nodes]), fmt='%d, %.9g, %.9g, %.9g')
+        f.write("*ELEMENT, TYPE=C3D4, ELSET=EALL\n")
+        np.savetxt(f, np.column_stack([np.arange(1, len(elements) + 1), elements]), fmt='%d', delimiter=', ')
+
+def write_inp_writer(path, nodes, elements):
+    with inp_writer.open_deck(path) as f:
+        inp_writer.write_nodes(f, np.arange(1, len(nodes) + 1), nodes)
+        inp_writer.write_elements(f, 'C3D4', np.arange(1, len(elements) + 1), elements)
+
+def main(node_count=1000000, elements_per_node=5):
+    nodes, elements = make_mesh(node_count, elements_per_node)
+    print(f"{node_count} nodes, {len(elements)} elements")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model.inp')
+        for name, write in [('concatenation', write_concatenated), ('np.savetxt', write_savetxt),
+                            ('inp_writer', write_inp_writer)]:
+            start = time.perf_counter()
+            write(path, nodes, elements)
+            elapsed = time.perf_counter() - start
+            print(f"  {name:<14} {elapsed:8.2f} s  {os.path.getsize(path) / 1e6:8.1f} MB")
+
+if __name__ == '__main__':
+    main()
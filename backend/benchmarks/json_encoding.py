@@ -0,0 +1,46 @@
+import gzip
+import json
+import time
+import numpy as np
+from app.services.json_provider import dumps_bytes
+
+# Encodes a model payload with tessellated geometry using the standard library
+# (arrays converted to lists first, as get_model_data used to return them) and
+# with the response encoder, and reports the gzip-compressed size.
+#
+#   cd backend && python -m benchmarks.json_encoding
+
+def make_payload(triangles):
+    rng = np.random.default_rng(0)
+    return {
+        "id": "benchmark",
+        "parameters": {f"p{i}": float(i) for i in range(50)},
+        "vertices": rng.random((triangles // 2, 3)) * 100,
+        "faces": rng.integers(0, triangles // 2, (triangles, 3)),
+        "edges": [rng.random((16, 3)) for _ in range(triangles // 50)]
+    }
+
+def measure(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def stdlib(payload):
+    converted = dict(payload, vertices=payload['vertices'].tolist(), faces=payload['faces'].tolist(),
+                     edges=[edge.tolist() for edge in payload['edges']])
+    return json.dumps(converted).encode('utf-8')
+
+def main(sizes=(10000, 200000)):
+    for triangles in sizes:
+        payload = make_payload(triangles)
+        print(f"{triangles} triangles")
+        for name, encode in [('json', stdlib), ('encoder', dumps_bytes)]:
+            seconds, data = measure(lambda: encode(payload))
+            compressed = len(gzip.compress(data, compresslevel=6))
+            print(f"  {name:<8} {seconds * 1000:8.1f} ms  {len(data) / 1e6:7.2f} MB  gzip {compressed / 1e6:7.2f} MB")
+
+if __name__ == '__main__':
+    main()
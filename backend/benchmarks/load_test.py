@@ -0,0 +1,315 @@
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+import numpy as np
+
+# Load generator replaying editing sessions against the API, entirely on one
+# machine. Each virtual user repeatedly runs a session: open a parametric part
+# (import_model), add a cut, an extrude and a hole pattern, drag a parameter
+# through several values, reload the model and export it as STEP. Concurrency
+# is ramped through the given levels; each level runs for a fixed time and
+# reports throughput, p50/p95/p99 latency per endpoint, errors, 503s (CAD queue
+# full) and the server's resident memory before and after.
+#
+# By default a server is started in a subprocess (so the load generator does
+# not share its GIL); --server gunicorn uses gunicorn.conf.py, --url targets a
+# server that is already running (pass --pid to follow its memory).
+#
+#   cd backend && python -m benchmarks.load_test
+#   python -m benchmarks.load_test --levels 1,4,16 --duration 60 --think 0.5
+#   python -m benchmarks.load_test --server gunicorn --output load.json
+#   python -m benchmarks.load_test --url http://127.0.0.1:5000 --pid 1234
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SERVE = (
+    "import sys\n"
+    "from werkzeug.serving import run_simple\n"
+    "from app import create_app\n"
+    "run_simple('127.0.0.1', int(sys.argv[1]), create_app(), threaded=True)\n"
+)
+
+
+def start_server(port, server='werkzeug'):
+    env = dict(os.environ, FLASK_ENV='production')
+    if server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:app']
+        env.update(BIND=f'127.0.0.1:{port}')
+    else:
+        command = [sys.executable, '-c', _SERVE, str(port)]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(base_url, timeout=30.0):
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=1)
+            connection.request('GET', '/api/test')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Server at {base_url} did not start within {timeout} s")
+        time.sleep(0.1)
+
+
+def _children(pid):
+    children = []
+    try:
+        for task in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def rss_bytes(pid):
+    # Resident memory of the process and its children (gunicorn workers);
+    # None where /proc is not available
+    if pid is None:
+        return None
+    total, pids = 0, [pid]
+    while pids:
+        current = pids.pop()
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            if current == pid:
+                return None
+            continue
+        pids.extend(_children(current))
+    return total
+
+
+class Client:
+    # One keep-alive connection per virtual user; every request is recorded as
+    # (endpoint, status, seconds, response bytes). Status 0 is a connection error.
+    def __init__(self, base_url, timeout=300.0):
+        parts = urlsplit(base_url)
+        self.host, self.port, self.timeout = parts.hostname, parts.port, timeout
+        self.connection = None
+        self.records = []
+
+    def request(self, method, path, endpoint, body=None, headers=None):
+        headers = dict(headers or {}, **{'Accept-Encoding': 'gzip'})
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.close()
+            self.records.append((endpoint, 0, time.perf_counter() - start, 0))
+            return 0, {}, b''
+        self.records.append((endpoint, status, time.perf_counter() - start, len(data)))
+        if response.getheader('Content-Encoding') == 'gzip':
+            data = gzip.decompress(data)
+        return status, dict(response.getheaders()), data
+
+    def post_json(self, path, payload):
+        return self.request('POST', path, f'POST {path}', json.dumps(payload).encode('utf-8'),
+                            {'Content-Type': 'application/json'})
+
+    def upload(self, path, filename, content):
+        boundary = uuid.uuid4().hex
+        body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                f'Content-Type: application/json\r\n\r\n').encode('utf-8') + content + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        return self.request('POST', path, f'POST {path}', body, {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def part_document(rng):
+    # A plate driven by parameters, as saved by export_model
+    return json.dumps({
+        "parameters": {"radius": round(rng.uniform(50, 70), 2), "height": round(rng.uniform(15, 25), 2)},
+        "features": [{"type": "create_cylinder", "args": ["radius", "height"], "kwargs": {}}]
+    }).encode('utf-8')
+
+
+def run_session(client, rng, drag_steps=10, think=0.2):
+    # Returns False if the session had to be abandoned
+    status, _, data = client.upload('/api/import_model', 'part.json', part_document(rng))
+    if status != 200:
+        return False
+    model_id = json.loads(data)['modelId']
+    time.sleep(think)
+
+    edits = [
+        ('/api/circular_cut', {"faceSelector": ">Z", "radius": rng.uniform(5, 12), "depth": rng.uniform(2, 5)}),
+        ('/api/concentric_extrude', {"faceSelector": ">Z", "outerRadius": rng.uniform(30, 35),
+                                     "innerRadius": rng.uniform(20, 25), "height": rng.uniform(3, 6)}),
+        ('/api/circular_pattern', {"radius": 1.5, "depth": 2.0, "count": rng.randint(6, 12), "patternRadius": 27.5})
+    ]
+    for path, payload in edits:
+        client.post_json(path, dict(payload, modelId=model_id))
+        time.sleep(think)
+
+    # Dragging a slider sends one update per step
+    radius = rng.uniform(50, 70)
+    for _ in range(drag_steps):
+        radius += rng.uniform(-1, 1)
+        client.post_json('/api/update_parameter', {"modelId": model_id, "parameterName": "radius", "newValue": radius})
+        time.sleep(think / 4)
+
+    # Reload (the second one is answered from the ETag) and export
+    _, headers, _ = client.request('GET', f'/api/models/{model_id}', 'GET /api/models/<id>')
+    client.request('GET', f'/api/models/{model_id}', 'GET /api/models/<id>',
+                   headers={'If-None-Match': headers.get('ETag', '')})
+    client.request('GET', f'/api/export/{model_id}/step', 'GET /api/export/<id>/step')
+    return True
+
+
+def run_stage(base_url, users, duration=None, sessions=None, think=0.2, drag_steps=10, seed=0):
+    # users virtual users run sessions until duration seconds have passed (the
+    # sessions in progress are finished) or each has run `sessions` sessions
+    clients = [Client(base_url) for _ in range(users)]
+    completed = [0] * users
+    abandoned = [0] * users
+    deadline = time.monotonic() + duration if duration is not None else None
+
+    def user(index):
+        rng = random.Random(seed * 1000 + index)
+        client = clients[index]
+        while (sessions is None or completed[index] + abandoned[index] < sessions) and \
+                (deadline is None or time.monotonic() < deadline):
+            if run_session(client, rng, drag_steps, think):
+                completed[index] += 1
+            else:
+                abandoned[index] += 1
+                time.sleep(1)
+        client.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    records = [record for client in clients for record in client.records]
+    return summarize(records, elapsed, sum(completed), sum(abandoned))
+
+
+def summarize(records, elapsed, sessions=0, abandoned=0):
+    def stats(group):
+        seconds = np.array([record[2] for record in group])
+        p50, p95, p99 = np.percentile(seconds, [50, 95, 99])
+        return {
+            "requests": len(group),
+            "errors": sum(1 for record in group if record[1] == 0 or record[1] >= 400),
+            "busy": sum(1 for record in group if record[1] == 503),
+            "p50": float(p50), "p95": float(p95), "p99": float(p99),
+            "mean": float(seconds.mean()), "max": float(seconds.max()),
+            "bytes": sum(record[3] for record in group)
+        }
+
+    endpoints = {}
+    for record in records:
+        endpoints.setdefault(record[0], []).append(record)
+    summary = {
+        "elapsed": elapsed,
+        "sessions": sessions,
+        "abandonedSessions": abandoned,
+        "throughput": len(records) / elapsed if elapsed else 0.0,
+        "sessionsPerMinute": sessions * 60 / elapsed if elapsed else 0.0,
+        "endpoints": {endpoint: stats(group) for endpoint, group in sorted(endpoints.items())}
+    }
+    summary.update(stats(records) if records else {"requests": 0, "errors": 0, "busy": 0})
+    return summary
+
+
+def format_stage(users, summary):
+    lines = [f"{users} users: {summary['requests']} requests in {summary['elapsed']:.1f} s, "
+             f"{summary['throughput']:.1f} req/s, {summary['sessions']} sessions "
+             f"({summary['sessionsPerMinute']:.1f}/min), {summary['errors']} errors, {summary['busy']} busy"]
+    if summary.get('rssBefore') is not None:
+        growth = summary['rssAfter'] - summary['rssBefore']
+        lines.append(f"  memory {summary['rssBefore'] / 2 ** 20:.0f} -> {summary['rssAfter'] / 2 ** 20:.0f} MiB "
+                     f"({growth / 2 ** 20:+.0f} MiB, {growth / max(summary['sessions'], 1) / 2 ** 10:+.0f} KiB/session)")
+    lines.append(f"  {'endpoint':<36} {'count':>6} {'err':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for endpoint, stats in summary['endpoints'].items():
+        lines.append(f"  {endpoint:<36} {stats['requests']:6d} {stats['errors']:5d} {stats['p50'] * 1000:8.1f} "
+                     f"{stats['p95'] * 1000:8.1f} {stats['p99'] * 1000:8.1f} {stats['max'] * 1000:8.1f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.load_test', description='API load test')
+    parser.add_argument('--url', help='target a running server instead of starting one')
+    parser.add_argument('--pid', type=int, help='process id of the --url server, to follow its memory')
+    parser.add_argument('--server', choices=('werkzeug', 'gunicorn'), default='werkzeug',
+                        help='server to start (default werkzeug, threaded)')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--levels', default='1,2,4,8', help='concurrent users per stage (default 1,2,4,8)')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds per stage (default 30)')
+    parser.add_argument('--think', type=float, default=0.2, help='seconds between edits of a user (default 0.2)')
+    parser.add_argument('--drag-steps', type=int, default=10, help='parameter updates per drag (default 10)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args(argv)
+    levels = [int(level) for level in args.levels.split(',')]
+
+    process = None
+    if args.url:
+        base_url, pid = args.url.rstrip('/'), args.pid
+    else:
+        process = start_server(args.port, args.server)
+        base_url, pid = f'http://127.0.0.1:{args.port}', process.pid
+    try:
+        wait_until_ready(base_url)
+        # One untimed session so imports and OCC initialisation are not measured
+        run_stage(base_url, 1, sessions=1, think=0, drag_steps=1, seed=args.seed)
+        initial_rss = rss_bytes(pid)
+
+        stages = []
+        for users in levels:
+            rss_before = rss_bytes(pid)
+            summary = run_stage(base_url, users, args.duration, think=args.think, drag_steps=args.drag_steps,
+                                seed=args.seed + users)
+            summary.update(users=users, rssBefore=rss_before, rssAfter=rss_bytes(pid))
+            stages.append(summary)
+            print(format_stage(users, summary), flush=True)
+
+        final_rss = rss_bytes(pid)
+        if initial_rss is not None and final_rss is not None:
+            sessions = sum(stage['sessions'] for stage in stages)
+            print(f"memory after warm-up {initial_rss / 2 ** 20:.0f} MiB, at the end {final_rss / 2 ** 20:.0f} MiB "
+                  f"over {sessions} sessions (models are kept in memory, so growth per session is expected)")
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({"url": base_url, "server": None if args.url else args.server, "levels": levels,
+                           "duration": args.duration, "think": args.think, "dragSteps": args.drag_steps,
+                           "initialRss": initial_rss, "finalRss": final_rss, "stages": stages}, f, indent=2)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import math
+import time
+import cadquery as cq
+from app.cad.parametric_feature_functions import circular_pattern, create_cylinder
+
+# A bolt circle cut as one feature per hole (one boolean each) and as a single
+# circular_pattern feature.
+#
+#   cd backend && python -m benchmarks.pattern_features
+
+def one_cut_per_hole(workplane, count, radius=2.0, depth=4.0, pattern_radius=40.0):
+    solid = workplane.findSolid()
+    top = workplane.faces(">Z").val().Center()
+    for i in range(count):
+        angle = 2 * math.pi * i / count
+        center = cq.Vector(pattern_radius * math.cos(angle), pattern_radius * math.sin(angle), top.z - depth)
+        solid = solid.cut(cq.Solid.makeCylinder(radius, depth, center)).clean()
+    return solid
+
+def main(counts=(24, 96)):
+    base = create_cylinder(cq.Workplane('XY'), 60, 10)
+    for count in counts:
+        print(f"{count} holes")
+        for name, build in [('per hole', lambda: one_cut_per_hole(base, count)),
+                            ('pattern', lambda: circular_pattern(base, 2.0, 4.0, count, 40.0).val())]:
+            start = time.perf_counter()
+            result = build()
+            print(f"  {name:<9} {(time.perf_counter() - start) * 1000:9.1f} ms  volume {result.Volume():.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+
+# Worker startup: time until the app can serve /api/test and until the first
+# CAD request has been answered, for a lazily importing worker, a worker that
+# preloads CAD at startup, and workers forked from a preloaded master
+# (gunicorn preload_app). Every measurement runs in a fresh interpreter.
+#
+#   cd backend && python -m benchmarks.startup
+
+WORKER = r'''
+import os, sys, time
+start = time.perf_counter()
+from app import create_app
+app = create_app('testing')
+client = app.test_client()
+client.get('/api/test')
+ready = time.perf_counter()
+
+def first_cad_request():
+    begin = time.perf_counter()
+    model_id = client.post('/api/create_new_model').get_json()['modelId']
+    client.post('/api/add_feature', json={'modelId': model_id, 'featureType': 'create_cylinder',
+                                          'parameters': {'radius': 10, 'height': 5}})
+    return time.perf_counter() - begin
+
+if os.environ.get('FORK_WORKERS'):
+    # Time from fork to the first CAD response in each child
+    for _ in range(int(os.environ['FORK_WORKERS'])):
+        read, write = os.pipe()
+        forked = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            first_cad_request()
+            os.write(write, repr(time.perf_counter() - forked).encode())
+            os._exit(0)
+        os.waitpid(pid, 0)
+        print('fork', os.read(read, 64).decode())
+else:
+    print('ready', ready - start)
+    print('cad', first_cad_request())
+'''
+
+
+def run(env):
+    output = subprocess.run([sys.executable, '-c', WORKER], env=dict(os.environ, **env),
+                            capture_output=True, text=True, check=True).stdout
+    return [(name, float(value)) for name, value in (line.split() for line in output.splitlines())]
+
+
+def main(repeat=3):
+    for name, env in [('lazy', {'PRELOAD_CAD': ''}), ('preload', {'PRELOAD_CAD': '1'})]:
+        runs = [dict(run(env)) for _ in range(repeat)]
+        ready = min(r['ready'] for r in runs)
+        cad = min(r['cad'] for r in runs)
+        print(f"{name:<15} ready {ready * 1000:8.1f} ms   first CAD request {cad * 1000:8.1f} ms")
+
+    forks = [value for _, value in run({'PRELOAD_CAD': '1', 'FORK_WORKERS': str(repeat)})]
+    print(f"{'forked warm':<15} first CAD request {min(forks) * 1000:8.1f} ms after fork")
+
+if __name__ == '__main__':
+    main()
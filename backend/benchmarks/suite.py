@@ -0,0 +1,399 @@
+import argparse
+import contextlib
+import inspect
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Benchmark suite for the hot paths of the backend, at several sizes each:
+# model rebuilds, get_model_data (tessellation + JSON encoding), STEP export and
+# import of generated assemblies, mirror unions, INP writing and FRD parsing.
+#
+# Results can be stored as a baseline (one JSON file per machine, timings are
+# only comparable on the same machine) and later runs compared against it; the
+# comparison exits non-zero if a case got slower than the threshold allows.
+#
+#   cd backend && python -m benchmarks.suite                  # run and print
+#   python -m benchmarks.suite --save-baseline                # store as baseline
+#   python -m benchmarks.suite --compare                      # run and compare
+#   python -m benchmarks.suite -k rebuild --quick --compare   # smallest sizes only
+#   python -m benchmarks.suite --results run.json --compare   # compare a saved run
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+CASES = []
+
+
+def case(group, sizes):
+    # Registers a benchmark; the decorated function sets up a case of the given
+    # size and returns the callable that is timed. Cases that need cleaning up
+    # (temporary files) yield the callable instead and clean up after the yield
+    def register(setup):
+        CASES.append((group, tuple(sizes), setup))
+        return setup
+    return register
+
+
+def case_name(group, size):
+    return f"{group}[{size}]"
+
+
+# --- cases -------------------------------------------------------------------
+
+def _pattern_model(manager, holes):
+    from app.cad.parametric_feature_functions import circular_pattern, create_cylinder
+    model_id = manager.create_new_model()
+    manager.add_parameter(model_id, 'radius', 60.0)
+    manager.add_feature(model_id, create_cylinder, 'radius', 20.0)
+    manager.add_feature(model_id, circular_pattern, 2.0, 4.0, holes, 40.0)
+    manager.rebuild_model(model_id)
+    return model_id
+
+
+@case('rebuild', sizes=(10, 40))
+def rebuild(features):
+    # A plate with one circular_pattern per feature at varying radii and phases
+    from app.cad.model_manager import ModelManager
+    from app.cad.parametric_feature_functions import circular_pattern, create_cylinder
+    manager = ModelManager()
+    model_id = manager.create_new_model()
+    manager.add_parameter(model_id, 'radius', 60.0)
+    manager.add_feature(model_id, create_cylinder, 'radius', 20.0)
+    for i in range(features - 1):
+        manager.add_feature(model_id, circular_pattern, 1.0, 1.0 + i % 3, 6, 8.0 + 5.0 * (i % 10),
+                            start_angle=7.0 * i)
+    model = manager.get_model(model_id)
+
+    def run():
+        # Replays every feature instead of reusing the cached result
+        model.clear_cache()
+        manager.rebuild_model(model_id)
+    return run
+
+
+@case('model_data', sizes=(24, 96))
+def model_data(holes):
+    # Tessellation, edge sampling and encoding of a model with many faces
+    from app.cad.model_manager import ModelManager
+    from app.services.json_provider import dumps_bytes
+    manager = ModelManager()
+    model_id = _pattern_model(manager, holes)
+    model = manager.get_model(model_id)
+
+    def run():
+        model.clear_cache()
+        return dumps_bytes(manager.get_model_data(model_id))
+    return run
+
+
+def _assembly(parts):
+    import cadquery as cq
+    assembly = cq.Assembly(name='benchmark')
+    columns = math.ceil(math.sqrt(parts))
+    for i in range(parts):
+        x, y = 30.0 * (i % columns), 30.0 * (i // columns)
+        if i % 2:
+            part = cq.Workplane('XY').box(20, 20, 10).faces('>Z').hole(6)
+        else:
+            part = cq.Workplane('XY').cylinder(10, 10).faces('>Z').hole(4)
+        assembly.add(part, name=f'part{i}', loc=cq.Location(cq.Vector(x, y, 0)))
+    return assembly
+
+
+@case('step_export', sizes=(10, 50))
+def step_export(parts):
+    assembly = _assembly(parts)
+    with tempfile.TemporaryDirectory(prefix='benchmark-') as directory:
+        path = os.path.join(directory, 'assembly.step')
+        yield lambda: assembly.export(path)
+
+
+@case('step_import', sizes=(10, 50))
+def step_import(parts):
+    import cadquery as cq
+    with tempfile.TemporaryDirectory(prefix='benchmark-') as directory:
+        path = os.path.join(directory, 'assembly.step')
+        _assembly(parts).export(path)
+        yield lambda: cq.importers.importStep(path)
+
+
+@case('mirror_union', sizes=(8, 32))
+def mirror_union(bodies):
+    # Bodies on one side of a base plate mirrored across the YZ plane and fused
+    import cadquery as cq
+    from app.services.mirror_operation import MirrorOperation
+    base = cq.Workplane('XY').box(20, 10 * bodies + 10, 4)
+    objects = [
+        cq.Workplane('XY').add(cq.Solid.makeCylinder(3.0, 8.0, cq.Vector(6.0, 10.0 * i - 5.0 * bodies + 5.0, 0)))
+        for i in range(bodies)
+    ]
+    operation = MirrorOperation('body', objects, cq.Plane((0, 0, 0), (0, 1, 0), (1, 0, 0)), True, None)
+    return lambda: operation.apply(base)
+
+
+def _mesh(nodes):
+    import numpy as np
+    rng = np.random.default_rng(0)
+    coordinates = rng.uniform(0, 1000, (nodes, 3))
+    elements = rng.integers(1, nodes + 1, (nodes * 5, 4))
+    return coordinates, elements
+
+
+@case('inp_write', sizes=(50000, 500000))
+def inp_write(nodes):
+    import numpy as np
+    from app.services import inp_writer
+    coordinates, elements = _mesh(nodes)
+
+    with tempfile.TemporaryDirectory(prefix='benchmark-') as directory:
+        path = os.path.join(directory, 'deck.inp')
+
+        def run():
+            with inp_writer.open_deck(path) as f:
+                inp_writer.write_nodes(f, np.arange(1, nodes + 1), coordinates)
+                inp_writer.write_elements(f, 'C3D4', np.arange(1, len(elements) + 1), elements)
+        yield run
+
+
+def write_frd(path, nodes, steps=2):
+    # Node block plus a DISP and a STRESS block per step, in CalculiX's layout
+    import numpy as np
+    from app.services.inp_writer import write_rows
+    rng = np.random.default_rng(0)
+    node_ids = np.arange(1, nodes + 1)
+
+    def records(f, values):
+        write_rows(f, ' -1%10d' + '%12.5E' * values.shape[1], [node_ids] + [values[:, i] for i in range(values.shape[1])])
+        f.write(' -3\n')
+
+    with open(path, 'w') as f:
+        f.write(f'    1C\n    1UUSER\n    2C{nodes:30d}{1:37d}\n')
+        records(f, rng.uniform(-100, 100, (nodes, 3)))
+        for step in range(1, steps + 1):
+            f.write(f'    1PSTEP{step:25d}{1:12d}{step:12d}\n')
+            f.write(f'  100CL  101 1.000000000{nodes:12d}                     0{step:5d}           1\n')
+            f.write(' -4  DISP        4    1\n')
+            for i, name in enumerate(('D1', 'D2', 'D3'), 1):
+                f.write(f' -5  {name}          1    2    {i}    0\n')
+            f.write(' -5  ALL         1    2    0    0    1ALL\n')
+            records(f, rng.uniform(-1, 1, (nodes, 3)))
+            f.write(f'  100CL  101 1.000000000{nodes:12d}                     0{step:5d}           1\n')
+            f.write(' -4  STRESS      6    1\n')
+            for name in ('SXX', 'SYY', 'SZZ', 'SXY', 'SYZ', 'SZX'):
+                f.write(f' -5  {name:<10s}  1    4    1    1\n')
+            records(f, rng.uniform(-500, 500, (nodes, 6)))
+        f.write(' 9999\n')
+
+
+@case('frd_parse', sizes=(20000, 500000))
+def frd_parse(nodes):
+    from app.services.frd_parser import parse_frd
+    with tempfile.TemporaryDirectory(prefix='benchmark-') as directory:
+        path = os.path.join(directory, 'results.frd')
+        write_frd(path, nodes)
+        yield lambda: parse_frd(path)
+
+
+# --- running -----------------------------------------------------------------
+
+def select(cases, pattern=None, quick=False):
+    # (name, setup, size) of the cases whose name contains pattern
+    selected = []
+    for group, sizes, setup in cases:
+        for size in sizes[:1] if quick else sizes:
+            name = case_name(group, size)
+            if pattern is None or pattern in name:
+                selected.append((name, setup, size))
+    return selected
+
+
+def measure(func, repeat=5, budget=2.0):
+    # One untimed warm-up run, then up to repeat timed runs; stops early once
+    # three runs have been made and the time budget (seconds) is used up
+    func()
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeat:
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+        if len(times) >= 3 and time.perf_counter() - started > budget:
+            break
+    return {"min": min(times), "median": statistics.median(times), "runs": len(times)}
+
+
+def environment():
+    import numpy
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    try:
+        import OCP
+        ocp = getattr(OCP, '__version__', None)
+    except ImportError:
+        ocp = None
+    return {
+        "machine": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "ocp": ocp,
+        "commit": commit,
+        "date": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    }
+
+
+@contextlib.contextmanager
+def prepared(setup, size):
+    # The timed callable of a case, cleaned up on exit if the case yields it
+    if not inspect.isgeneratorfunction(setup):
+        yield setup(size)
+        return
+    cases = setup(size)
+    try:
+        yield next(cases)
+    finally:
+        cases.close()
+
+
+def run(selected, repeat=5, budget=2.0, out=sys.stdout):
+    results = {}
+    for name, setup, size in selected:
+        with prepared(setup, size) as func:
+            results[name] = measure(func, repeat, budget)
+        print(f"  {name:<24} {results[name]['min'] * 1000:10.1f} ms  (median {results[name]['median'] * 1000:.1f} ms, "
+              f"{results[name]['runs']} runs)", file=out, flush=True)
+    return {"environment": environment(), "results": results}
+
+
+def compare(baseline, current, threshold=0.25):
+    # Rows of (name, baseline seconds, current seconds, ratio, status) on the
+    # best time of each case. status: ok, faster, slower (beyond threshold),
+    # new (not in the baseline) or missing (not run)
+    rows = []
+    old, new = baseline['results'], current['results']
+    for name in list(old) + [name for name in new if name not in old]:
+        if name not in new:
+            rows.append((name, old[name]['min'], None, None, 'missing'))
+        elif name not in old:
+            rows.append((name, None, new[name]['min'], None, 'new'))
+        else:
+            ratio = new[name]['min'] / old[name]['min']
+            if ratio > 1 + threshold:
+                status = 'slower'
+            elif ratio < 1 / (1 + threshold):
+                status = 'faster'
+            else:
+                status = 'ok'
+            rows.append((name, old[name]['min'], new[name]['min'], ratio, status))
+    return rows
+
+
+def regressions(rows):
+    return [row for row in rows if row[4] == 'slower']
+
+
+def format_report(rows, baseline_environment=None, current_environment=None):
+    def ms(value):
+        return f"{value * 1000:10.1f}" if value is not None else f"{'-':>10}"
+
+    lines = []
+    if baseline_environment and current_environment:
+        for key in ('machine', 'cpus', 'python', 'numpy', 'ocp'):
+            if baseline_environment.get(key) != current_environment.get(key):
+                lines.append(f"warning: {key} differs from the baseline "
+                             f"({baseline_environment.get(key)} -> {current_environment.get(key)})")
+        lines.append(f"baseline {baseline_environment.get('commit')} ({baseline_environment.get('date')}), "
+                     f"current {current_environment.get('commit')}")
+    lines.append(f"{'case':<24} {'baseline ms':>11} {'current ms':>10} {'ratio':>7}  status")
+    for name, old, new, ratio, status in rows:
+        ratio_text = f"{ratio:7.2f}" if ratio is not None else f"{'-':>7}"
+        lines.append(f"{name:<24} {ms(old):>11} {ms(new)} {ratio_text}  {status}")
+    slower = regressions(rows)
+    lines.append(f"{len(slower)} regression{'' if len(slower) == 1 else 's'}")
+    return '\n'.join(lines)
+
+
+def default_baseline():
+    return os.path.join(BASELINE_DIR, f"{platform.node() or 'default'}.json")
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description='Backend benchmark suite')
+    parser.add_argument('-k', dest='pattern', help='only run cases whose name contains this')
+    parser.add_argument('--quick', action='store_true', help='only the smallest size of each case')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case (default 5)')
+    parser.add_argument('--budget', type=float, default=2.0,
+                        help='seconds per case after which no further runs are made beyond three (default 2)')
+    parser.add_argument('--list', action='store_true', help='list the cases and exit')
+    parser.add_argument('--results', help='compare or save these stored results instead of running')
+    parser.add_argument('--output', help='write the results to this file')
+    parser.add_argument('--baseline', default=default_baseline(),
+                        help='baseline file (default: benchmarks/baselines/<hostname>.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the baseline')
+    parser.add_argument('--compare', action='store_true', help='compare the results with the baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative slowdown reported as a regression (default 0.25)')
+    args = parser.parse_args(argv)
+
+    selected = select(CASES, args.pattern, args.quick)
+    if args.list:
+        for name, _, _ in selected:
+            print(name)
+        return 0
+
+    if args.results:
+        current = load(args.results)
+    else:
+        if not selected:
+            parser.error('no cases match')
+        current = run(selected, args.repeat, args.budget)
+    if args.output:
+        save(current, args.output)
+
+    status = 0
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            parser.error(f'no baseline at {args.baseline}; run with --save-baseline first')
+        baseline = load(args.baseline)
+        if args.pattern or args.quick:
+            # Cases that were not selected are not missing
+            names = {name for name, _, _ in selected}
+            baseline = dict(baseline, results={k: v for k, v in baseline['results'].items() if k in names})
+        rows = compare(baseline, current, args.threshold)
+        print(format_report(rows, baseline.get('environment'), current.get('environment')))
+        status = 1 if regressions(rows) else 0
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            # Keep the timings of cases that were not run this time
+            previous = load(args.baseline)
+            current = dict(current, results=dict(previous['results'], **current['results']))
+        save(current, args.baseline)
+        print(f"baseline saved to {args.baseline}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
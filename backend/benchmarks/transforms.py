@@ -0,0 +1,45 @@
+import time
+import numpy as np
+from app.cad import transforms
+from app.cad.mirror_functions import mirror_sketch
+
+# Mirrors a 1M point sketch with the former per-point formula and with the
+# transform kernel, and builds a 24 instance circular pattern of it.
+#
+#   cd backend && python -m benchmarks.transforms
+
+def mirror_point(point, mirror_line):
+    # Per-point implementation that mirror_sketch used before the kernel
+    x1, y1 = mirror_line[0]
+    x2, y2 = mirror_line[1]
+    x, y = point
+    dx = x2 - x1
+    dy = y2 - y1
+    a = (dx * dx - dy * dy) / (dx * dx + dy * dy)
+    b = 2 * dx * dy / (dx * dx + dy * dy)
+    return (a * (x - x1) + b * (y - y1) + x1, b * (x - x1) - a * (y - y1) + y1)
+
+def measure(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main(point_count=1000000):
+    points = np.random.default_rng(0).uniform(-100, 100, (point_count, 2))
+    point_list = [tuple(p) for p in points.tolist()]
+    line = ((0.0, 0.0), (1.0, 2.0))
+
+    loop_time, _ = measure(lambda: [mirror_point(p, line) for p in point_list], repeat=1)
+    kernel_time, _ = measure(lambda: mirror_sketch(points, line))
+    pattern_time, _ = measure(lambda: transforms.apply_many(points, transforms.circular_pattern(24, (0.0, 0.0))))
+
+    print(f"{point_count} points")
+    print(f"  per-point mirror     {loop_time * 1000:10.1f} ms")
+    print(f"  kernel mirror        {kernel_time * 1000:10.1f} ms")
+    print(f"  24x circular pattern {pattern_time * 1000:10.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -9,9 +10,44 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB max-limit for file uploads
-    ALLOWED_EXTENSIONS = {'json', 'step', 'stp'}
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH') or 16 * 1024 * 1024)  # 16 MB default limit for file uploads
+    ALLOWED_EXTENSIONS = {'json', 'ccad', 'zip', 'step', 'stp', 'dxf'}
+    # Largest decompressed size of a model in an uploaded archive
+    IMPORT_MAX_ENTRY_BYTES = int(os.environ.get('IMPORT_MAX_ENTRY_BYTES') or 64 * 1024 * 1024)
     CALCULIX_PATH = os.environ.get('CALCULIX_PATH') or '/usr/bin/ccx'
+    CALCULIX_WORK_DIR = os.environ.get('CALCULIX_WORK_DIR') or os.path.join(tempfile.gettempdir(), 'cloudcad_ccx')
+    CALCULIX_CORE_BUDGET = int(os.environ.get('CALCULIX_CORE_BUDGET') or os.cpu_count() or 1)
+    CALCULIX_THREADS_PER_JOB = int(os.environ.get('CALCULIX_THREADS_PER_JOB') or 1)
+    CALCULIX_TIMEOUT = int(os.environ.get('CALCULIX_TIMEOUT') or 600)
+    CALCULIX_JOB_TTL = int(os.environ.get('CALCULIX_JOB_TTL') or 3600)
+    MAX_WORKERS = int(os.environ.get('MAX_WORKERS') or 4)
+    EXPORT_CACHE_DIR = os.environ.get('EXPORT_CACHE_DIR') or os.path.join(basedir, 'export_cache')
+    EXPORT_CACHE_MAX_BYTES = int(os.environ.get('EXPORT_CACHE_MAX_BYTES') or 1024 * 1024 * 1024)
+    EXPORT_ASYNC_FACE_THRESHOLD = int(os.environ.get('EXPORT_ASYNC_FACE_THRESHOLD') or 2000)
+    EXPORT_JOB_TTL = int(os.environ.get('EXPORT_JOB_TTL') or 3600)
+    # Responses of at least COMPRESS_MIN_SIZE bytes are gzip/brotli compressed
+    # when the client accepts it (usually done by a reverse proxy if there is one)
+    COMPRESS_RESPONSES = os.environ.get('COMPRESS_RESPONSES', '1').lower() in ('1', 'true', 'yes')
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE') or 1024)
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL') or 6)
+    # Rebuild, tessellation and request metrics served at /metrics
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes')
+    # Requests slower than SLOW_REQUEST_THRESHOLD seconds are saved with their
+    # inputs and a sampled profile to SLOW_REQUEST_DIR (see app/replay.py)
+    SLOW_REQUEST_CAPTURE = os.environ.get('SLOW_REQUEST_CAPTURE', '').lower() in ('1', 'true', 'yes')
+    SLOW_REQUEST_THRESHOLD = float(os.environ.get('SLOW_REQUEST_THRESHOLD') or 1.0)
+    SLOW_REQUEST_DIR = os.environ.get('SLOW_REQUEST_DIR') or os.path.join(basedir, 'slow_requests')
+    SLOW_REQUEST_MAX_FILES = int(os.environ.get('SLOW_REQUEST_MAX_FILES') or 50)
+    SLOW_REQUEST_SAMPLE_INTERVAL = float(os.environ.get('SLOW_REQUEST_SAMPLE_INTERVAL') or 0.005)
+    # Threads per process that run CPU-bound CAD work, and how many CAD requests
+    # may wait for one before new ones are refused with 503
+    CAD_WORKERS = int(os.environ.get('CAD_WORKERS') or 1)
+    CAD_QUEUE_LIMIT = int(os.environ.get('CAD_QUEUE_LIMIT') or 16)
+    # Open server-sent event streams per process; each holds a request thread,
+    # so this must stay below gunicorn's IO_THREADS
+    EVENT_STREAM_LIMIT = int(os.environ.get('EVENT_STREAM_LIMIT') or 16)
+    # Import cadquery/OCC when the app is created instead of on the first CAD request
+    PRELOAD_CAD = os.environ.get('PRELOAD_CAD', '').lower() in ('1', 'true', 'yes')
 
 class DevelopmentConfig(Config):
     DEBUG = True
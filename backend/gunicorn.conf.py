@@ -0,0 +1,42 @@
+import os
+
+# gunicorn -c gunicorn.conf.py run:app
+#
+# gthread workers: each worker process serves requests on a pool of threads.
+# Request threads do the I/O (uploads, downloads, job polling, event streams);
+# CPU-bound CAD work is handed to the app's own CAD threads (CAD_WORKERS per
+# process, see app/services/cad_pool.py), so a long rebuild never blocks
+# downloads or progress streams served by the same process.
+#
+# Models are held in process memory, so the default is a single worker process.
+# Several processes (WEB_CONCURRENCY) need clients to be routed back to the
+# process that holds their models.
+#
+# Every open event stream (/api/models/<id>/events, /api/analysis_jobs/<id>/events)
+# occupies one of the IO_THREADS request threads for as long as the client is
+# connected. The app caps open streams per process at EVENT_STREAM_LIMIT
+# (default 16) and refuses further ones with 503, so at least
+# IO_THREADS - EVENT_STREAM_LIMIT threads stay free for uploads, downloads and
+# polling. Raise both together when more viewers need live updates.
+#
+# With PRELOAD_CAD=1 the master creates the app, importing and initialising
+# OCC once, and forks already warm workers. Without it every worker starts
+# fast and imports cadquery on its first CAD request.
+
+bind = os.environ.get('BIND') or '0.0.0.0:5000'
+workers = int(os.environ.get('WEB_CONCURRENCY') or 1)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS') or 'gthread'
+threads = int(os.environ.get('IO_THREADS') or 32)
+preload_app = os.environ.get('PRELOAD_CAD', '').lower() in ('1', 'true', 'yes')
+
+# The worker heartbeat runs on its own thread in gthread workers, so long event
+# streams and analyses do not trip the timeout; it only catches hung processes
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 120)
+graceful_timeout = 30
+keepalive = 5
+
+# Heartbeat file in memory rather than on a possibly slow disk
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = '-'
@@ -3,4 +3,5 @@ from app import create_app
 app = create_app()
 
 if __name__ == '__main__':
-    app.run(port=5000, debug=True)
\ No newline at end of file
+    # Development server; use gunicorn.conf.py in production
+    app.run(port=5000, debug=app.config.get('DEBUG', False), threaded=True)
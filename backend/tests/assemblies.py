@@ -0,0 +1,183 @@
+import math
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import cadquery as cq
+import numpy as np
+from app import create_app
+from app.cad.assembly_manager import AssemblyManager
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import create_cylinder
+from app.models.assembly import parse_transform
+from app.services.export_service import ExportService
+
+def part(manager, radius=5.0, height=20.0):
+    # A bolt-like cylinder driven by parameters
+    model_id = manager.create_new_model()
+    manager.add_parameter(model_id, 'radius', radius)
+    manager.add_parameter(model_id, 'height', height)
+    manager.add_feature(model_id, create_cylinder, 'radius', 'height')
+    manager.rebuild_model(model_id)
+    return model_id
+
+class TestAssembly(unittest.TestCase):
+    def setUp(self):
+        self.models = ModelManager()
+        self.manager = AssemblyManager(self.models)
+        self.bolt = part(self.models)
+        self.bracket = part(self.models, 30.0, 4.0)
+        self.assembly_id = self.manager.create_assembly('frame')
+        self.assembly = self.manager.get_assembly(self.assembly_id)
+        self.assembly.add_instance(self.bracket)
+        for i in range(4):
+            self.assembly.add_instance(self.bolt, {"translation": [20.0 * math.cos(i * math.pi / 2),
+                                                                   20.0 * math.sin(i * math.pi / 2), 10.0]})
+
+    def test_instances_share_part_geometry(self):
+        shape = self.assembly.shape()
+        solids = shape.Solids()
+        self.assertEqual(len(solids), 5)
+        bolts = solids[1:]
+        for bolt in bolts[1:]:
+            self.assertTrue(bolt.wrapped.IsPartner(bolts[0].wrapped))
+        self.assertAlmostEqual(shape.Volume(), math.pi * (30 ** 2 * 4 + 4 * 5 ** 2 * 20), places=3)
+
+        data = self.manager.get_assembly_data(self.assembly_id)
+        self.assertEqual([p['modelId'] for p in data['parts']], [self.bracket, self.bolt])
+        self.assertEqual(data['parts'][1]['instances'], [1, 2, 3, 4])
+        # Each part is tessellated once, by its model
+        self.assertIs(data['parts'][1]['vertices'], self.models.get_model(self.bolt).vertices())
+        np.testing.assert_allclose(data['boundingBox']['min'], [-30, -30, -2], atol=1e-6)
+        np.testing.assert_allclose(data['boundingBox']['max'], [30, 30, 20], atol=1e-6)
+
+    def test_editing_a_part_rebuilds_only_that_part(self):
+        bracket = self.models.get_model(self.bracket)
+        bracket_revision = bracket.revision
+        bracket_mesh = bracket.vertices()
+        revision = self.assembly.revision
+
+        self.manager.update_part_parameter(self.assembly_id, self.bolt, 'radius', 4.0)
+        self.assertEqual(bracket.revision, bracket_revision)
+        self.assertIs(bracket.vertices(), bracket_mesh)
+        self.assertGreater(self.assembly.revision, revision)
+        self.assertAlmostEqual(self.assembly.shape().Volume(), math.pi * (30 ** 2 * 4 + 4 * 4 ** 2 * 20), places=3)
+
+        with self.assertRaises(ValueError):
+            self.manager.update_part_parameter(self.assembly_id, part(self.models), 'radius', 1.0)
+
+    def test_structural_edits_bump_revision(self):
+        revision = self.assembly.revision
+        self.assertEqual(self.assembly.revision, revision)
+        self.assembly.set_transform(1, {"rotation": {"axis": [1, 0, 0], "angle": 90}})
+        self.assertGreater(self.assembly.revision, revision)
+        revision = self.assembly.revision
+        self.assembly.remove_instance(4)
+        self.assertGreater(self.assembly.revision, revision)
+        self.assertEqual(len(self.assembly.shape().Solids()), 4)
+
+    def test_geometry_revision_ignores_part_display_changes(self):
+        geometry = self.assembly.geometry_revision
+        self.models.get_model(self.bolt).set_feature_color(0, (1, 0, 0))
+        self.assertEqual(self.assembly.geometry_revision, geometry)
+        self.models.update_parameter(self.bolt, 'radius', 6.0)
+        self.assertNotEqual(self.assembly.geometry_revision, geometry)
+        geometry = self.assembly.geometry_revision
+        self.assembly.set_transform(1, {"translation": [0, 0, 1]})
+        self.assertNotEqual(self.assembly.geometry_revision, geometry)
+
+    def test_transforms(self):
+        matrix = parse_transform({"translation": [1, 2, 3], "rotation": {"axis": [0, 0, 1], "angle": 90}})
+        np.testing.assert_allclose(matrix @ [1, 0, 0, 1], [1, 3, 3, 1], atol=1e-12)
+        np.testing.assert_array_equal(parse_transform(matrix.tolist()), matrix)
+        with self.assertRaises(ValueError):
+            parse_transform(np.diag([2.0, 1.0, 1.0, 1.0]).tolist())
+        with self.assertRaises(ValueError):
+            parse_transform(np.diag([-1.0, 1.0, 1.0, 1.0]).tolist())
+        with self.assertRaises(ValueError):
+            parse_transform([[1, 0], [0, 1]])
+        with self.assertRaises(ValueError):
+            self.assembly.add_instance('missing')
+
+class TestAssemblyRoutes(unittest.TestCase):
+    def setUp(self):
+        # Exports go to a temporary cache instead of the app's
+        self.cache_dir = tempfile.mkdtemp()
+        ExportService._instance = ExportService(cache_dir=self.cache_dir)
+        self.client = create_app('testing').test_client()
+        self.bolt = part(ModelManager.get_instance())
+
+    def tearDown(self):
+        ExportService._instance = None
+        shutil.rmtree(self.cache_dir)
+
+    def test_assembly_round_trip(self):
+        response = self.client.post('/api/assemblies', json={"name": "rack"})
+        assembly_id = response.get_json()['assemblyId']
+        for x in (0, 20, 40):
+            response = self.client.post(f'/api/assemblies/{assembly_id}/instances',
+                                        json={"modelId": self.bolt, "transform": {"translation": [x, 0, 0]}})
+            self.assertTrue(response.get_json()['success'])
+        self.assertEqual(response.get_json()['instance']['transform'][0][3], 40)
+        response = self.client.post(f'/api/assemblies/{assembly_id}/instances',
+                                    json={"modelId": self.bolt, "transform": [[2, 0, 0, 0]] * 4})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(f'/api/assemblies/{assembly_id}')
+        assembly = response.get_json()['assembly']
+        self.assertEqual(len(assembly['parts']), 1)
+        self.assertEqual(len(assembly['instances']), 3)
+        etag = response.headers['ETag']
+        self.assertEqual(self.client.get(f'/api/assemblies/{assembly_id}', headers={'If-None-Match': etag}).status_code, 304)
+
+        response = self.client.post(f'/api/assemblies/{assembly_id}/parts/{self.bolt}/update_parameter',
+                                    json={"parameterName": "height", "newValue": 30.0})
+        self.assertTrue(response.get_json()['success'])
+        self.assertAlmostEqual(response.get_json()['updatedPart']['boundingBox']['max'][2], 15.0)
+        self.assertEqual(self.client.get(f'/api/assemblies/{assembly_id}', headers={'If-None-Match': etag}).status_code, 200)
+
+        self.assertEqual(self.client.delete(f'/api/assemblies/{assembly_id}/instances/2').status_code, 200)
+        self.assertEqual(self.client.delete(f'/api/assemblies/{assembly_id}/instances/2').status_code, 404)
+
+        response = self.client.get(f'/api/assemblies/{assembly_id}/export/step')
+        self.assertEqual(response.status_code, 200)
+        fd, path = tempfile.mkstemp(suffix='.step')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(response.data)
+        response.close()
+        try:
+            self.assertEqual(len(cq.importers.importStep(path).solids().vals()), 2)
+        finally:
+            os.unlink(path)
+
+    def test_geometry_is_built_on_cad_threads(self):
+        manager = AssemblyManager.get_instance()
+        assembly_id = manager.create_assembly('rack')
+        manager.add_instance(assembly_id, self.bolt)
+        assembly = manager.get_assembly(assembly_id)
+
+        threads = []
+        shape = assembly.shape
+        def recording():
+            threads.append(threading.current_thread().name)
+            return shape()
+        get_assembly_data = manager.get_assembly_data
+        def recording_data(assembly_id):
+            threads.append(threading.current_thread().name)
+            return get_assembly_data(assembly_id)
+        with mock.patch.object(assembly, 'shape', side_effect=recording), \
+                mock.patch.object(manager, 'get_assembly_data', side_effect=recording_data):
+            self.assertEqual(self.client.get(f'/api/assemblies/{assembly_id}').status_code, 200)
+            response = self.client.get(f'/api/assemblies/{assembly_id}/export/stl')
+            self.assertEqual(response.status_code, 200)
+            response.close()
+        self.assertGreaterEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith('cad') for name in threads))
+
+    def test_unknown_assembly(self):
+        self.assertEqual(self.client.get('/api/assemblies/missing').status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
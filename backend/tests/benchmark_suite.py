@@ -0,0 +1,58 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from benchmarks import suite
+
+def results(**timings):
+    return {"environment": {"machine": "test"},
+            "results": {name: {"min": seconds, "median": seconds, "runs": 3} for name, seconds in timings.items()}}
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_compare_flags_changes_beyond_threshold(self):
+        baseline = results(a=1.0, b=1.0, c=1.0, gone=1.0)
+        current = results(a=1.1, b=1.5, c=0.5, added=2.0)
+        rows = {row[0]: row for row in suite.compare(baseline, current, threshold=0.25)}
+        self.assertEqual(rows['a'][4], 'ok')
+        self.assertEqual(rows['b'][4], 'slower')
+        self.assertAlmostEqual(rows['b'][3], 1.5)
+        self.assertEqual(rows['c'][4], 'faster')
+        self.assertEqual(rows['gone'][4], 'missing')
+        self.assertEqual(rows['added'][4], 'new')
+        self.assertEqual([row[0] for row in suite.regressions(rows.values())], ['b'])
+        self.assertIn('1 regression', suite.format_report(list(rows.values())))
+
+    def test_select_by_name_and_quick(self):
+        cases = [('rebuild', (10, 40), None), ('frd_parse', (100, 1000), None)]
+        self.assertEqual([name for name, _, _ in suite.select(cases)],
+                         ['rebuild[10]', 'rebuild[40]', 'frd_parse[100]', 'frd_parse[1000]'])
+        self.assertEqual([name for name, _, _ in suite.select(cases, quick=True)], ['rebuild[10]', 'frd_parse[100]'])
+        self.assertEqual([name for name, _, _ in suite.select(cases, 'frd')], ['frd_parse[100]', 'frd_parse[1000]'])
+
+    def test_compare_against_saved_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.compare_against_saved_baseline(directory)
+
+    def compare_against_saved_baseline(self, directory):
+        baseline_path = os.path.join(directory, 'baseline.json')
+        run_path = os.path.join(directory, 'run.json')
+        suite.save(results(**{'rebuild[10]': 1.0}), run_path)
+        self.assertEqual(suite.main(['--results', run_path, '--baseline', baseline_path, '--save-baseline']), 0)
+        self.assertEqual(suite.main(['--results', run_path, '--baseline', baseline_path, '--compare']), 0)
+
+        suite.save(results(**{'rebuild[10]': 2.0}), run_path)
+        self.assertEqual(suite.main(['--results', run_path, '--baseline', baseline_path, '--compare']), 1)
+
+    def test_cases_remove_their_temporary_files(self):
+        with tempfile.TemporaryDirectory() as directory, mock.patch('tempfile.tempdir', directory):
+            suite.run([('frd_parse[200]', suite.frd_parse, 200)], repeat=1, budget=0, out=io.StringIO())
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_measure_reports_best_and_median(self):
+        timing = suite.measure(lambda: None, repeat=4)
+        self.assertEqual(timing['runs'], 4)
+        self.assertLessEqual(timing['min'], timing['median'])
+
+if __name__ == '__main__':
+    unittest.main()
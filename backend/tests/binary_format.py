@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from app.cad import binary_format
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import create_cylinder, circular_cut
+
+class TestBinaryFormat(unittest.TestCase):
+    def test_value_round_trip(self):
+        value = {
+            'small': 3,
+            'negative': -7,
+            'large': 2 ** 40,
+            'float': 1.25,
+            'text': 'x' * 300,
+            'flags': [True, False, None],
+            'nested': {'args': (10, 2.5), 'kwargs': {}},
+            'raw': b'\x00\x01\x02'
+        }
+        expected = dict(value, nested={'args': [10, 2.5], 'kwargs': {}})
+        self.assertEqual(binary_format.decode_value(binary_format.encode_value(value)), expected)
+
+    def test_archive_sections_and_blobs(self):
+        export_data = {
+            'modelId': 'abc',
+            'parameters': {'radius': 5},
+            'features': [{'id': 0, 'type': 'circular_cut', 'args': ['radius', 2], 'kwargs': {}}],
+            'structuralAnalysis': None
+        }
+        nodes = np.arange(12, dtype=np.float64).reshape(4, 3)
+        data = binary_format.dumps(export_data, blobs={'nodes': nodes, 'brep': b'DBRep_DrawableShape'})
+
+        self.assertTrue(binary_format.is_binary(data))
+        archive = binary_format.ModelArchive(data)
+        self.assertEqual(archive.parameters, {'radius': 5})
+        self.assertEqual(archive.features[0]['args'], ['radius', 2])
+        self.assertEqual(sorted(archive.blob_names()), ['brep', 'nodes'])
+        np.testing.assert_array_equal(archive.blob('nodes'), nodes)
+        self.assertEqual(bytes(archive.blob('brep')), b'DBRep_DrawableShape')
+
+    def test_memory_mapped_archive(self):
+        data = binary_format.dumps({'modelId': 'abc', 'parameters': {}, 'features': []})
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.ccad') as f:
+            f.write(data)
+        try:
+            with binary_format.ModelArchive.open(f.name) as archive:
+                self.assertEqual(archive.model_id, 'abc')
+                self.assertEqual(archive.features, [])
+        finally:
+            os.unlink(f.name)
+
+    def test_rejects_unknown_data(self):
+        self.assertFalse(binary_format.is_binary('{"modelId": "abc"}'))
+        with self.assertRaises(ValueError):
+            binary_format.ModelArchive(b'{"modelId": "abc"}' + bytes(16))
+
+    def test_model_manager_round_trip(self):
+        model_manager = ModelManager.get_instance()
+        model_id = model_manager.create_new_model()
+        model_manager.add_parameter(model_id, 'height', 10)
+        model_manager.add_feature(model_id, create_cylinder, 20, 'height')
+        model_manager.add_feature(model_id, circular_cut, 5, 2)
+
+        data = model_manager.export_model(model_id, format='binary')
+        imported_id = model_manager.import_model(data)
+
+        self.assertEqual(
+            model_manager.export_model(imported_id, format='binary')[:len(binary_format.MAGIC)],
+            binary_format.MAGIC
+        )
+        imported = model_manager.get_model(imported_id)
+        self.assertEqual(imported.parameters, {'height': 10})
+        self.assertEqual([f['type'] for f in imported.features], ['create_cylinder', 'circular_cut'])
+        self.assertEqual(len(imported.get_model().faces().vals()), 5)
+
+        # The default JSON export is text and imports as is
+        imported_id = model_manager.import_model(model_manager.export_model(model_id))
+        self.assertEqual(model_manager.get_model(imported_id).parameters, {'height': 10})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import cadquery as cq
+from app.cad.boolean_ops import contains, fuse_all, shapes_of
+from app.services.mirror_operation import MirrorOperation
+
+def row_of_boxes(count, step=0.5):
+    # Overlapping unit boxes along X
+    return [cq.Solid.makeBox(1, 1, 1, cq.Vector(i * step, 0, 0)) for i in range(count)]
+
+class TestBooleanOps(unittest.TestCase):
+    def test_nary_and_tree_agree_with_sequential_union(self):
+        boxes = row_of_boxes(9)
+        sequential = boxes[0]
+        for box in boxes[1:]:
+            sequential = sequential.fuse(box)
+
+        for method in ('nary', 'tree'):
+            fused = fuse_all(boxes, method=method)
+            self.assertAlmostEqual(fused.Volume(), sequential.Volume(), places=6)
+            self.assertEqual(len(fused.Solids()), 1)
+            # clean() merges the coplanar faces of the overlapping boxes
+            self.assertEqual(len(fused.Faces()), 6)
+
+    def test_disjoint_bodies_stay_separate(self):
+        fused = fuse_all(row_of_boxes(4, step=2))
+        self.assertEqual(len(fused.Solids()), 4)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            fuse_all([])
+        with self.assertRaises(ValueError):
+            fuse_all(row_of_boxes(2), method='sideways')
+
+    def test_contains(self):
+        model = cq.Workplane('XY').box(1, 1, 1)
+        self.assertTrue(contains(shapes_of(model), model.val()))
+        self.assertFalse(contains(shapes_of(model), cq.Workplane('XY').box(1, 1, 1).val()))
+
+class TestMirrorOperation(unittest.TestCase):
+    def setUp(self):
+        self.plane = cq.Plane(origin=(0, 0, 0), xDir=(0, 1, 0), normal=(1, 0, 0))
+
+    def test_mirror_disjoint_body(self):
+        model = cq.Workplane('XY').box(1, 1, 1).translate((1, 0, 0))
+        result = MirrorOperation('body', [model], self.plane, True, None).apply(model)
+        self.assertEqual(len(result.solids().vals()), 2)
+        self.assertAlmostEqual(result.val().Volume(), 2.0, places=6)
+        self.assertAlmostEqual(result.val().BoundingBox().xmin, -1.5, places=6)
+
+    def test_mirror_overlapping_body(self):
+        model = cq.Workplane('XY').box(1, 1, 1).translate((0.25, 0, 0))
+        result = MirrorOperation('body', [model], self.plane, True, None).apply(model)
+        self.assertEqual(len(result.solids().vals()), 1)
+        self.assertAlmostEqual(result.val().Volume(), 1.5, places=6)
+
+    def test_separate_original_is_fused_once(self):
+        model = cq.Workplane('XY').box(1, 1, 1).translate((0, 0, 5))
+        part = cq.Workplane('XY').box(1, 1, 1).translate((2, 0, 0))
+        result = MirrorOperation('body', [part], self.plane, True, None).apply(model)
+        self.assertEqual(len(result.solids().vals()), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import io
+import json
+import unittest
+import zipfile
+from app import create_app
+from app.cad.model_manager import ModelManager
+from app.cad.bulk_transfer import MANIFEST_NAME, iter_export_archive, import_archive
+from app.cad.parametric_feature_functions import create_cylinder, circular_cut
+
+class TestBulkTransfer(unittest.TestCase):
+    def setUp(self):
+        self.model_manager = ModelManager.get_instance()
+        self.model_ids = []
+        for radius in (10, 15, 20):
+            model_id = self.model_manager.create_new_model()
+            self.model_manager.add_feature(model_id, create_cylinder, radius, 10)
+            self.model_manager.add_feature(model_id, circular_cut, 2, 1)
+            self.model_ids.append(model_id)
+
+    def test_export_import_round_trip(self):
+        archive_bytes = b''.join(iter_export_archive(self.model_manager, self.model_ids + ['missing']))
+
+        with zipfile.ZipFile(io.BytesIO(archive_bytes)) as archive:
+            manifest = json.loads(archive.read(MANIFEST_NAME))
+        self.assertEqual([m['success'] for m in manifest['models']], [True, True, True, False])
+
+        results = import_archive(self.model_manager, io.BytesIO(archive_bytes))
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(result['success'] for result in results))
+        for result in results:
+            model = self.model_manager.get_model(result['modelId'])
+            self.assertEqual([f['type'] for f in model.features], ['create_cylinder', 'circular_cut'])
+
+    def test_import_reports_failed_entries(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('good.ccad', self.model_manager.export_model(self.model_ids[0], format='binary'))
+            archive.writestr('bad.json', '{"parameters": {}, "features": [{"type": "unknown", "args": [], "kwargs": {}}]}')
+        buffer.seek(0)
+
+        results = {result['entry']: result for result in import_archive(self.model_manager, buffer)}
+        self.assertTrue(results['good.ccad']['success'])
+        self.assertFalse(results['bad.json']['success'])
+        self.assertIn('Unknown feature type', results['bad.json']['error'])
+
+    def test_each_entry_is_imported_through_run(self):
+        archive_bytes = b''.join(iter_export_archive(self.model_manager, self.model_ids))
+        calls = []
+        def run(func, *args):
+            calls.append(func)
+            return func(*args)
+        results = import_archive(self.model_manager, io.BytesIO(archive_bytes), run=run)
+        self.assertEqual(len(calls), 3)
+        self.assertTrue(all(result['success'] for result in results))
+
+    def test_oversized_entries_are_refused_unread(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('small.ccad', self.model_manager.export_model(self.model_ids[0], format='binary'))
+            archive.writestr('bomb.json', ' ' * (1024 * 1024))
+        buffer.seek(0)
+
+        results = {result['entry']: result for result in
+                   import_archive(self.model_manager, buffer, max_entry_bytes=64 * 1024)}
+        self.assertTrue(results['small.ccad']['success'])
+        self.assertFalse(results['bomb.json']['success'])
+        self.assertIn('larger than', results['bomb.json']['error'])
+
+    def test_routes(self):
+        client = create_app('testing').test_client()
+        response = client.post('/api/export_models', json={'modelIds': self.model_ids, 'format': 'json'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/zip')
+
+        response = client.post('/api/import_models', data={'file': (io.BytesIO(response.data), 'models.zip')})
+        self.assertEqual(response.json['imported'], 3)
+        self.assertEqual(response.json['failed'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
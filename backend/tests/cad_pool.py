@@ -0,0 +1,118 @@
+import threading
+import unittest
+from unittest import mock
+from flask import Flask, jsonify
+from app import create_app
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import create_cylinder
+from app.services.cad_pool import CadPool, CadPoolBusy, cad_route
+
+class TestCadPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = CadPool(max_workers=1, queue_limit=1)
+
+    def tearDown(self):
+        self.pool.executor.shutdown(wait=True)
+
+    def test_work_runs_on_cad_threads(self):
+        name = self.pool.run(lambda: threading.current_thread().name)
+        self.assertTrue(name.startswith('cad'))
+        self.assertEqual(self.pool.pending, 0)
+
+    def test_nested_work_runs_inline(self):
+        # Would deadlock with a single CAD thread if it were queued
+        self.assertEqual(self.pool.run(lambda: self.pool.run(lambda: 42)), 42)
+
+    def test_errors_propagate(self):
+        def fail():
+            raise ValueError("bad geometry")
+        with self.assertRaises(ValueError):
+            self.pool.run(fail)
+        self.assertEqual(self.pool.pending, 0)
+
+    def test_full_queue_is_refused(self):
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        # One running, one queued
+        threads = [threading.Thread(target=self.pool.run, args=(block,)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        while self.pool.pending < 2:
+            pass
+        with self.assertRaises(CadPoolBusy):
+            self.pool.run(lambda: None)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertIsNone(self.pool.run(lambda: None))
+
+class TestCadRoute(unittest.TestCase):
+    def setUp(self):
+        CadPool._instance = CadPool(max_workers=1, queue_limit=0)
+        self.release = threading.Event()
+        app = Flask(__name__)
+
+        @app.route('/rebuild/<name>')
+        @cad_route
+        def rebuild(name):
+            self.release.wait(5)
+            return jsonify({"name": name, "thread": threading.current_thread().name})
+
+        @app.route('/status')
+        def status():
+            return jsonify({"thread": threading.current_thread().name})
+
+        self.app = app
+
+    def tearDown(self):
+        self.release.set()
+        CadPool._instance.executor.shutdown(wait=True)
+        CadPool._instance = None
+
+    def test_io_requests_are_served_while_cad_is_busy(self):
+        responses = []
+        busy = threading.Thread(target=lambda: responses.append(self.app.test_client().get('/rebuild/a')))
+        busy.start()
+        while CadPool._instance.pending < 1:
+            pass
+
+        client = self.app.test_client()
+        self.assertEqual(client.get('/status').status_code, 200)
+        refused = client.get('/rebuild/b')
+        self.assertEqual(refused.status_code, 503)
+        self.assertEqual(refused.headers['Retry-After'], '1')
+
+        self.release.set()
+        busy.join()
+        self.assertEqual(responses[0].get_json()['name'], 'a')
+        self.assertTrue(responses[0].get_json()['thread'].startswith('cad'))
+
+class TestModelRoutes(unittest.TestCase):
+    def test_model_data_is_built_on_cad_threads(self):
+        client = create_app('testing').test_client()
+        manager = ModelManager.get_instance()
+        model_id = manager.create_new_model()
+        manager.add_feature(model_id, create_cylinder, 10, 5)
+        manager.rebuild_model(model_id)
+
+        threads = []
+        get_model_data = manager.get_model_data
+        def recording(model_id):
+            threads.append(threading.current_thread().name)
+            return get_model_data(model_id)
+        with mock.patch.object(manager, 'get_model_data', side_effect=recording):
+            response = client.get(f'/api/models/{model_id}')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(client.get(f'/api/models/{model_id}',
+                                        headers={'If-None-Match': response.headers['ETag']}).status_code, 304)
+            client.post('/api/set_feature_color', json={"modelId": model_id, "featureId": 0, "color": [1, 0, 0]})
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith('cad') for name in threads))
+
+if __name__ == '__main__':
+    unittest.main()
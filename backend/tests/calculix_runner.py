@@ -0,0 +1,178 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from app.services.calculix_runner import CalculixRunner, SolverError
+from app.services.solver_progress import SolverLogTail
+
+# Stand-in for ccx: copies the input deck into the .frd file and records the
+# thread count and working directory it was started with.
+FAKE_CCX = '''#!{python}
+import os, sys, time
+job = sys.argv[sys.argv.index('-i') + 1]
+time.sleep(float(os.environ.get('FAKE_CCX_SLEEP', '0')))
+print('STEP 1')
+print('iteration 1')
+for i in range(int(os.environ.get('FAKE_CCX_ITERATIONS', '0'))):
+    print(' increment 1 attempt 1' if i == 0 else ' iteration %d' % (i + 1))
+    print(' largest residual force= %.3e in node 7 and dof 2' % (10.0 ** -i), flush=True)
+    time.sleep(0.1)
+print(' Job finished')
+if os.environ.get('FAKE_CCX_FAIL'):
+    sys.exit(201)
+with open(job + '.inp') as f:
+    deck = f.read()
+with open(job + '.frd', 'w') as f:
+    f.write(deck)
+    f.write('threads=' + os.environ['OMP_NUM_THREADS'] + '\\n')
+    f.write('cwd=' + os.getcwd() + '\\n')
+'''
+
+def write_fake_ccx(directory):
+    path = os.path.join(directory, 'ccx')
+    with open(path, 'w') as f:
+        f.write(FAKE_CCX.format(python=sys.executable))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+class TestCalculixRunner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.ccx_path = write_fake_ccx(self.temp_dir)
+        self.work_dir = os.path.join(self.temp_dir, 'runs')
+
+    def tearDown(self):
+        os.environ.pop('FAKE_CCX_SLEEP', None)
+        os.environ.pop('FAKE_CCX_FAIL', None)
+        os.environ.pop('FAKE_CCX_ITERATIONS', None)
+        shutil.rmtree(self.temp_dir)
+
+    def make_runner(self, **kwargs):
+        return CalculixRunner(ccx_path=self.ccx_path, work_dir=self.work_dir, **kwargs)
+
+    def write_deck(self, text):
+        def write(path):
+            with open(path, 'w') as f:
+                f.write(text)
+        return write
+
+    def read_frd(self, run):
+        with open(run.frd_path) as f:
+            return f.read()
+
+    def test_concurrent_runs_are_isolated(self):
+        runner = self.make_runner(core_budget=4, threads_per_job=2)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            runs = list(executor.map(lambda i: runner.run(self.write_deck(f'deck {i}\n')), range(4)))
+        try:
+            self.assertEqual(len({run.run_dir for run in runs}), 4)
+            for i, run in enumerate(runs):
+                frd = self.read_frd(run)
+                self.assertIn(f'deck {i}', frd)
+                self.assertIn('threads=2', frd)
+                self.assertIn(f'cwd={run.run_dir}', frd)
+                self.assertIn('iteration 1', run.read_log())
+        finally:
+            for run in runs:
+                run.cleanup()
+        self.assertEqual(os.listdir(self.work_dir), [])
+
+    def test_core_budget_limits_concurrency(self):
+        os.environ['FAKE_CCX_SLEEP'] = '0.5'
+        runner = self.make_runner(core_budget=2, threads_per_job=2)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            runs = list(executor.map(lambda i: runner.run(self.write_deck('')), range(2)))
+        self.assertGreaterEqual(time.perf_counter() - start, 1.0)
+        for run in runs:
+            run.cleanup()
+
+    def test_timeout(self):
+        os.environ['FAKE_CCX_SLEEP'] = '10'
+        runner = self.make_runner(timeout=0.5)
+        with self.assertRaisesRegex(SolverError, 'timed out'):
+            runner.run(self.write_deck(''))
+        self.assertEqual(os.listdir(self.work_dir), [])
+
+    def test_solver_failure(self):
+        os.environ['FAKE_CCX_FAIL'] = '1'
+        with self.assertRaisesRegex(SolverError, 'exited with code 201'):
+            self.make_runner().run(self.write_deck(''))
+
+    def test_missing_executable(self):
+        runner = CalculixRunner(ccx_path=os.path.join(self.temp_dir, 'missing'), work_dir=self.work_dir)
+        with self.assertRaisesRegex(SolverError, 'not found'):
+            runner.run(self.write_deck(''))
+
+    def test_background_job(self):
+        runner = self.make_runner()
+        job = runner.submit(lambda: 42)
+        for _ in range(100):
+            if job['status'] == 'done':
+                break
+            time.sleep(0.01)
+        self.assertEqual(runner.get_job(job['id'])['result'], 42)
+
+    def test_finished_jobs_expire(self):
+        runner = self.make_runner(job_ttl=60)
+        job = runner.submit(lambda: 42)
+        for _ in range(100):
+            if job['finishedAt'] is not None:
+                break
+            time.sleep(0.01)
+        self.assertIs(runner.get_job(job['id']), job)
+
+        job['finishedAt'] -= 120
+        self.assertIsNone(runner.get_job(job['id']))
+        self.assertNotIn(job['id'], runner.jobs)
+
+    def test_background_job_reports_solver_progress(self):
+        os.environ['FAKE_CCX_ITERATIONS'] = '6'
+        runner = self.make_runner(poll_interval=0.02)
+
+        def analysis():
+            runner.run(self.write_deck('')).cleanup()
+            return 'ok'
+
+        job = runner.submit(analysis)
+        seen_while_running = None
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if job['status'] == 'running' and job['progress'] and job['progress'][0]['iteration']:
+                seen_while_running = dict(job['progress'][0])
+            if job['status'] == 'done':
+                break
+            time.sleep(0.01)
+
+        self.assertEqual(job['result'], 'ok')
+        self.assertIsNotNone(seen_while_running)
+        self.assertFalse(seen_while_running['finished'])
+        progress = job['progress'][0]
+        self.assertEqual((progress['step'], progress['increment'], progress['iteration']), (1, 1, 6))
+        self.assertAlmostEqual(progress['residualForce'], 1e-5)
+        self.assertTrue(progress['finished'])
+        self.assertIn(' Job finished', progress['log'])
+
+class TestSolverLogTail(unittest.TestCase):
+    def test_partial_lines_wait_for_newline(self):
+        fd, path = tempfile.mkstemp()
+        try:
+            tail = SolverLogTail(path)
+            os.write(fd, b' STEP 2\n iterat')
+            self.assertEqual(tail.poll(), 1)
+            self.assertEqual(tail.state['step'], 2)
+            self.assertIsNone(tail.state['iteration'])
+            os.write(fd, b'ion 3\n')
+            self.assertEqual(tail.poll(), 1)
+            self.assertEqual(tail.state['iteration'], 3)
+            self.assertEqual(tail.poll(), 0)
+        finally:
+            os.close(fd)
+            os.unlink(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from app import create_app
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import circular_cut, create_cylinder
+from app.services.export_service import ExportService
+
+class TestExportService(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.export_service = ExportService(cache_dir=self.cache_dir)
+        self.model_manager = ModelManager.get_instance()
+        self.model_id = self.model_manager.create_new_model()
+        self.model_manager.add_feature(self.model_id, create_cylinder, 10, 5)
+        self.model = self.model_manager.get_model(self.model_id)
+        self.model.rebuild()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_export_is_cached_per_revision_and_options(self):
+        step_path = self.export_service.export(self.model_id, self.model, 'step')
+        self.assertTrue(os.path.getsize(step_path) > 0)
+        self.assertEqual(self.export_service.export(self.model_id, self.model, 'step'), step_path)
+
+        coarse = self.export_service.export(self.model_id, self.model, 'stl', {'tolerance': '0.1'})
+        fine = self.export_service.export(self.model_id, self.model, 'stl', {'tolerance': '0.001'})
+        self.assertNotEqual(coarse, fine)
+
+        # Display changes keep the exports, geometry changes do not
+        self.model.set_feature_color(0, (1, 0, 0))
+        self.model.rebuild()
+        self.assertEqual(self.export_service.cached_path(self.model_id, self.model, 'step'), step_path)
+        self.model.add_feature(circular_cut, 2, 1)
+        self.model.rebuild()
+        self.assertIsNone(self.export_service.cached_path(self.model_id, self.model, 'step'))
+
+    def test_rejects_unknown_format_and_options(self):
+        with self.assertRaises(ValueError):
+            self.export_service.export(self.model_id, self.model, 'obj')
+        with self.assertRaises(ValueError):
+            self.export_service.export(self.model_id, self.model, 'step', {'tolerance': 1})
+
+    def test_async_export(self):
+        job = self.export_service.submit(self.model_id, self.model, 'brep')
+        for _ in range(100):
+            if job['status'] in ('done', 'failed'):
+                break
+            time.sleep(0.05)
+        self.assertEqual(job['status'], 'done')
+        self.assertIsNotNone(self.export_service.cached_path(self.model_id, self.model, 'brep'))
+        self.assertEqual(self.export_service._locks, {})
+
+        # Finished jobs expire after the TTL
+        self.assertIs(self.export_service.get_job(job['id']), job)
+        job['finishedAt'] -= self.export_service.job_ttl + 1
+        self.assertIsNone(self.export_service.get_job(job['id']))
+
+    def test_recently_used_files_are_not_evicted(self):
+        path = self.export_service.export(self.model_id, self.model, 'step')
+        self.export_service.max_cache_bytes = 0
+        self.export_service._prune()
+        self.assertTrue(os.path.exists(path))
+
+        stale = time.time() - 3600
+        os.utime(path, (stale, stale))
+        self.export_service._prune()
+        self.assertFalse(os.path.exists(path))
+
+    def test_range_request(self):
+        ExportService._instance = self.export_service
+        try:
+            client = create_app('testing').test_client()
+            full = client.get(f'/api/export/{self.model_id}/step')
+            self.assertEqual(full.status_code, 200)
+
+            partial = client.get(f'/api/export/{self.model_id}/step', headers={'Range': 'bytes=0-99'})
+            self.assertEqual(partial.status_code, 206)
+            self.assertEqual(partial.data, full.data[:100])
+        finally:
+            ExportService._instance = None
+
+if __name__ == '__main__':
+    unittest.main()
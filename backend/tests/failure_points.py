@@ -0,0 +1,66 @@
+import time
+import unittest
+import numpy as np
+from app.routes.structural_analysis import StructuralAnalysis
+
+MATERIAL = {'yield_strength': 250.0}
+
+def hot_spot_field(centres, peaks, nodes_per_spot=200, background=20000, seed=0):
+    # Low background stress plus a cloud of highly stressed nodes around each centre
+    rng = np.random.default_rng(seed)
+    positions = [rng.uniform(0, 100, (background, 3))]
+    stress = [rng.uniform(0, 50, background)]
+    for centre, peak in zip(centres, peaks):
+        offsets = rng.normal(0, 0.5, (nodes_per_spot, 3))
+        offsets[0] = 0  # the peak itself
+        positions.append(np.asarray(centre) + offsets)
+        stress.append(peak * np.exp(-np.linalg.norm(offsets, axis=1)))
+    positions = np.concatenate(positions)
+    return {
+        'node_ids': np.arange(1, len(positions) + 1),
+        'positions': positions,
+        'von_mises': np.concatenate(stress)
+    }
+
+class TestFailurePoints(unittest.TestCase):
+    def setUp(self):
+        # Skips the model lookup in __init__, which these tests do not need
+        self.analysis = StructuralAnalysis.__new__(StructuralAnalysis)
+
+    def test_hot_spots_are_spatially_distinct(self):
+        centres = [(10, 10, 10), (90, 10, 10), (10, 90, 10), (10, 10, 90), (50, 50, 50), (90, 90, 90)]
+        peaks = [900, 800, 700, 600, 500, 400]
+        results = hot_spot_field(centres, peaks)
+        points = self.analysis.identify_failure_points(results, MATERIAL)
+
+        self.assertEqual(len(points), 5)
+        nearest_centres = [int(np.argmin(np.linalg.norm(np.array(centres) - p['position'], axis=1))) for p in points]
+        self.assertEqual(nearest_centres, [0, 1, 2, 3, 4])
+        severities = [p['severity'] for p in points]
+        self.assertEqual(severities, sorted(severities, reverse=True))
+        for point in points:
+            self.assertGreater(point['affected_nodes'], 1)
+            self.assertTrue(point['recommendations'])
+            index = point['node'] - 1
+            self.assertAlmostEqual(point['stress'], results['von_mises'][index])
+            self.assertAlmostEqual(point['safety_factor'], MATERIAL['yield_strength'] / point['stress'])
+
+    def test_single_hot_spot_yields_one_point(self):
+        points = self.analysis.identify_failure_points(hot_spot_field([(50, 50, 50)], [1000]), MATERIAL)
+        self.assertEqual(len(points), 1)
+
+    def test_no_failure_points(self):
+        results = hot_spot_field([], [])
+        results['von_mises'][0] = 0.0
+        self.assertEqual(self.analysis.identify_failure_points(results, MATERIAL), [])
+
+    def test_scales_to_large_fields(self):
+        results = hot_spot_field([(10, 10, 10), (90, 90, 90)], [1000, 900], nodes_per_spot=200000,
+                                 background=1000000)
+        start = time.perf_counter()
+        points = self.analysis.identify_failure_points(results, MATERIAL)
+        self.assertEqual(len(points), 2)
+        self.assertLess(time.perf_counter() - start, 5.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import cadquery as cq
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import create_cylinder
+from app.routes.structural_analysis import StructuralAnalysis
+from app.services import fe_mesh
+
+class TestTetMeshing(unittest.TestCase):
+    def setUp(self):
+        self.shape = cq.Workplane('XY').box(10, 10, 4).faces('>Z').circle(2).cutBlind(-4).findSolid()
+
+    def test_linear_mesh_fills_solid(self):
+        mesh = fe_mesh.generate_tet_mesh(self.shape, 1.0, backend='delaunay')
+        volumes = fe_mesh._signed_volumes(mesh.nodes, mesh.elements)
+
+        self.assertEqual(mesh.element_type, 'C3D4')
+        self.assertTrue((volumes > 0).all())
+        self.assertAlmostEqual(volumes.sum() / self.shape.Volume(), 1.0, delta=0.02)
+
+    def test_quadratic_mesh_shares_midside_nodes(self):
+        linear = fe_mesh.generate_tet_mesh(self.shape, 2.0, backend='delaunay')
+        quadratic = fe_mesh.to_quadratic(linear)
+
+        self.assertEqual(quadratic.element_type, 'C3D10')
+        np.testing.assert_array_equal(quadratic.elements[:, :4], linear.elements)
+        edges = np.unique(np.sort(linear.elements[:, fe_mesh._TET10_EDGES], axis=2).reshape(-1, 2), axis=0)
+        self.assertEqual(len(quadratic.nodes), len(linear.nodes) + len(edges))
+
+        a, b = quadratic.elements[:, 0], quadratic.elements[:, 1]
+        midpoints = (quadratic.nodes[a] + quadratic.nodes[b]) / 2
+        np.testing.assert_allclose(quadratic.nodes[quadratic.elements[:, 4]], midpoints)
+
+    def test_mesh_cache_reuses_mesh_per_revision(self):
+        cache = fe_mesh.MeshCache(max_entries=2)
+        first = cache.get_or_create('model', 1, self.shape, 2.0)
+        self.assertIs(cache.get_or_create('model', 1, self.shape, 2.0), first)
+        self.assertIsNot(cache.get_or_create('model', 2, self.shape, 2.0), first)
+
+    def test_inp_file_contains_elements(self):
+        model_manager = ModelManager.get_instance()
+        model_id = model_manager.create_new_model()
+        model_manager.add_feature(model_id, create_cylinder, 5, 10)
+        model_manager.get_model(model_id).rebuild()
+
+        analysis = StructuralAnalysis(model_id, mesh_size=2.0)
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.chdir(temp_dir)
+            try:
+                analysis.prepare_inp_file(
+                    {'young_modulus': 210000, 'poisson_ratio': 0.3},
+                    [{'point': [0, 0, 5], 'direction': 3, 'magnitude': -100}],
+                    [{'point': [0, 0, -5], 'dof': 1, 'value': 0}]
+                )
+                with open('model.inp') as f:
+                    lines = f.read().splitlines()
+            finally:
+                os.chdir(cwd)
+
+        element_header = lines.index('*ELEMENT, TYPE=C3D4, ELSET=EALL')
+        self.assertEqual(element_header, len(analysis.mesh.nodes) + 1)
+        first_element = [int(v) for v in lines[element_header + 1].split(',')]
+        self.assertEqual(first_element[1:], list(analysis.mesh.elements[0] + 1))
+        self.assertIn('*SOLID SECTION, ELSET=EALL, MATERIAL=MATERIAL1', lines)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from unittest import mock
+from app import create_app
+from app.cad.feature_registry import FeatureParam, FeatureRegistry, FeatureSpec, register_builtin_features
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import circular_cut, create_cylinder
+
+class TestFeatureRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = FeatureRegistry.get_instance()
+
+    def test_functions_load_on_first_use(self):
+        registry = FeatureRegistry()
+        spec = registry.register(FeatureSpec('cut', 'app.cad.parametric_feature_functions:circular_cut',
+                                             [FeatureParam('radius'), FeatureParam('depth')]))
+        self.assertIsNone(spec._func)
+        self.assertIs(registry.resolve('cut'), circular_cut)
+        with self.assertRaises(ValueError):
+            registry.register(spec)
+
+    def test_stored_feature_types_resolve(self):
+        for name in ('create_cylinder', 'circular_cut', 'concentric_extrude', 'mirror_feature',
+                     'linear_pattern', 'circular_pattern'):
+            self.assertEqual(self.registry.resolve(name).__name__, name)
+        self.assertIs(self.registry.get('mirror'), self.registry.get('mirror_feature'))
+        with self.assertRaises(ValueError):
+            self.registry.resolve('fillet_everything')
+
+    def test_bind_applies_schema(self):
+        spec = self.registry.get('linear_pattern')
+        args = spec.bind({'radius': 2, 'depth': '5', 'count': 4.0, 'spacing': 'pitch', 'directionY': 1}, {'pitch': 8})
+        # Names of model parameters are kept, other strings are converted
+        self.assertEqual(args, [2.0, 5.0, 4, 'pitch', 1.0, 1.0, 'cut'])
+        with self.assertRaises(ValueError):
+            spec.bind({'radius': 2, 'depth': 5, 'count': 4})
+        with self.assertRaises(ValueError):
+            spec.bind({'radius': [2], 'depth': 5, 'count': 4, 'spacing': 1})
+        with self.assertRaises(ValueError):
+            spec.bind({'radius': 2, 'depth': 'abc', 'count': 4, 'spacing': 1}, {'pitch': 8})
+
+    def test_only_geometry_arguments_key_cached_rebuilds(self):
+        registry = FeatureRegistry()
+        register_builtin_features(registry)
+        spec = registry.register(FeatureSpec('labelled_cylinder', 'app.cad.parametric_feature_functions:create_cylinder',
+                                             [FeatureParam('radius'), FeatureParam('height', geometry=False)]))
+        self.assertEqual(spec.geometry_args([1.0, 2.0]), {'radius': 1.0})
+        self.assertFalse(spec.to_dict()['parameters'][1]['affectsGeometry'])
+
+        with mock.patch.object(FeatureRegistry, '_instance', registry):
+            self.check_variant_keys()
+
+    def check_variant_keys(self):
+        model_manager = ModelManager.get_instance()
+        model = model_manager.get_model(model_manager.create_new_model())
+        model.add_parameter('radius', 10.0)
+        model.add_parameter('unused', 1.0)
+        model.add_feature(create_cylinder, 'radius', 5.0)
+        key = model._variant_key()
+        model.add_parameter('unused', 2.0)
+        self.assertEqual(model._variant_key(), key)
+        model.update_parameter('radius', 12.0)
+        self.assertNotEqual(model._variant_key(), key)
+
+        model.features[0]['type'] = 'labelled_cylinder'
+        key = model._variant_key()
+        model.features[0]['args'] = ('radius', 7.0)
+        self.assertEqual(model._variant_key(), key)
+
+    def test_add_feature_route(self):
+        client = create_app('testing').test_client()
+        response = client.get('/api/feature_types')
+        names = [feature['name'] for feature in response.get_json()['featureTypes']]
+        self.assertIn('circular_pattern', names)
+
+        model_manager = ModelManager.get_instance()
+        model_id = model_manager.create_new_model()
+        model_manager.add_feature(model_id, create_cylinder, 30, 10)
+        client.post('/api/add_feature', json={
+            'modelId': model_id, 'featureType': 'circular_pattern',
+            'parameters': {'radius': 1, 'depth': 2, 'count': 6, 'patternRadius': 20}})
+        model = model_manager.get_model(model_id)
+        self.assertEqual([f['type'] for f in model.features], ['create_cylinder', 'circular_pattern'])
+        self.assertEqual(model.features[1]['args'], (1.0, 2.0, 6, 20.0, 360.0, 0.0, 'cut'))
+        self.assertEqual(model.revision, 1)
+
+        response = client.post('/api/add_feature', json={
+            'modelId': model_id, 'featureType': 'circular_pattern', 'parameters': {'radius': 1}})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('depth', response.get_json()['error'])
+
+        response = client.post('/api/add_feature', json={
+            'modelId': model_id, 'featureType': 'circular_cut', 'parameters': {'radius': 'abc', 'depth': 2}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(model.features), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+from unittest import mock
+import numpy as np
+from app import create_app
+from app.cad.feature_registry import FeatureRegistry
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import circular_cut, circular_pattern, concentric_extrude, create_cylinder
+from app.models.parametric_model import ParametricModel
+
+def stepped_model():
+    # Disc (feature 0), pocket in the middle (feature 1), ring on top (feature 2)
+    model = ParametricModel()
+    model.add_parameter('radius', 40.0)
+    model.add_feature(create_cylinder, 'radius', 10)
+    model.add_feature(circular_cut, 5, 3)
+    model.add_feature(concentric_extrude, 30, 20, 5)
+    model.rebuild()
+    return model
+
+def volume(model):
+    return model.get_model().val().Volume()
+
+class TestFeatureVisibility(unittest.TestCase):
+    def setUp(self):
+        self.model = stepped_model()
+
+    def test_faces_are_attributed_to_features(self):
+        owners = self.model._variant['faceFeatures']
+        self.assertEqual(len(owners), len(self.model.get_model().val().Faces()))
+        self.assertEqual(set(owners.tolist()), {0, 1, 2})
+
+    def test_hiding_an_additive_feature_hides_its_faces_without_rebuild(self):
+        vertices, triangles = self.model.tessellation()
+        revision, before = self.model.revision, volume(self.model)
+        with mock.patch.object(self.model, '_replay', wraps=self.model._replay) as replay:
+            self.model.set_feature_visibility(2, False)
+            replay.assert_not_called()
+        self.assertGreater(self.model.revision, revision)
+        self.assertEqual(self.model.hidden_features(), [2])
+        self.assertAlmostEqual(volume(self.model), before)
+
+        shown_vertices, shown = self.model.tessellation()
+        self.assertIs(shown_vertices, vertices)
+        self.assertLess(len(shown), len(triangles))
+        # No triangle of the ring is left
+        _, _, triangle_faces = self.model._mesh()
+        ring_faces = np.flatnonzero(self.model._variant['faceFeatures'] == 2)
+        ring_triangles = triangles[np.isin(triangle_faces, ring_faces)]
+        self.assertEqual(len(shown) + len(ring_triangles), len(triangles))
+        self.assertLess(len(self.model.edges()), len(self.model.get_model().val().Edges()))
+
+        self.model.set_feature_visibility(2, True)
+        np.testing.assert_array_equal(self.model.tessellation()[1], triangles)
+
+    def test_faces_the_ring_was_fused_onto_stay_with_the_disc(self):
+        # The ring splits the disc's top face; both pieces still belong to the disc
+        top = [owner for face, owner in zip(self.model.get_model().val().Faces(), self.model._variant['faceFeatures'])
+               if abs(face.Center().z - 5) < 1e-6]
+        self.assertEqual(top, [0, 0])
+
+        self.model.set_feature_visibility(2, False)
+        vertices, triangles = self.model.tessellation()
+        corners = vertices[triangles]
+        on_top = corners[np.all(np.abs(corners[:, :, 2] - 5) < 1e-6, axis=1)]
+        area = 0.5 * np.linalg.norm(np.cross(on_top[:, 1] - on_top[:, 0], on_top[:, 2] - on_top[:, 0]), axis=1).sum()
+        # Disc top (radius 40) outside the ring (radius 30) and between the ring
+        # (radius 20) and the pocket (radius 5)
+        self.assertAlmostEqual(area, np.pi * (40 ** 2 - 30 ** 2 + 20 ** 2 - 5 ** 2), delta=0.01 * area)
+
+    def test_hiding_a_cut_suppresses_it_and_toggling_back_is_cached(self):
+        with_cut = volume(self.model)
+        vertices = self.model.vertices()
+        self.model.set_feature_visibility(1, False)
+        self.assertTrue(self.model.get_features()[1]['suppressed'])
+        self.assertAlmostEqual(volume(self.model) - with_cut, np.pi * 5 ** 2 * 3, places=3)
+
+        with mock.patch.object(self.model, '_replay', wraps=self.model._replay) as replay:
+            self.model.set_feature_visibility(1, True)
+            self.model.set_feature_visibility(1, False)
+            self.model.set_feature_visibility(1, True)
+            replay.assert_not_called()
+        self.assertAlmostEqual(volume(self.model), with_cut)
+        # The cached result keeps its tessellation
+        self.assertIs(self.model.vertices(), vertices)
+
+    def test_parameter_drag_back_reuses_result(self):
+        workplane = self.model.get_model()
+        self.model.update_parameter('radius', 45.0)
+        self.assertIsNot(self.model.get_model(), workplane)
+        with mock.patch.object(self.model, '_replay', wraps=self.model._replay) as replay:
+            self.model.update_parameter('radius', 40.0)
+            replay.assert_not_called()
+        self.assertIs(self.model.get_model(), workplane)
+
+    def test_cache_is_bounded_and_can_be_cleared(self):
+        for radius in range(41, 41 + ParametricModel.variant_cache_size + 2):
+            self.model.update_parameter('radius', float(radius))
+        with mock.patch.object(self.model, '_replay', wraps=self.model._replay) as replay:
+            self.model.update_parameter('radius', 40.0)
+            self.assertEqual(replay.call_count, 1)
+            self.model.clear_cache()
+            self.model.rebuild()
+            self.assertEqual(replay.call_count, 2)
+
+    def test_uncacheable_features_are_always_replayed(self):
+        model = ParametricModel()
+        model.add_feature(create_cylinder, 10, 10)
+        self.assertIsNotNone(model._variant_key())
+        model.add_feature(lambda workplane: workplane)
+        self.assertIsNone(model._variant_key())
+
+    def test_additive_depends_on_pattern_operation(self):
+        spec = FeatureRegistry.get_instance().get('circular_pattern')
+        self.assertFalse(spec.is_additive([2, 4, 6, 20]))
+        self.assertTrue(spec.is_additive([2, 4, 6, 20], {'operation': 'extrude'}))
+        model = stepped_model()
+        model.add_feature(circular_pattern, 1, 2, 6, 25, operation='extrude')
+        self.assertTrue(model.is_additive(model.get_feature(3)))
+        self.assertFalse(model.is_additive(model.get_feature(1)))
+
+    def test_color_changes_do_not_rebuild(self):
+        with mock.patch.object(self.model, '_replay', wraps=self.model._replay) as replay:
+            self.model.set_feature_color(0, (1.0, 0.0, 0.0))
+            replay.assert_not_called()
+        self.assertEqual(self.model.get_features()[0]['color'], (1.0, 0.0, 0.0))
+
+class TestFeatureVisibilityRoutes(unittest.TestCase):
+    def test_toggle_and_undo(self):
+        client = create_app('testing').test_client()
+        manager = ModelManager.get_instance()
+        model_id = manager.create_new_model()
+        source = stepped_model()
+        manager.get_model(model_id).parameters = source.parameters
+        manager.get_model(model_id).features = source.features
+        manager.rebuild_model(model_id)
+        triangles = len(manager.get_model(model_id).faces())
+
+        response = client.post('/api/set_feature_visibility', json={"modelId": model_id, "featureId": 2, "visible": False})
+        self.assertTrue(response.get_json()['success'])
+        features = response.get_json()['updatedModel']['features']
+        self.assertEqual((features[2]['visible'], features[2]['suppressed']), (False, False))
+        self.assertLess(len(response.get_json()['updatedModel']['faces']), triangles)
+
+        response = client.post('/api/set_feature_suppressed', json={"modelId": model_id, "featureId": 1, "suppressed": True})
+        features = response.get_json()['updatedModel']['features']
+        self.assertEqual((features[1]['visible'], features[1]['suppressed']), (False, True))
+
+        manager.undo(model_id)
+        manager.undo(model_id)
+        self.assertEqual(manager.get_model(model_id).hidden_features(), [])
+        self.assertEqual(len(manager.get_model(model_id).faces()), triangles)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from app.services.frd_parser import parse_frd, nodal_results, von_mises, principal_stresses
+
+def format_records(node_ids, values):
+    lines = []
+    for node_id, row in zip(node_ids, values):
+        lines.append(' -1' + f'{node_id:10d}' + ''.join(f'{v:12.5E}' for v in row))
+    return lines
+
+def make_frd(node_ids, coordinates, steps):
+    # steps: list of (displacements, stresses) arrays in node order
+    lines = ['    1C', '    1UUSER']
+    lines.append(f'    2C{len(node_ids):30d}{1:37d}')
+    lines += format_records(node_ids, coordinates)
+    lines.append(' -3')
+    lines += ['    3C                          1                                     1',
+              ' -1         1    3    0    1',
+              ' -2         1         2         3         4',
+              ' -3']
+    for step, (displacements, stresses) in enumerate(steps, 1):
+        lines.append(f'    1PSTEP{step:25d}{1:12d}{step:12d}')
+        lines.append(f'  100CL  101 1.000000000{len(node_ids):12d}                     0{step:5d}           1')
+        lines += [' -4  DISP        4    1', ' -5  D1          1    2    1    0',
+                  ' -5  D2          1    2    2    0', ' -5  D3          1    2    3    0',
+                  ' -5  ALL         1    2    0    0    1ALL']
+        lines += format_records(node_ids, displacements)
+        lines.append(' -3')
+        lines.append(f'  100CL  101 1.000000000{len(node_ids):12d}                     0{step:5d}           1')
+        lines.append(' -4  STRESS      6    1')
+        lines += [f' -5  {name:<10s}  1    4    1    1' for name in ('SXX', 'SYY', 'SZZ', 'SXY', 'SYZ', 'SZX')]
+        lines += format_records(node_ids, stresses)
+        lines.append(' -3')
+    lines.append(' 9999')
+    return '\n'.join(lines) + '\n'
+
+class TestFrdParser(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.node_ids = np.array([3, 1, 2, 10, 7])
+        self.coordinates = rng.uniform(-10, 10, (5, 3))
+        self.steps = [
+            (rng.uniform(-1, 1, (5, 3)), rng.uniform(-500, 500, (5, 6))),
+            (rng.uniform(-1, 1, (5, 3)), rng.uniform(-500, 500, (5, 6)))
+        ]
+        fd, self.path = tempfile.mkstemp(suffix='.frd')
+        with os.fdopen(fd, 'w') as f:
+            f.write(make_frd(self.node_ids, self.coordinates, self.steps))
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def assert_parsed(self, frd):
+        np.testing.assert_array_equal(frd.node_ids, self.node_ids)
+        np.testing.assert_allclose(frd.coordinates, self.coordinates, rtol=1e-5)
+        self.assertEqual(frd.steps, [1, 2])
+        for step, (displacements, stresses) in enumerate(self.steps, 1):
+            self.assertEqual(frd.field('DISP', step).components, ['D1', 'D2', 'D3'])
+            np.testing.assert_allclose(frd.field('DISP', step).values, displacements, rtol=1e-5)
+            np.testing.assert_allclose(frd.field('STRESS', step).values, stresses, rtol=1e-5)
+
+    def test_parse(self):
+        self.assert_parsed(parse_frd(self.path))
+
+    def test_parse_memory_mapped_in_chunks(self):
+        self.assert_parsed(parse_frd(self.path, chunk_rows=2, mmap_threshold=0))
+
+    def test_irregular_lines_fall_back_to_line_parsing(self):
+        with open(self.path) as f:
+            lines = f.read().split('\n')
+        index = next(i for i, line in enumerate(lines) if line.startswith(' -1') and len(line) > 60)
+        lines[index] += '   '
+        with open(self.path, 'w') as f:
+            f.write('\n'.join(lines))
+        self.assert_parsed(parse_frd(self.path))
+
+    def test_nodal_results_are_keyed_by_node_id(self):
+        results = nodal_results(parse_frd(self.path), step=1)
+        np.testing.assert_array_equal(results['node_ids'], self.node_ids)
+        np.testing.assert_allclose(results['positions'], self.coordinates, rtol=1e-5)
+        np.testing.assert_allclose(results['displacements'], self.steps[0][0], rtol=1e-5)
+        self.assertEqual(results['principal_stresses'].shape, (5, 3))
+
+    def test_stress_invariants(self):
+        stress = np.array([
+            [100.0, 0, 0, 0, 0, 0],    # uniaxial
+            [0, 0, 0, 50.0, 0, 0],     # pure shear
+            [10.0, 20.0, 30.0, 0, 0, 0]
+        ])
+        np.testing.assert_allclose(von_mises(stress), [100.0, np.sqrt(3) * 50.0, np.sqrt(300.0)])
+        np.testing.assert_allclose(principal_stresses(stress)[1], [50.0, 0.0, -50.0], atol=1e-9)
+        np.testing.assert_allclose(principal_stresses(stress)[2], [30.0, 20.0, 10.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import io
+import os
+import tempfile
+import unittest
+import ezdxf
+import numpy as np
+from app import create_app
+from app.services.import_dxf import read_dxf, to_workplane
+
+def save(document):
+    fd, path = tempfile.mkstemp(suffix='.dxf')
+    os.close(fd)
+    document.saveas(path)
+    return path
+
+def arc_end_points(centers, radii, start_angles, end_angles):
+    points = []
+    for angles in (start_angles, end_angles):
+        radians = np.radians(angles)
+        points.append(centers[:, :2] + radii[:, None] * np.column_stack([np.cos(radians), np.sin(radians)]))
+    return points
+
+class TestImportDxf(unittest.TestCase):
+    def setUp(self):
+        self.document = ezdxf.new()
+        self.modelspace = self.document.modelspace()
+        self.paths = []
+
+    def tearDown(self):
+        for path in self.paths:
+            os.unlink(path)
+
+    def read(self):
+        self.paths.append(save(self.document))
+        return read_dxf(self.paths[-1])
+
+    def test_entity_types(self):
+        msp = self.modelspace
+        msp.add_line((0, 0, 1), (10, 0, 2))
+        msp.add_circle((5, 5), 2)
+        msp.add_arc((0, 0), 3, 10, 80)
+        msp.add_lwpolyline([(0, 0, 0), (10, 0, 0.5), (10, 10, 0)], format='xyb', close=True)
+        msp.add_spline([(0, 0), (1, 2), (3, 1), (5, 4)])
+        msp.add_ellipse((0, 0), major_axis=(4, 0), ratio=0.5)
+        self.document.paperspace().add_line((0, 0), (1, 1))
+
+        geometry = self.read()
+        self.assertEqual(geometry.counts, {'LINE': 1, 'CIRCLE': 1, 'ARC': 1, 'LWPOLYLINE': 2, 'SPLINE': 1})
+        np.testing.assert_array_equal(geometry.lines, [[[0, 0, 1], [10, 0, 2]]])
+        np.testing.assert_array_equal(geometry.circle_centers, [[5, 5, 0]])
+        np.testing.assert_array_equal(geometry.arc_start_angles, [10])
+        np.testing.assert_array_equal(geometry.polyline_sizes[0], 3)
+        np.testing.assert_array_equal(geometry.polyline_bulges[:3], [0, 0.5, 0])
+        self.assertTrue(geometry.polyline_closed[0])
+        self.assertEqual(geometry.spline_sizes[0], len(geometry.spline_weights))
+        self.assertEqual(geometry.spline_knot_sizes[0], geometry.spline_sizes[0] + geometry.spline_degrees[0] + 1)
+
+        # The ellipse is flattened into a closed polyline (via a Bezier approximation)
+        ellipse = geometry.polyline_points[geometry.polyline_offsets[1]:geometry.polyline_offsets[2]]
+        np.testing.assert_allclose((ellipse[:, 0] / 4) ** 2 + (ellipse[:, 1] / 2) ** 2, 1, atol=1e-3)
+
+    def test_negative_extrusion_matches_ezdxf(self):
+        arc = self.modelspace.add_arc((1, 2, 3), 3, 20, 70, dxfattribs={'extrusion': (0, 0, -1)})
+        geometry = self.read()
+        start, end = arc_end_points(geometry.arc_centers, geometry.arc_radii,
+                                    geometry.arc_start_angles, geometry.arc_end_angles)
+        # Counter-clockwise about +Z, so the WCS start is the OCS end
+        np.testing.assert_allclose(start[0], np.array(arc.end_point)[:2], atol=1e-9)
+        np.testing.assert_allclose(end[0], np.array(arc.start_point)[:2], atol=1e-9)
+        np.testing.assert_allclose(geometry.arc_centers[0], [-1, 2, -3])
+
+    def test_block_references_match_ezdxf(self):
+        block = self.document.blocks.new('PART', base_point=(1, 1))
+        block.add_line((1, 1), (2, 1))
+        block.add_arc((1, 1), 1, 0, 90)
+        nested = self.document.blocks.new('OUTER')
+        nested.add_blockref('PART', (0, 0), dxfattribs={'rotation': 45})
+
+        self.modelspace.add_blockref('PART', (20, 0), dxfattribs={'rotation': 30, 'xscale': 2, 'yscale': 2})
+        self.modelspace.add_blockref('PART', (30, 0), dxfattribs={'xscale': -1})
+        self.modelspace.add_blockref('OUTER', (40, 5), dxfattribs={'rotation': 90})
+        grid = self.modelspace.add_blockref('PART', (0, 50))
+        grid.dxf.row_count, grid.dxf.column_count = 2, 3
+        grid.dxf.row_spacing, grid.dxf.column_spacing = 10, 10
+
+        expected_lines, expected_arcs = [], []
+        def explode(entities):
+            for entity in entities:
+                if entity.dxftype() == 'INSERT':
+                    for insert in entity.multi_insert():
+                        explode(insert.virtual_entities())
+                elif entity.dxftype() == 'LINE':
+                    expected_lines.append([entity.dxf.start, entity.dxf.end])
+                else:
+                    expected_arcs.append([entity.start_point, entity.end_point])
+        explode(self.modelspace)
+
+        geometry = self.read()
+        self.assertEqual(geometry.counts['LINE'], 9)
+        self.assertEqual(geometry.counts['ARC'], 9)
+        line_key = lambda line: tuple(np.round(np.ravel(line), 6))
+        self.assertEqual(sorted(map(line_key, geometry.lines)), sorted(map(line_key, np.array(expected_lines))))
+
+        start, end = arc_end_points(geometry.arc_centers, geometry.arc_radii,
+                                    geometry.arc_start_angles, geometry.arc_end_angles)
+        # Mirrored arcs swap their end points, so compare them unordered
+        arc_key = lambda pair: sorted(tuple(np.round(point, 6)) for point in pair)
+        actual = sorted(arc_key(pair) for pair in zip(start, end))
+        expected = sorted(arc_key(np.array(pair)[:, :2]) for pair in expected_arcs)
+        np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+    def test_unsupported_entities_are_counted(self):
+        block = self.document.blocks.new('LABEL')
+        block.add_line((0, 0), (1, 0))
+        block.add_text('A')
+        self.modelspace.add_text('Title')
+        self.modelspace.add_line((0, 0), (1, 1))
+        self.modelspace.add_blockref('LABEL', (0, 0))
+        self.modelspace.add_blockref('LABEL', (5, 0), dxfattribs={'xscale': 2})
+        self.document.paperspace().add_text('Sheet')
+
+        self.assertEqual(self.read().skipped, {'TEXT': 3})
+        fd, path = tempfile.mkstemp(suffix='.dxf')
+        os.close(fd)
+        self.paths.append(path)
+        self.document.saveas(path, fmt='bin')
+        geometry = read_dxf(path)
+        self.assertEqual(geometry.skipped, {'TEXT': 3})
+        self.assertEqual(geometry.counts['LINE'], 3)
+
+    def test_non_uniform_scale_flattens_curves(self):
+        block = self.document.blocks.new('PART')
+        block.add_circle((0, 0), 1)
+        self.modelspace.add_blockref('PART', (0, 0), dxfattribs={'xscale': 2, 'yscale': 1})
+        geometry = self.read()
+        self.assertEqual(geometry.counts['CIRCLE'], 0)
+        points = geometry.polyline_points
+        np.testing.assert_allclose((points[:, 0] / 2) ** 2 + points[:, 1] ** 2, 1, atol=1e-3)
+
+    def test_to_workplane_extrudes_closed_profiles(self):
+        self.modelspace.add_lwpolyline([(0, 0), (10, 0), (10, 10), (0, 10)], close=True)
+        self.modelspace.add_circle((20, 5), 2)
+        self.modelspace.add_line((0, 20), (5, 20))
+        solid = to_workplane(self.read()).extrude(1)
+        self.assertAlmostEqual(solid.val().Volume(), 100 + np.pi * 4, places=3)
+
+    def test_import_route(self):
+        self.modelspace.add_line((0, 0), (1, 0))
+        self.paths.append(save(self.document))
+        with open(self.paths[-1], 'rb') as f:
+            data = f.read()
+        client = create_app().test_client()
+        response = client.post('/api/import_dxf', data={'file': (io.BytesIO(data), 'part.dxf')},
+                               content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['geometry']['lines'], [0, 0, 0, 1, 0, 0])
+
+        response = client.post('/api/import_dxf', data={'file': (io.BytesIO(b'0\nSECTION\n'), 'part.txt')},
+                               content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
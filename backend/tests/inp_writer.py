@@ -0,0 +1,49 @@
+import io
+import unittest
+import numpy as np
+from app.services import inp_writer
+
+class TestInpWriter(unittest.TestCase):
+    def test_nodes_round_trip(self):
+        coordinates = np.random.default_rng(0).uniform(-1e3, 1e3, (1000, 3))
+        f = io.StringIO()
+        inp_writer.write_nodes(f, np.arange(1, 1001), coordinates)
+        lines = f.getvalue().splitlines()
+        self.assertEqual(lines[0], '*NODE, NSET=NALL')
+        rows = np.array([[float(v) for v in line.split(',')] for line in lines[1:]])
+        np.testing.assert_array_equal(rows[:, 0], np.arange(1, 1001))
+        np.testing.assert_allclose(rows[:, 1:], coordinates, rtol=1e-8)
+
+    def test_chunks_match_single_pass(self):
+        columns = [np.arange(10), np.linspace(0, 1, 10)]
+        single, chunked = io.StringIO(), io.StringIO()
+        inp_writer.write_rows(single, '%d, %.9g', columns)
+        inp_writer.write_rows(chunked, '%d, %.9g', columns, chunk_rows=3)
+        self.assertEqual(single.getvalue(), chunked.getvalue())
+        self.assertEqual(single.getvalue().count('\n'), 10)
+
+    def test_elements(self):
+        f = io.StringIO()
+        inp_writer.write_elements(f, 'C3D4', [1, 2], [[1, 2, 3, 4], [2, 3, 4, 5]], elset='SOLID')
+        self.assertEqual(f.getvalue(), '*ELEMENT, TYPE=C3D4, ELSET=SOLID\n1, 1, 2, 3, 4\n2, 2, 3, 4, 5\n')
+
+    def test_sets_wrap_at_sixteen_entries(self):
+        f = io.StringIO()
+        inp_writer.write_node_set(f, 'FIXED', np.arange(40, 0, -1))
+        lines = f.getvalue().splitlines()
+        self.assertEqual(lines[0], '*NSET, NSET=FIXED')
+        self.assertEqual([len(line.split(',')) for line in lines[1:]], [16, 16, 8])
+        self.assertEqual(lines[1].split(', ')[:2], ['1', '2'])
+
+        f = io.StringIO()
+        inp_writer.write_element_set(f, 'TOP', [3, 1])
+        self.assertEqual(f.getvalue(), '*ELSET, ELSET=TOP\n1, 3\n')
+
+    def test_boundary_and_loads_accept_set_names(self):
+        f = io.StringIO()
+        inp_writer.write_boundary(f, ['FIXED', 7], [1, 3], [3, 3], [0, 0.5], op='NEW')
+        inp_writer.write_cloads(f, [4], [2], [-1500.0])
+        self.assertEqual(f.getvalue(), '*BOUNDARY, OP=NEW\nFIXED, 1, 3, 0\n7, 3, 3, 0.5\n*CLOAD\n4, 2, -1500\n')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+import numpy as np
+from app import create_app
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import create_cylinder
+from app.routes.structural_analysis import StructuralAnalysis
+from app.services.cad_pool import CadPool
+from app.services.calculix_runner import CalculixRunner
+from app.services.fe_mesh import TetMesh
+from app.services.result_cache import load_case_cache
+
+# Stand-in for ccx: writes one result step per *STEP of the deck, with
+# SXX = load magnitude * node id and D1 = load magnitude / 1000.
+FAKE_CCX = '''#!{python}
+import os, sys
+job = sys.argv[sys.argv.index('-i') + 1]
+if os.environ.get('FAKE_CCX_FAIL'):
+    sys.exit(1)
+with open(job + '.inp') as f:
+    lines = f.read().splitlines()
+nodes, magnitudes, section = [], [], None
+for line in lines:
+    if line.startswith('*'):
+        section = line.split(',')[0]
+    elif section == '*NODE':
+        nodes.append(int(line.split(',')[0]))
+    elif section == '*CLOAD':
+        magnitudes[-1] = float(line.split(',')[2])
+    if line == '*STEP':
+        magnitudes.append(0.0)
+
+def block(values):
+    return [' -1' + '%10d' % n + ''.join('%12.5E' % v for v in row) for n, row in zip(nodes, values)] + [' -3']
+
+out = ['    2C' + '%30d' % len(nodes)] + block([[0.0, 0.0, float(n)] for n in nodes])
+for step, m in enumerate(magnitudes, 1):
+    header = '  100CL  101 1.000000000' + '%12d' % len(nodes) + '                     0' + '%5d' % step + '           1'
+    out += [header, ' -4  DISP        4    1', ' -5  D1', ' -5  D2', ' -5  D3']
+    out += block([[m / 1000, 0.0, 0.0] for n in nodes])
+    out += [header, ' -4  STRESS      6    1'] + [' -5  ' + c for c in ('SXX', 'SYY', 'SZZ', 'SXY', 'SYZ', 'SZX')]
+    out += block([[m * n, 0.0, 0.0, 0.0, 0.0, 0.0] for n in nodes])
+out.append(' 9999')
+with open(job + '.frd', 'w') as f:
+    f.write('\\n'.join(out) + '\\n')
+'''
+
+MATERIAL = {'young_modulus': 210000, 'poisson_ratio': 0.3, 'yield_strength': 100.0}
+
+def load_case(name, magnitude):
+    return {
+        'name': name,
+        'loads': [{'node': 4, 'direction': 3, 'magnitude': magnitude}],
+        'constraints': [{'node': 1, 'dof': dof, 'value': 0} for dof in (1, 2, 3)]
+    }
+
+class TestLoadCases(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        ccx_path = os.path.join(self.temp_dir, 'ccx')
+        with open(ccx_path, 'w') as f:
+            f.write(FAKE_CCX.format(python=sys.executable))
+        os.chmod(ccx_path, os.stat(ccx_path).st_mode | stat.S_IEXEC)
+        CalculixRunner._instance = CalculixRunner(ccx_path=ccx_path, work_dir=os.path.join(self.temp_dir, 'runs'))
+        load_case_cache.clear()
+
+        mesh = TetMesh([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], [[0, 1, 2, 3]])
+        self.analysis = StructuralAnalysis.__new__(StructuralAnalysis)
+        self.analysis.model_id = 'model'
+        self.analysis.model = SimpleNamespace(revision=1, geometry_revision=1)
+        self.analysis.mesh_size = None
+        self.analysis.element_order = 1
+        self.analysis.mesh = mesh
+        self.analysis.mesh_revision = 1
+
+    def tearDown(self):
+        os.environ.pop('FAKE_CCX_FAIL', None)
+        CalculixRunner._instance = None
+        load_case_cache.clear()
+        shutil.rmtree(self.temp_dir)
+
+    def test_deck_has_one_step_per_case(self):
+        path = os.path.join(self.temp_dir, 'model.inp')
+        cases = [load_case('a', 1.0), load_case('b', 2.0)]
+        self.analysis.prepare_load_cases_inp_file(MATERIAL, cases, path)
+        with open(path) as f:
+            deck = f.read()
+        self.assertEqual(deck.count('*NODE, NSET=NALL'), 1)
+        self.assertEqual(deck.count('*STEP'), 2)
+        self.assertEqual(deck.count('*BOUNDARY, OP=NEW'), 2)
+        self.assertEqual(deck.count('*CLOAD, OP=NEW'), 2)
+        self.assertIn('4, 3, 2\n', deck)
+
+    def test_cases_and_envelope(self):
+        cases = [load_case('light', 1.0), load_case('heavy', 30.0), load_case('medium', 20.0)]
+        for solver_runs in (1, 2):
+            load_case_cache.clear()
+            results, failure_points = self.analysis.perform_load_cases(MATERIAL, cases, solver_runs)
+
+            self.assertEqual([case['name'] for case in results['loadCases']], ['light', 'heavy', 'medium'])
+            self.assertEqual([case['results']['maxVonMises'] for case in results['loadCases']], [4.0, 120.0, 80.0])
+            envelope = results['envelope']
+            self.assertEqual(envelope['vonMises'], [30.0, 60.0, 90.0, 120.0])
+            self.assertEqual(envelope['governingCase'], [1, 1, 1, 1])
+            np.testing.assert_allclose(envelope['maxDisplacement'], 0.03)
+            self.assertEqual(failure_points[0]['node'], 4)
+            self.assertEqual(failure_points[0]['load_case'], 'heavy')
+
+    def test_solved_cases_are_cached(self):
+        cases = [load_case('a', 1.0), load_case('b', 2.0)]
+        first, _ = self.analysis.perform_load_cases(MATERIAL, cases)
+        os.environ['FAKE_CCX_FAIL'] = '1'
+        second, _ = self.analysis.perform_load_cases(MATERIAL, list(reversed(cases)))
+        self.assertEqual(second['loadCases'][0], first['loadCases'][1])
+
+        # A new mesh (of newer geometry) or material invalidates the cached results
+        self.analysis.mesh_revision = 2
+        with self.assertRaises(Exception):
+            self.analysis.perform_load_cases(MATERIAL, cases)
+
+    def test_results_are_keyed_on_the_meshed_geometry(self):
+        # The model is edited after meshing: results of the old mesh must not
+        # be cached under the new geometry
+        case = load_case('a', 5.0)
+        self.analysis.model.revision = self.analysis.model.geometry_revision = 7
+        self.analysis.perform_analysis(MATERIAL, case['loads'], case['constraints'])
+        key = self.analysis.load_case_key(MATERIAL, case)
+        self.assertEqual(key[1], 1)
+        self.assertIsNotNone(load_case_cache.get(key))
+
+    def test_repeated_analysis_is_served_from_cache(self):
+        case = load_case('a', 5.0)
+        first = self.analysis.perform_analysis(MATERIAL, case['loads'], case['constraints'])
+        os.environ['FAKE_CCX_FAIL'] = '1'
+        second = self.analysis.perform_analysis(MATERIAL, case['loads'], case['constraints'])
+        self.assertEqual(first, second)
+        with self.assertRaises(Exception):
+            self.analysis.perform_analysis(dict(MATERIAL, young_modulus=70000), case['loads'], case['constraints'])
+
+    def test_route_solves_outside_the_cad_pool(self):
+        client = create_app('testing').test_client()
+        model_manager = ModelManager.get_instance()
+        model_id = model_manager.create_new_model()
+        model_manager.add_feature(model_id, create_cylinder, 5, 10)
+        model_manager.rebuild_model(model_id)
+
+        runner = CalculixRunner._instance
+        in_pool = []
+        def run(*args, **kwargs):
+            in_pool.append(CadPool.get_instance().in_pool())
+            return CalculixRunner.run(runner, *args, **kwargs)
+        case = load_case('a', 5.0)
+        with mock.patch.object(runner, 'run', side_effect=run):
+            response = client.post('/api/analyze', json={
+                'modelId': model_id, 'materialProperties': MATERIAL, 'meshSize': 2.0,
+                'loads': case['loads'], 'constraints': case['constraints']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(in_pool, [False])
+
+    def test_route_rejects_invalid_mesh_options(self):
+        client = create_app('testing').test_client()
+        case = load_case('a', 5.0)
+        request = {'modelId': 'any', 'materialProperties': MATERIAL,
+                   'loads': case['loads'], 'constraints': case['constraints']}
+        for options in ({'meshSize': 'fine'}, {'meshSize': -1}, {'meshSize': True}, {'elementOrder': 3},
+                        {'elementOrder': '2'}):
+            response = client.post('/api/analyze', json=dict(request, **options))
+            self.assertEqual(response.status_code, 400, options)
+            self.assertFalse(response.json['success'])
+
+if __name__ == '__main__':
+    unittest.main()
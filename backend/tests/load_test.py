@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from werkzeug.serving import make_server
+from app import create_app
+from app.services.export_service import ExportService
+from benchmarks import load_test
+
+class TestLoadTest(unittest.TestCase):
+    def test_summarize_percentiles_per_endpoint(self):
+        records = [('GET /a', 200, i / 100, 10) for i in range(1, 101)] + [('POST /b', 503, 1.0, 0), ('POST /b', 0, 2.0, 0)]
+        summary = load_test.summarize(records, elapsed=2.0, sessions=3)
+        self.assertEqual(summary['requests'], 102)
+        self.assertEqual(summary['throughput'], 51.0)
+        self.assertEqual(summary['errors'], 2)
+        self.assertEqual(summary['busy'], 1)
+        self.assertAlmostEqual(summary['endpoints']['GET /a']['p50'], 0.505)
+        self.assertAlmostEqual(summary['endpoints']['GET /a']['p99'], 0.9901)
+        self.assertEqual(summary['endpoints']['GET /a']['bytes'], 1000)
+        self.assertEqual(summary['endpoints']['POST /b']['errors'], 2)
+        self.assertIn('POST /b', load_test.format_stage(2, summary))
+
+    def test_rss_of_this_process(self):
+        if not os.path.exists('/proc/self/status'):
+            self.skipTest('no /proc')
+        self.assertGreater(load_test.rss_bytes(os.getpid()), 0)
+
+    def test_sessions_against_a_server(self):
+        # The sessions' exports go to a temporary cache instead of the app's
+        cache_dir = tempfile.mkdtemp()
+        ExportService._instance = ExportService(cache_dir=cache_dir)
+        server = make_server('127.0.0.1', 0, create_app('testing'), threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            summary = load_test.run_stage(f'http://127.0.0.1:{server.server_port}', users=2, sessions=1,
+                                          think=0, drag_steps=2)
+        finally:
+            server.shutdown()
+            ExportService._instance = None
+            shutil.rmtree(cache_dir)
+        self.assertEqual(summary['sessions'], 2)
+        self.assertEqual(summary['errors'], 0)
+        self.assertEqual(summary['endpoints']['POST /api/update_parameter']['requests'], 4)
+        self.assertEqual(summary['endpoints']['GET /api/models/<id>']['requests'], 4)
+        self.assertEqual(summary['endpoints']['GET /api/export/<id>/step']['requests'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
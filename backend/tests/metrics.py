@@ -0,0 +1,80 @@
+import unittest
+from app import create_app
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import circular_pattern, create_cylinder
+from app.services.metrics import (Counter, Histogram, metrics, request_timings, server_timing_header,
+                                  start_request_timing, stop_request_timing)
+
+class TestMetricTypes(unittest.TestCase):
+    def test_histogram_text_format(self):
+        histogram = Histogram('work_seconds', 'Work', ('kind',), buckets=(0.1, 1))
+        histogram.observe('a', value=0.05)
+        histogram.observe('a', value=0.5)
+        histogram.observe('a', value=5)
+        lines = [f'{name}{labels} {value}' for name, labels, value in histogram.samples()]
+        self.assertEqual(lines, [
+            'work_seconds_bucket{kind="a",le="0.1"} 1',
+            'work_seconds_bucket{kind="a",le="1.0"} 2',
+            'work_seconds_bucket{kind="a",le="+Inf"} 3',
+            'work_seconds_sum{kind="a"} 5.55',
+            'work_seconds_count{kind="a"} 3'])
+
+    def test_counter_escapes_labels(self):
+        counter = Counter('things_total', 'Things', ('name',))
+        counter.inc('say "hi"')
+        counter.inc('say "hi"', amount=2)
+        self.assertEqual(counter.samples(), [('things_total', '{name="say \\"hi\\""}', 3.0)])
+
+    def test_server_timing_header(self):
+        header = server_timing_header([('feature-cut', 0.001), ('feature-cut', 0.002), ('total', 0.01)])
+        self.assertEqual(header, 'feature-cut;dur=3.000, total;dur=10.000')
+
+class TestRebuildInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.manager = ModelManager.get_instance()
+        self.model_id = self.manager.create_new_model()
+        self.model = self.manager.get_model(self.model_id)
+        self.model.add_feature(create_cylinder, 20, 5)
+        self.model.add_feature(circular_pattern, 1, 2, 4, 10)
+
+    def tearDown(self):
+        metrics.enabled = False
+        stop_request_timing()
+
+    def test_nothing_recorded_when_off(self):
+        self.model.rebuild()
+        self.assertIsNone(request_timings())
+        self.assertFalse(metrics.active())
+
+    def test_request_timings_per_feature(self):
+        start_request_timing()
+        self.model.rebuild()
+        names = [name for name, _ in request_timings()]
+        self.assertEqual(names, ['feature-create_cylinder', 'feature-circular_pattern', 'rebuild'])
+
+    def test_metrics_record_features_and_booleans(self):
+        metrics.enabled = True
+        before = dict(metrics.boolean_operations.values)
+        self.model.rebuild()
+        self.assertEqual(metrics.boolean_operations.values[('Cut',)], before.get(('Cut',), 0) + 1)
+        self.assertIn(('circular_pattern',), metrics.feature_faces.values)
+        text = metrics.render()
+        self.assertIn('# TYPE cad_feature_seconds histogram', text)
+        self.assertIn('cad_feature_seconds_count{feature="circular_pattern"}', text)
+
+    def test_timing_header_and_metrics_endpoint(self):
+        client = create_app('testing').test_client()
+        response = client.post('/api/circular_pattern', headers={'X-Request-Timing': '1'}, json={
+            'modelId': self.model_id, 'radius': 1, 'depth': 1, 'count': 3, 'patternRadius': 5})
+        self.assertEqual(response.status_code, 200)
+        entries = [entry.split(';')[0] for entry in response.headers['Server-Timing'].split(', ')]
+        for name in ('feature-circular_pattern', 'rebuild', 'serialization', 'total'):
+            self.assertIn(name, entries)
+        self.assertNotIn('Server-Timing', client.get('/api/test').headers)
+
+        metrics_response = client.get('/metrics')
+        self.assertTrue(metrics_response.mimetype.startswith('text/plain'))
+        self.assertIn('# TYPE http_request_seconds histogram', metrics_response.get_data(as_text=True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import json
+import threading
+import unittest
+from app import create_app
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import circular_cut, create_cylinder
+from app.services.event_streams import EventStreamLimit
+from app.services.model_events import ModelEventHub
+
+def read_event(stream):
+    # Next non-comment event from an SSE response iterator
+    for chunk in stream:
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if not text.startswith(':'):
+            fields = dict(line.split(': ', 1) for line in text.strip().split('\n'))
+            return fields['event'], json.loads(fields['data'])
+
+class TestModelEvents(unittest.TestCase):
+    def setUp(self):
+        self.manager = ModelManager.get_instance()
+        self.model_id = self.manager.create_new_model()
+        self.model = self.manager.get_model(self.model_id)
+        self.model.add_parameter('radius', 10)
+        self.model.add_feature(create_cylinder, 'radius', 5)
+        self.hub = ModelEventHub.get_instance()
+
+    def test_first_delta_carries_full_state(self):
+        subscription = self.hub.subscribe(self.model_id, self.model)
+        delta = subscription.next_delta(timeout=0)
+        self.assertIsNone(delta['fromRevision'])
+        self.assertEqual(delta['parameters'], {'radius': 10})
+        self.assertEqual([f['type'] for f in delta['features']], ['create_cylinder'])
+        self.assertIsNone(subscription.next_delta(timeout=0))
+        subscription.close()
+        self.assertEqual(self.hub.subscriber_count(self.model_id), 0)
+
+    def test_slow_subscriber_receives_one_coalesced_delta(self):
+        subscription = self.hub.subscribe(self.model_id, self.model)
+        subscription.next_delta(timeout=0)
+
+        self.model.rebuild()
+        self.model.add_feature(circular_cut, 2, 1)
+        self.model.rebuild()
+        self.model.update_parameter('radius', 12)
+
+        delta = subscription.next_delta(timeout=0)
+        self.assertEqual((delta['fromRevision'], delta['revision']), (0, 3))
+        self.assertEqual(delta['coalesced'], 3)
+        self.assertEqual(delta['parameters'], {'radius': 12})
+        self.assertEqual([f['type'] for f in delta['features']], ['circular_cut'])
+        self.assertEqual(delta['removedFeatures'], [])
+        subscription.close()
+
+    def test_geometry_entry_tells_when_to_refetch(self):
+        self.model.rebuild()
+        subscription = self.hub.subscribe(self.model_id, self.model)
+        initial = subscription.next_delta(timeout=0)
+        self.assertTrue(initial['geometry']['changed'])
+        self.assertEqual(initial['geometry']['url'], f'/api/models/{self.model_id}')
+
+        self.model.set_feature_color(0, (1, 0, 0))
+        delta = subscription.next_delta(timeout=0)
+        self.assertFalse(delta['geometry']['changed'])
+        self.assertEqual(delta['features'][0]['color'], [1, 0, 0])
+
+        self.model.update_parameter('radius', 12)
+        delta = subscription.next_delta(timeout=0)
+        self.assertTrue(delta['geometry']['changed'])
+        self.assertEqual(delta['geometry']['revision'], delta['revision'])
+
+        # Hiding an additive feature changes the shown faces without a rebuild
+        self.model.set_feature_visibility(0, False)
+        self.assertTrue(subscription.next_delta(timeout=0)['geometry']['changed'])
+        subscription.close()
+
+    def test_waiting_subscriber_is_woken_by_rebuild(self):
+        subscription = self.hub.subscribe(self.model_id, self.model)
+        subscription.next_delta(timeout=0)
+        timer = threading.Timer(0.05, self.model.rebuild)
+        timer.start()
+        delta = subscription.next_delta(timeout=5)
+        timer.join()
+        self.assertEqual(delta['revision'], 1)
+        self.assertEqual(delta['features'], [])
+        subscription.close()
+
+    def test_event_stream(self):
+        app = create_app('testing')
+        response = app.test_client().get(f'/api/models/{self.model_id}/events', buffered=False)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        stream = iter(response.response)
+
+        event, initial = read_event(stream)
+        self.assertEqual((event, initial['modelId'], initial['parameters']), ('model', self.model_id, {'radius': 10}))
+
+        self.manager.update_parameter(self.model_id, 'radius', 11)
+        event, delta = read_event(stream)
+        self.assertEqual((delta['fromRevision'], delta['revision'], delta['parameters']), (0, 1, {'radius': 11}))
+        self.assertEqual(self.hub.subscriber_count(self.model_id), 1)
+        response.close()
+        self.assertEqual(self.hub.subscriber_count(self.model_id), 0)
+
+        self.assertEqual(app.test_client().get('/api/models/missing/events').status_code, 404)
+
+    def test_parameter_update_route_publishes_one_rebuild(self):
+        subscription = self.hub.subscribe(self.model_id, self.model)
+        subscription.next_delta(timeout=0)
+        revision = self.model.revision
+        response = create_app('testing').test_client().post('/api/update_parameter', json={
+            'modelId': self.model_id, 'parameterName': 'radius', 'newValue': 12})
+        self.assertEqual(response.status_code, 200)
+        delta = subscription.next_delta(timeout=0)
+        self.assertEqual((delta['revision'], delta['coalesced']), (revision + 1, 1))
+        subscription.close()
+
+    def test_streams_beyond_the_limit_are_refused(self):
+        app = create_app('testing')
+        EventStreamLimit._instance = EventStreamLimit(max_streams=1)
+        try:
+            first = app.test_client().get(f'/api/models/{self.model_id}/events', buffered=False)
+            self.assertEqual(first.status_code, 200)
+
+            refused = app.test_client().get(f'/api/models/{self.model_id}/events', buffered=False)
+            self.assertEqual(refused.status_code, 503)
+            self.assertIn('Retry-After', refused.headers)
+            self.assertEqual(self.hub.subscriber_count(self.model_id), 1)
+
+            first.close()
+            self.assertEqual(EventStreamLimit.get_instance().open, 0)
+            second = app.test_client().get(f'/api/models/{self.model_id}/events', buffered=False)
+            self.assertEqual(second.status_code, 200)
+            second.close()
+        finally:
+            EventStreamLimit._instance = None
+
+if __name__ == '__main__':
+    unittest.main()
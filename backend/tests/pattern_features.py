@@ -0,0 +1,101 @@
+import math
+import unittest
+import cadquery as cq
+from app import create_app
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import circular_pattern, create_cylinder, linear_pattern
+
+def disc():
+    # Radius 60, height 10, top face at z = 5
+    return create_cylinder(cq.Workplane('XY'), 60, 10)
+
+def hole_volume(radius, depth):
+    return math.pi * radius ** 2 * depth
+
+class TestPatternFeatures(unittest.TestCase):
+    def test_circular_pattern_matches_individual_cuts(self):
+        base = disc()
+        result = circular_pattern(base, 2, 4, 24, 40)
+        removed = base.val().Volume() - result.val().Volume()
+        self.assertAlmostEqual(removed, 24 * hole_volume(2, 4), places=3)
+
+        sequential = base.findSolid()
+        for i in range(24):
+            angle = 2 * math.pi * i / 24
+            center = cq.Vector(40 * math.cos(angle), 40 * math.sin(angle), 1)
+            sequential = sequential.cut(cq.Solid.makeCylinder(2, 4, center))
+        self.assertAlmostEqual(result.val().Volume(), sequential.Volume(), places=3)
+        # One cylindrical wall per hole plus the outer wall
+        self.assertEqual(len(result.faces('%CYLINDER').vals()), 25)
+
+    def test_partial_circular_pattern_spans_total_angle(self):
+        result = circular_pattern(disc(), 2, 4, 3, 40, total_angle=180.0, start_angle=90.0)
+        centers = sorted((round(face.Center().x, 6), round(face.Center().y, 6))
+                         for face in result.faces('%CYLINDER').vals() if face.Center().z < 5 and face.Center().z > 1)
+        self.assertEqual(centers, [(-40.0, 0.0), (0.0, -40.0), (0.0, 40.0)])
+
+    def test_linear_pattern_extrude(self):
+        base = disc()
+        result = linear_pattern(base, 3, 5, 4, 10, 0.0, 1.0, 'extrude')
+        added = result.val().Volume() - base.val().Volume()
+        self.assertAlmostEqual(added, 4 * hole_volume(3, 5), places=3)
+        box = result.val().BoundingBox()
+        self.assertAlmostEqual(box.zmax, 10)
+
+    def test_invalid_operation(self):
+        with self.assertRaises(ValueError):
+            linear_pattern(disc(), 2, 4, 3, 10, operation='engrave')
+
+    def test_invalid_arguments_are_refused(self):
+        for args in [(2, 4, 3, 10, 0.0, 0.0), (2, 4, 0, 10), (0, 4, 3, 10), (2, -1, 3, 10), (2, 4, 3, float('nan'))]:
+            with self.assertRaises(ValueError):
+                linear_pattern(disc(), *args)
+        with self.assertRaises(ValueError):
+            circular_pattern(disc(), 2, 4, 0, 40)
+
+        # Checked before the feature is added, also once parameters are resolved
+        manager = ModelManager()
+        model_id = manager.create_new_model()
+        manager.add_parameter(model_id, 'holes', 6)
+        manager.add_feature(model_id, create_cylinder, 60, 10)
+        with self.assertRaises(ValueError):
+            manager.add_feature(model_id, linear_pattern, 2, 4, 3, 10, 0.0, 0.0)
+        manager.add_feature(model_id, circular_pattern, 2, 4, 'holes', 40)
+        with self.assertRaises(ValueError):
+            manager.update_parameter(model_id, 'holes', 0)
+        model = manager.get_model(model_id)
+        self.assertEqual(len(model.features), 2)
+        self.assertEqual(model.parameters, {'holes': 6})
+
+    def test_pattern_route_rejects_invalid_arguments(self):
+        client = create_app('testing').test_client()
+        manager = ModelManager.get_instance()
+        model_id = manager.create_new_model()
+        manager.add_feature(model_id, create_cylinder, 60, 10)
+        response = client.post('/api/linear_pattern', json={
+            'modelId': model_id, 'radius': 1, 'depth': 2, 'count': 3, 'spacing': 5, 'directionX': 0, 'directionY': 0})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('direction', response.get_json()['error'])
+        response = client.post('/api/circular_pattern', json={
+            'modelId': model_id, 'radius': 1, 'depth': 2, 'count': 0, 'patternRadius': 20})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(manager.get_model(model_id).features), 1)
+
+    def test_export_import_round_trip(self):
+        manager = ModelManager.get_instance()
+        model_id = manager.create_new_model()
+        model = manager.get_model(model_id)
+        model.add_parameter('holes', 12)
+        model.add_feature(create_cylinder, 60, 10)
+        model.add_feature(circular_pattern, 2, 4, 'holes', 40)
+        model.add_feature(linear_pattern, 1, 2, 3, 8)
+        model.rebuild()
+
+        for format in ('json', 'binary'):
+            imported = manager.get_model(manager.import_model(manager.export_model(model_id, format)))
+            self.assertEqual([f['type'] for f in imported.features],
+                             ['create_cylinder', 'circular_pattern', 'linear_pattern'])
+            self.assertAlmostEqual(imported.get_model().val().Volume(), model.get_model().val().Volume(), places=6)
+
+if __name__ == '__main__':
+    unittest.main()
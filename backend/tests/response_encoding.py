@@ -0,0 +1,79 @@
+import gzip
+import json
+import unittest
+import numpy as np
+from flask import Flask, jsonify
+from app import create_app
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import create_cylinder
+from app.services.compression import compress_response, negotiate
+from app.services.json_provider import FastJSONProvider
+
+class TestJSONProvider(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.json = FastJSONProvider(self.app)
+
+    def test_numpy_values(self):
+        with self.app.app_context():
+            response = jsonify({
+                "vertices": np.arange(6, dtype=np.float64).reshape(2, 3),
+                "strided": np.arange(6).reshape(2, 3)[:, ::2],
+                "count": np.int64(3),
+                "pair": (1, 2)
+            })
+        self.assertEqual(json.loads(response.get_data()), {
+            "vertices": [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]], "strided": [[0, 2], [3, 5]], "count": 3, "pair": [1, 2]})
+
+class TestCompression(unittest.TestCase):
+    def test_negotiate(self):
+        self.assertEqual(negotiate('gzip, deflate', ('br', 'gzip')), 'gzip')
+        self.assertEqual(negotiate('gzip;q=0.5, br', ('br', 'gzip')), 'br')
+        self.assertEqual(negotiate('br;q=0, *;q=0.1', ('br', 'gzip')), 'gzip')
+        self.assertIsNone(negotiate('identity', ('br', 'gzip')))
+        self.assertIsNone(negotiate(None, ('gzip',)))
+
+    def test_small_and_streamed_responses_are_not_compressed(self):
+        app = Flask(__name__)
+        with app.app_context():
+            small = compress_response(jsonify({"a": 1}), 'gzip', min_size=1024)
+            self.assertNotIn('Content-Encoding', small.headers)
+            streamed = app.response_class(iter([b'x' * 4096]), mimetype='application/json')
+            self.assertNotIn('Content-Encoding', compress_response(streamed, 'gzip', min_size=1).headers)
+
+class TestModelResponses(unittest.TestCase):
+    def setUp(self):
+        self.client = create_app('testing').test_client()
+        manager = ModelManager.get_instance()
+        self.model_id = manager.create_new_model()
+        manager.add_feature(self.model_id, create_cylinder, 10, 5)
+        manager.rebuild_model(self.model_id)
+
+    def test_model_data_is_compressed(self):
+        response = self.client.get(f'/api/models/{self.model_id}', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        model = json.loads(gzip.decompress(response.get_data()))['model']
+        self.assertEqual(np.array(model['vertices']).shape[1], 3)
+        self.assertEqual(model['boundingBox']['max'], [10.0, 10.0, 2.5])
+
+        plain = self.client.get(f'/api/models/{self.model_id}')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(plain.get_json()['model'], model)
+
+    def test_unchanged_revision_returns_304(self):
+        response = self.client.get(f'/api/models/{self.model_id}', headers={'Accept-Encoding': 'gzip'})
+        etag = response.headers['ETag']
+        self.assertTrue(etag.startswith('W/'))
+
+        cached = self.client.get(f'/api/models/{self.model_id}', headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.get_data(), b'')
+
+        ModelManager.get_instance().rebuild_model(self.model_id)
+        changed = self.client.get(f'/api/models/{self.model_id}', headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from app import create_app
+from app.cad.model_manager import ModelManager
+from app.cad.parametric_feature_functions import create_cylinder
+from app.replay import replay
+from app.services.cad_pool import CadPool
+from app.services.slow_requests import SlowRequestRecorder
+
+class TestSlowRequestCapture(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.app = create_app('testing')
+        self.recorder = SlowRequestRecorder(self.directory, threshold=0.0, max_files=2, interval=0.001)
+        self.recorder.init_app(self.app)
+        self.client = self.app.test_client()
+
+        self.manager = ModelManager.get_instance()
+        self.model_id = self.manager.create_new_model()
+        self.manager.add_feature(self.model_id, create_cylinder, 40, 10)
+        self.manager.rebuild_model(self.model_id)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def add_pattern(self, count=48):
+        return self.client.post('/api/circular_pattern', json={
+            'modelId': self.model_id, 'radius': 1, 'depth': 2, 'count': count, 'patternRadius': 30})
+
+    def test_capture_holds_inputs_model_and_profile(self):
+        self.assertEqual(self.add_pattern().status_code, 200)
+        [path] = self.recorder.captures()
+        with open(path) as f:
+            capture = json.load(f)
+
+        self.assertEqual(capture['request']['endpoint'], 'cad_operations.circular_pattern')
+        self.assertEqual(capture['request']['json']['count'], 48)
+        self.assertEqual(capture['status'], 200)
+        # The model as it was before the request
+        self.assertEqual([f['type'] for f in capture['model']['features']], ['create_cylinder'])
+        self.assertGreater(capture['profile']['samples'], 0)
+        self.assertTrue(any('rebuild' in entry['stack'] for entry in capture['profile']['stacks']))
+
+    def test_fast_requests_are_not_captured(self):
+        self.recorder.threshold = 60
+        self.add_pattern(count=2)
+        self.assertEqual(self.recorder.captures(), [])
+
+    def test_model_is_only_serialized_for_slow_requests(self):
+        self.recorder.threshold = 60
+        exported = []
+        export_model = self.recorder._export_model
+        self.recorder._export_model = lambda state: exported.append(state) or export_model(state)
+        self.add_pattern(count=2)
+        self.assertEqual(exported, [])
+
+        self.recorder.threshold = 0.0
+        self.add_pattern(count=3)
+        self.assertEqual(len(exported), 1)
+
+    def test_captures_are_rotated(self):
+        for count in (2, 3, 4):
+            self.add_pattern(count)
+        self.assertEqual(len(self.recorder.captures()), 2)
+
+    def test_replay_runs_against_an_imported_copy(self):
+        self.add_pattern()
+        with open(self.recorder.captures()[0]) as f:
+            capture = json.load(f)
+
+        pool = CadPool._instance
+        timings, profiler = replay(capture, repeat=2, profile=True)
+        # The process's CAD pool is left in place
+        self.assertIs(CadPool._instance, pool)
+        self.assertEqual([status for _, status in timings], [200, 200])
+        self.assertIsNotNone(profiler)
+        # The captured model itself is left alone
+        self.assertEqual(len(self.manager.get_model(self.model_id).features), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+import unittest
+
+def modules_after(code, **env):
+    # Fresh interpreter so modules imported by other tests do not count
+    return subprocess.run([sys.executable, '-c', code + '\nimport sys; print(" ".join(sys.modules))'],
+                          env={**os.environ, 'PRELOAD_CAD': '', **env},
+                          capture_output=True, text=True, check=True).stdout.split()
+
+class TestStartup(unittest.TestCase):
+    def test_create_app_defers_cad_imports(self):
+        modules = modules_after("from app import create_app; create_app('testing').test_client().get('/api/test')")
+        for heavy in ('cadquery', 'OCP', 'ezdxf'):
+            self.assertNotIn(heavy, modules)
+
+    def test_cad_loaded_on_first_use(self):
+        modules = modules_after(
+            "from app import create_app\n"
+            "client = create_app('testing').test_client()\n"
+            "client.post('/api/create_new_model')")
+        self.assertIn('cadquery', modules)
+
+    def test_preload_imports_cad_at_startup(self):
+        modules = modules_after("from app import create_app; create_app('testing')", PRELOAD_CAD='1')
+        self.assertIn('cadquery', modules)
+
+if __name__ == '__main__':
+    unittest.main()
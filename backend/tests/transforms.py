@@ -0,0 +1,53 @@
+import unittest
+import cadquery as cq
+import numpy as np
+from app.cad import transforms
+from app.cad.mirror_functions import apply_mirror_operation, mirror_point, mirror_sketch
+
+def reference_mirror_point(point, mirror_line):
+    # Per-point formula the kernel replaced
+    (x1, y1), (x2, y2) = mirror_line
+    x, y = point
+    dx, dy = x2 - x1, y2 - y1
+    a = (dx * dx - dy * dy) / (dx * dx + dy * dy)
+    b = 2 * dx * dy / (dx * dx + dy * dy)
+    return (a * (x - x1) + b * (y - y1) + x1, b * (x - x1) - a * (y - y1) + y1)
+
+class TestTransforms(unittest.TestCase):
+    def setUp(self):
+        self.points = np.random.default_rng(0).uniform(-10, 10, (1000, 2))
+
+    def test_mirror_sketch_matches_point_formula(self):
+        line = ((1.0, -2.0), (4.0, 3.0))
+        expected = np.array([reference_mirror_point(p, line) for p in self.points])
+        np.testing.assert_allclose(mirror_sketch(self.points, line), expected, atol=1e-12)
+        np.testing.assert_allclose(mirror_point((3, 4), line), reference_mirror_point((3, 4), line))
+
+    def test_reflection_is_an_involution(self):
+        matrix = transforms.reflection((1, 2, 3), (1, 1, 0))
+        points = np.random.default_rng(1).uniform(-5, 5, (100, 3))
+        np.testing.assert_allclose(transforms.apply(transforms.apply(points, matrix), matrix), points, atol=1e-12)
+        np.testing.assert_allclose(transforms.apply([[1, 2, 3]], matrix), [[1, 2, 3]])
+
+    def test_rotation(self):
+        np.testing.assert_allclose(transforms.apply([[2, 1]], transforms.rotation(np.pi / 2, (1, 1))), [[1, 2]], atol=1e-12)
+        matrix = transforms.rotation(np.pi / 2, (0, 0, 1), axis=(1, 0, 0))
+        np.testing.assert_allclose(transforms.apply([[0, 1, 1]], matrix), [[0, 0, 2]], atol=1e-12)
+
+    def test_patterns(self):
+        linear = transforms.apply_many([[0, 0, 0], [1, 0, 0]], transforms.linear_pattern((0, 2, 0), 5, 3))
+        self.assertEqual(linear.shape, (3, 2, 3))
+        np.testing.assert_allclose(linear[:, 1], [[1, 0, 0], [1, 5, 0], [1, 10, 0]])
+
+        circular = transforms.apply_many([[10, 0, 0]], transforms.circular_pattern(4))[:, 0]
+        np.testing.assert_allclose(circular, [[10, 0, 0], [0, 10, 0], [-10, 0, 0], [0, -10, 0]], atol=1e-12)
+        arc = transforms.apply_many([[10, 0]], transforms.circular_pattern(3, (0, 0), total_angle=np.pi))[:, 0]
+        np.testing.assert_allclose(arc, [[10, 0], [0, 10], [-10, 0]], atol=1e-12)
+
+    def test_apply_mirror_operation_on_sketch(self):
+        plane = cq.Plane(origin=(1, 0, 0), xDir=(0, 1, 0), normal=(1, 0, 0))
+        mirrored = apply_mirror_operation(None, 'sketch', [(3, 5), (0, -1)], plane)
+        np.testing.assert_allclose(mirrored, [[-1, 5], [2, -1]], atol=1e-12)
+
+if __name__ == '__main__':
+    unittest.main()